@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import json
+import logging
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from typing import Any, List
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import F, Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_count(queryset) -> int | None:
+    """
+    Return the planner's row estimate for ``queryset`` without executing it.
+
+    Only PostgreSQL exposes a cheap estimate; other backends return ``None``.
+    """
+
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+    except Exception:  # pragma: no cover - estimates are best effort
+        logger.warning("Unable to estimate row count from the query planner.", exc_info=True)
+        return None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on the requested ordering plus ``(created_at, id)``.
+
+    Every page is fetched with an index-friendly ``WHERE (key) > (cursor)`` predicate instead of
+    ``OFFSET``, and the total is only counted exactly when ``?with_count=1`` is passed; otherwise
+    the planner estimate is returned. Passing ``?page=N`` keeps the legacy page-number behaviour.
+    When a search backend annotated ``rank_annotation`` and no explicit ordering was requested,
+    results are ordered by relevance first.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    legacy_page_query_param = "page"
+    default_ordering = ("-created_at",)
+    tiebreakers = ("-created_at", "-id")
+    rank_annotation = "search_rank"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.legacy = None
+        if self.legacy_page_query_param in request.query_params:
+            self.legacy = PageNumberPagination()
+            self.legacy.page_size = self.page_size
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.base_url = request.build_absolute_uri()
+        self.model = queryset.model
+        self.annotations = set(queryset.query.annotations)
+        self.keys = self.get_keys(request, queryset, view)
+        self.count, self.count_is_estimate = self.get_count(queryset, request)
+        position, reverse = self.decode_cursor(request)
+
+        keys = [(name, not descending) for name, descending in self.keys] if reverse else self.keys
+        # The reversed walk mirrors the forward one exactly, NULLs included.
+        queryset = queryset.order_by(
+            *[self._order_expression(name, desc, nulls_first=reverse) for name, desc in keys]
+        )
+        if position is not None:
+            queryset = queryset.filter(self._after(keys, position, nulls_first=reverse))
+
+        results = list(queryset[: self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[: self.page_size]
+        if reverse:
+            results.reverse()
+            self.has_next, self.has_previous = position is not None, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+        return Response(
+            {
+                "count": self.count,
+                "count_is_estimate": self.count_is_estimate,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer", "nullable": True, "example": 123},
+                "count_is_estimate": {"type": "boolean"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor returned in the next/previous links.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Set to 1 to compute an exact total instead of the planner estimate.",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.legacy_page_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Legacy page number. Switches the response to page-number pagination.",
+                "schema": {"type": "integer"},
+            },
+        ]
+
+    def get_keys(self, request, queryset, view) -> List[tuple[str, bool]]:
+        ordering = None
+        for backend in getattr(view, "filter_backends", api_settings.DEFAULT_FILTER_BACKENDS):
+            if isinstance(backend, type) and issubclass(backend, OrderingFilter):
+                ordering = backend().get_ordering(request, queryset, view)
+                break
+        ordering = list(ordering or self.default_ordering)
+        explicit = request.query_params.get(api_settings.ORDERING_PARAM)
+        if self.rank_annotation in queryset.query.annotations and not explicit:
+            ordering = [f"-{self.rank_annotation}"]
+        keys: List[tuple[str, bool]] = []
+        for field in ordering + list(self.tiebreakers):
+            name = field.lstrip("-")
+            if name == "pk":
+                name = "id"
+            if "__" in name or any(existing == name for existing, _ in keys):
+                continue
+            keys.append((name, field.startswith("-")))
+        return keys
+
+    def get_count(self, queryset, request) -> tuple[int | None, bool]:
+        if request.query_params.get(self.count_query_param, "").lower() in {"1", "true", "yes"}:
+            return queryset.count(), False
+        return estimate_count(queryset), True
+
+    def get_next_link(self) -> str | None:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self) -> str | None:
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def encode_cursor(self, instance, reverse: bool) -> str:
+        position = [self._dump(getattr(instance, name)) for name, _ in self.keys]
+        payload = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        token = urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+        url = remove_query_param(self.base_url, self.legacy_page_query_param)
+        return replace_query_param(url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request) -> tuple[list[Any] | None, bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            raw_position = payload["p"]
+            reverse = bool(payload.get("r"))
+            if len(raw_position) != len(self.keys):
+                raise ValueError("cursor does not match the requested ordering")
+            position = [
+                None if value is None else self._to_python(name, value)
+                for (name, _), value in zip(self.keys, raw_position, strict=True)
+            ]
+        except (TypeError, ValueError, KeyError, ValidationError):
+            raise NotFound(self.invalid_cursor_message) from None
+        return position, reverse
+
+    def _nullable(self, name: str) -> bool:
+        if name in self.annotations:
+            return False
+        return self.model._meta.get_field(name).null
+
+    def _to_python(self, name: str, value):
+        if name in self.annotations:
+            return value
+        return self.model._meta.get_field(name).to_python(value)
+
+    @staticmethod
+    def _dump(value):
+        if value is None or isinstance(value, (int, float, str, bool)):
+            return value
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return str(value)
+
+    def _order_expression(self, name: str, descending: bool, nulls_first: bool = False):
+        if not self._nullable(name):
+            # Plain ASC/DESC so the planner can walk the matching btree index.
+            return F(name).desc() if descending else F(name).asc()
+        # NULLs sort last on forward pages and first when walking back towards them.
+        placement = {"nulls_first": True} if nulls_first else {"nulls_last": True}
+        return F(name).desc(**placement) if descending else F(name).asc(**placement)
+
+    def _after(self, keys, position, nulls_first: bool = False) -> Q:
+        """Build ``(k1, k2, ...) > (v1, v2, ...)`` honouring key direction and NULL placement."""
+
+        condition = Q(pk__in=[])
+        equal_prefix = Q()
+        for (name, descending), value in zip(keys, position, strict=True):
+            if value is None:
+                if nulls_first:
+                    # NULLs lead, so every non-NULL value for this key is beyond the cursor.
+                    condition |= equal_prefix & Q(**{f"{name}__isnull": False})
+                # Otherwise only NULLs remain; either way the next key decides among NULLs.
+                equal_prefix &= Q(**{f"{name}__isnull": True})
+                continue
+            lookup = "lt" if descending else "gt"
+            beyond = Q(**{f"{name}__{lookup}": value})
+            if self._nullable(name) and not nulls_first:
+                beyond |= Q(**{f"{name}__isnull": True})
+            condition |= equal_prefix & beyond
+            equal_prefix &= Q(**{name: value})
+        return condition
+
+
+class ChronologicalPagination(KeysetPagination):
+    """
+    Oldest-first keyset pages on ``(created_at, id)`` for threads nested under a detail route.
+
+    The parent view's ``?ordering`` describes the parent resource, so it is ignored here.
+    """
+
+    page_size = 50
+    default_ordering = ("created_at",)
+    tiebreakers = ("created_at", "id")
+
+    def get_keys(self, request, queryset, view) -> List[tuple[str, bool]]:
+        return [(field.lstrip("-"), field.startswith("-")) for field in self.tiebreakers]
@@ -21,7 +21,8 @@ from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 from pythonjsonlogger import jsonlogger
 
-from core.utils.config import env, env_bool, env_list, env_path
+from core.utils.config import env, env_bool, env_int, env_list, env_path
+
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -58,6 +59,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'django_filters',
     'rest_framework',
@@ -210,6 +212,11 @@ REST_FRAMEWORK = {
 MAX_UPLOAD_SIZE = 10 * 1024 * 1024  # 10 MB
 FILE_UPLOAD_MAX_MEMORY_SIZE = MAX_UPLOAD_SIZE
 DATA_UPLOAD_MAX_MEMORY_SIZE = MAX_UPLOAD_SIZE
+# Django's default handlers, plus a SHA-256 of each file computed as it streams in.
+FILE_UPLOAD_HANDLERS = [
+    'documents.upload_handlers.HashingMemoryFileUploadHandler',
+    'documents.upload_handlers.HashingTemporaryFileUploadHandler',
+]
 
 SESSION_COOKIE_HTTPONLY = True
 CSRF_COOKIE_HTTPONLY = True
@@ -292,6 +299,21 @@ FIREBASE_CREDENTIALS_FILE = str(
     env_path('FIREBASE_SERVICE_ACCOUNT_JSON_PATH', BASE_DIR / 'firebase_service_account.json')
 )
 FIREBASE_STORAGE_BUCKET = env('FIREBASE_STORAGE_BUCKET', 'fir-storage-273ce.appspot.com')
+# Where uploads are written: FirebaseStorage, or LocalStorage (no credentials needed, e.g. CI).
+STORAGE_BACKEND = env('STORAGE_BACKEND', 'documents.services.storage.FirebaseStorage')
+STORAGE_LOCAL_ROOT = env_path('STORAGE_LOCAL_ROOT', MEDIA_ROOT / 'storage')
+STORAGE_LOCAL_URL = env('STORAGE_LOCAL_URL', 'http://localhost:8000/media/storage/')
+# With LocalStorage, `manage.py replicate_storage` copies blobs here and swaps the stored URLs.
+STORAGE_REPLICA_BACKEND = env('STORAGE_REPLICA_BACKEND', '')
+STORAGE_REPLICATION_LEASE_SECONDS = env_int('STORAGE_REPLICATION_LEASE_SECONDS', 600)
+STORAGE_REPLICATION_RETRY_SECONDS = env_int('STORAGE_REPLICATION_RETRY_SECONDS', 30)
+STORAGE_REPLICATION_MAX_ATTEMPTS = env_int('STORAGE_REPLICATION_MAX_ATTEMPTS', 8)
+# Name blobs by content hash and skip uploads of content that is already stored.
+STORAGE_CONTENT_ADDRESSED = env_bool('STORAGE_CONTENT_ADDRESSED', False)
+# Uploads above one chunk are streamed as resumable uploads (a multiple of 256 KB).
+STORAGE_UPLOAD_CHUNK_MB = env_int('STORAGE_UPLOAD_CHUNK_MB', 8)
+# "bucket": objects are readable through a bucket-level IAM grant; "object": per-object ACL.
+STORAGE_PUBLIC_ACCESS = env('STORAGE_PUBLIC_ACCESS', 'bucket')
 DOC_AI_ENABLED = env_bool('DOC_AI_ENABLED', True)
 DOC_AI_PROVIDER = env('DOC_AI_PROVIDER', 'layoutlmv3')
 GEMINI_API_KEY = env('GEMINI_API_KEY', '')
@@ -299,10 +321,49 @@ GEMINI_MODEL_NAME = env('GEMINI_MODEL_NAME', 'gemini-2.5-pro')
 OPENAI_API_KEY = env('OPENAI_API_KEY', '')
 RESEND_API_KEY = env('RESEND_API_KEY', '')
 RESEND_FROM_EMAIL = env('RESEND_FROM_EMAIL', '')
+# Notification emails are queued in EmailOutbox and delivered by `manage.py send_email_outbox`.
+EMAIL_OUTBOX_TRANSPORT = env(
+    'EMAIL_OUTBOX_TRANSPORT', 'procurement_app.services.email_outbox.ResendTransport'
+)
+EMAIL_OUTBOX_BATCH_SIZE = env_int('EMAIL_OUTBOX_BATCH_SIZE', 100)
+EMAIL_OUTBOX_MAX_ATTEMPTS = env_int('EMAIL_OUTBOX_MAX_ATTEMPTS', 8)
+EMAIL_OUTBOX_RETRY_SECONDS = env_int('EMAIL_OUTBOX_RETRY_SECONDS', 30)
+CASHOUT_FORECAST_CACHE_SECONDS = env_int('CASHOUT_FORECAST_CACHE_SECONDS', 300)
+# PO PDFs are rendered after the approval commits; `manage.py render_purchase_orders` sweeps leftovers.
+PO_PDF_BACKGROUND = env_bool('PO_PDF_BACKGROUND', True)
+# Threads that run background renders and uploads in each web process.
+PO_PDF_WORKERS = env_int('PO_PDF_WORKERS', 2)
+PO_PDF_MAX_ATTEMPTS = env_int('PO_PDF_MAX_ATTEMPTS', 5)
+PO_PDF_RENDER_LEASE_SECONDS = env_int('PO_PDF_RENDER_LEASE_SECONDS', 600)
+# reportlab renders run in this many spawned processes; 0 renders in the calling thread.
+PO_RENDER_WORKERS = env_int('PO_RENDER_WORKERS', 2)
+# Queue uploads for `manage.py run_extraction_worker` instead of extracting inside the request.
+EXTRACTION_ASYNC = env_bool('EXTRACTION_ASYNC', False)
+EXTRACTION_JOB_MAX_ATTEMPTS = env_int('EXTRACTION_JOB_MAX_ATTEMPTS', 3)
+EXTRACTION_JOB_RETRY_SECONDS = env_int('EXTRACTION_JOB_RETRY_SECONDS', 30)
+EXTRACTION_JOB_LEASE_SECONDS = env_int('EXTRACTION_JOB_LEASE_SECONDS', 900)
+# Threads that upload documents while OCR and Gemini run (0 = upload first, in the caller).
+EXTRACTION_UPLOAD_WORKERS = env_int('EXTRACTION_UPLOAD_WORKERS', 4)
+# PDF text extraction: page ranges fan out to this many spawned processes (0 = in-process).
+OCR_PDF_WORKERS = env_int('OCR_PDF_WORKERS', 2)
+OCR_PDF_PAGES_PER_TASK = env_int('OCR_PDF_PAGES_PER_TASK', 4)
+# Budget per document; pages beyond it are skipped and the result is flagged (0 = no limit).
+OCR_PDF_MAX_PAGES = env_int('OCR_PDF_MAX_PAGES', 50)
+OCR_PDF_MAX_SECONDS = env_int('OCR_PDF_MAX_SECONDS', 60)
+# PDF pages without a text layer are rasterized at this DPI and OCR'd (0 = leave them blank).
+OCR_SCAN_DPI = env_int('OCR_SCAN_DPI', 300)
+OCR_PAGE_CACHE_SECONDS = env_int('OCR_PAGE_CACHE_SECONDS', 604800)
+# Identical uploads reuse earlier OCR + Gemini output. Bump the engine version to invalidate it.
+EXTRACTION_CACHE_ENABLED = env_bool('EXTRACTION_CACHE_ENABLED', True)
+EXTRACTION_ENGINE_VERSION = env('EXTRACTION_ENGINE_VERSION', '1')
+# Defaults for `manage.py evict_extraction_cache` (0 = no limit).
+EXTRACTION_CACHE_TTL_DAYS = env_int('EXTRACTION_CACHE_TTL_DAYS', 90)
+EXTRACTION_CACHE_MAX_MB = env_int('EXTRACTION_CACHE_MAX_MB', 1024)
 
 import sentry_sdk
 from sentry_sdk.integrations.django import DjangoIntegration
 
+
 if SENTRY_DSN:
     sentry_sdk.init(
         dsn=SENTRY_DSN,
@@ -14,6 +14,13 @@ def env_bool(key: str, default: bool = False) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def env_int(key: str, default: int = 0) -> int:
+    value = os.getenv(key)
+    if value is None or not value.strip():
+        return default
+    return int(value)
+
+
 def env_list(key: str, default: Iterable[str] | None = None) -> List[str]:
     value = os.getenv(key)
     if not value:
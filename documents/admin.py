@@ -1,6 +1,12 @@
 from django.contrib import admin
 
-from documents.models import DocumentExtractionResult, ReceiptValidationResult
+from documents.models import (
+    DocumentExtractionResult,
+    ExtractionCache,
+    ExtractionJob,
+    ReceiptValidationResult,
+    StorageReplica,
+)
 
 
 @admin.register(DocumentExtractionResult)
@@ -14,3 +20,27 @@ class DocumentExtractionResultAdmin(admin.ModelAdmin):
 class ReceiptValidationResultAdmin(admin.ModelAdmin):
     list_display = ("purchase_request", "is_match", "score", "created_at")
     search_fields = ("purchase_request__title",)
+
+
+@admin.register(ExtractionJob)
+class ExtractionJobAdmin(admin.ModelAdmin):
+    list_display = ("purchase_request", "doc_type", "status", "attempts", "run_after", "created_at")
+    list_filter = ("status", "doc_type")
+    readonly_fields = ("last_error", "locked_by", "locked_at", "result")
+    exclude = ("payload",)
+
+
+@admin.register(ExtractionCache)
+class ExtractionCacheAdmin(admin.ModelAdmin):
+    list_display = ("content_hash", "doc_type", "engine_version", "hit_count", "last_used_at")
+    list_filter = ("doc_type", "engine_version")
+    search_fields = ("content_hash",)
+    readonly_fields = ("raw_text", "tokens", "structured_data")
+
+
+@admin.register(StorageReplica)
+class StorageReplicaAdmin(admin.ModelAdmin):
+    list_display = ("blob_name", "status", "attempts", "run_after", "replicated_at")
+    list_filter = ("status",)
+    search_fields = ("blob_name",)
+    readonly_fields = ("local_url", "remote_url", "last_error")
@@ -0,0 +1,60 @@
+import shutil
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.services import ocr
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare image OCR wall time: the old two Tesseract passes (image_to_string + "
+        "image_to_data) against the single image_to_data pass used by the extractor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--lines", type=int, default=30, help="Text lines on the receipt.")
+
+    def handle(self, *args, **options):
+        if not ocr.pytesseract or not shutil.which("tesseract"):
+            raise CommandError("pytesseract and the tesseract binary are required.")
+        image = self._receipt(options["lines"])
+
+        def two_pass():
+            ocr.pytesseract.image_to_string(image)
+            ocr.pytesseract.image_to_data(image, output_type="dict")
+
+        timings = {
+            "two passes": self._time(two_pass, options["repeat"]),
+            "single pass": self._time(lambda: ocr._ocr_image(image), options["repeat"]),
+        }
+        for label, seconds in timings.items():
+            self.stdout.write(f"{label:>12}: median {seconds * 1000:8.1f} ms")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Single pass takes {timings['single pass'] / timings['two passes']:.0%} "
+                "of the two-pass time."
+            )
+        )
+
+    @staticmethod
+    def _receipt(lines: int):
+        from PIL import Image, ImageDraw
+
+        image = Image.new("L", (1200, 40 * lines + 80), color=255)
+        draw = ImageDraw.Draw(image)
+        for n in range(lines):
+            line = f"Item {n:03d} Office supplies x{n % 5 + 1}  USD {n * 3.5:.2f}"
+            draw.text((60, 40 + 40 * n), line)
+        return image.resize((image.width * 2, image.height * 2))
+
+    @staticmethod
+    def _time(func, repeat: int) -> float:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - start)
+        return statistics.median(samples)
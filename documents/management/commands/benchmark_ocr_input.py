@@ -0,0 +1,133 @@
+import io
+import multiprocessing
+import random
+import resource
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.services import ocr
+
+
+MIB = 1024 * 1024
+
+
+def _legacy_extract(upload):
+    """The pre-zero-copy input path: read the upload, write it to a temp file, parse the copy."""
+
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as tmp:
+        tmp.write(upload.read())
+        tmp.flush()
+        upload.seek(0)
+        return ocr.extract_text_and_tokens(Path(tmp.name))
+
+
+def _peak_rss() -> int:
+    """Peak resident set size in bytes (``VmHWM``, resettable via ``_reset_peak_rss``)."""
+
+    for line in Path("/proc/self/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) * 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _reset_peak_rss() -> None:
+    # ru_maxrss survives fork+exec, so spawned children would start at the parent's peak.
+    try:
+        Path("/proc/self/clear_refs").write_text("5")
+    except OSError:  # not Linux: fall back to the (non-resettable) rusage high-water mark
+        pass
+
+
+def _measure(variant: str, kind: str, pdf_path: str, queue) -> None:
+    """Runs in a fresh process so allocator state from earlier cases does not leak in."""
+
+    import django
+    import pdfplumber  # noqa: F401 - keep import cost out of the measurement
+
+    django.setup()  # the OCR budget settings are read per document
+
+    _reset_peak_rss()
+    baseline = _peak_rss()
+    if kind == "memory":
+        # Like Django's MemoryFileUploadHandler: the BytesIO is filled chunk by chunk.
+        upload = io.BytesIO()
+        with open(pdf_path, "rb") as source:
+            while chunk := source.read(64 * 1024):
+                upload.write(chunk)
+        upload.name = "upload.pdf"
+        upload.seek(0)
+    else:
+        upload = open(pdf_path, "rb")
+    tracemalloc.start()
+    started = time.perf_counter()
+    if variant == "legacy":
+        _legacy_extract(upload)
+    else:
+        ocr.extract_text_and_tokens(upload)
+    elapsed = time.perf_counter() - started
+    _, python_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_peak = _peak_rss() - baseline
+    upload.close()
+    queue.put((elapsed, rss_peak, python_peak))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare peak RSS growth and time of the OCR input path for 1 MB and 10 MB PDFs: the "
+        "legacy read-and-copy-to-temp-file path versus opening the upload in place."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes-mb", type=int, nargs="+", default=[1, 10])
+
+    def handle(self, *args, **options):
+        context = multiprocessing.get_context("spawn")
+        with tempfile.TemporaryDirectory() as workdir:
+            for size_mb in options["sizes_mb"]:
+                pdf_path = Path(workdir) / f"bench-{size_mb}mb.pdf"
+                pdf_path.write_bytes(self._pdf(size_mb * MIB))
+                actual_mb = pdf_path.stat().st_size / MIB
+                for kind in ("memory", "disk"):
+                    results = []
+                    for variant in ("legacy", "zero-copy"):
+                        queue = context.Queue()
+                        worker = context.Process(
+                            target=_measure, args=(variant, kind, str(pdf_path), queue)
+                        )
+                        worker.start()
+                        worker.join()
+                        if worker.exitcode != 0:
+                            raise CommandError(f"{variant}/{kind} benchmark process failed.")
+                        elapsed, rss_peak, python_peak = queue.get()
+                        results.append(
+                            f"{variant} {elapsed * 1000:7.1f} ms, peak RSS +{rss_peak / MIB:5.1f} "
+                            f"MiB, Python heap peak {python_peak / MIB:5.1f} MiB"
+                        )
+                    self.stdout.write(f"{actual_mb:5.1f} MB {kind:>6}: " + " | ".join(results))
+
+    @staticmethod
+    def _pdf(target_bytes: int) -> bytes:
+        """One text page plus incompressible image data to reach roughly ``target_bytes``."""
+
+        from PIL import Image
+        from reportlab.lib.pagesizes import LETTER
+        from reportlab.lib.utils import ImageReader
+        from reportlab.pdfgen import canvas
+
+        # reportlab stores images Flate + ASCII85 encoded (~1.25x for incompressible noise).
+        side = max(int((target_bytes / 3.75) ** 0.5), 16)
+        noise = random.Random(0).randbytes(side * side * 3)
+        image = Image.frombytes("RGB", (side, side), noise)
+        buffer = io.BytesIO()
+        pdf = canvas.Canvas(buffer, pagesize=LETTER)
+        pdf.drawString(72, 720, "Proforma invoice INV-0001  Vendor: Benchmark Supplies Ltd")
+        pdf.drawString(72, 700, "Total: USD 1,234.00")
+        pdf.drawImage(ImageReader(image), 72, 72, width=400, height=400)
+        pdf.showPage()
+        pdf.save()
+        return buffer.getvalue()
@@ -0,0 +1,58 @@
+import shutil
+import statistics
+from collections import Counter
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.services import ocr
+
+
+def _overlap(words: list[str], reference: list[str]) -> float:
+    """Share of reference words (with multiplicity) that were recognised."""
+
+    if not reference:
+        return 1.0
+    return sum((Counter(words) & Counter(reference)).values()) / len(reference)
+
+
+class Command(BaseCommand):
+    help = (
+        "Rasterize and OCR the pages of a scanned PDF at several DPIs and report time per page "
+        "and word agreement, against --expected text or else the highest DPI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("pdf", type=Path)
+        parser.add_argument("--dpi", type=int, nargs="+", default=[150, 200, 300])
+        parser.add_argument("--pages", type=int, default=5, help="First N pages only.")
+        parser.add_argument("--expected", type=Path, help="Ground-truth text for the pages.")
+
+    def handle(self, *args, **options):
+        if not ocr.pytesseract or not shutil.which("tesseract"):
+            raise CommandError("pytesseract and the tesseract binary are required.")
+        if not options["pdf"].is_file():
+            raise CommandError(f"{options['pdf']} does not exist.")
+        with ocr.pdfplumber.open(options["pdf"]) as pdf:
+            pages = range(1, min(len(pdf.pages), options["pages"]) + 1)
+
+        runs = {}
+        for dpi in sorted(options["dpi"], reverse=True):
+            results = [ocr._scanned_page(str(options["pdf"]), n, dpi, None) for n in pages]
+            runs[dpi] = (
+                " ".join(text for text, _, _ in results).split(),
+                statistics.median(timings["rasterize"] for _, _, timings in results),
+                statistics.median(timings["tesseract"] for _, _, timings in results),
+            )
+
+        if options["expected"]:
+            reference, against = options["expected"].read_text().split(), "expected text"
+        else:
+            best = max(runs)
+            reference, against = runs[best][0], f"{best} dpi"
+        for dpi, (words, rasterize, tesseract) in sorted(runs.items()):
+            self.stdout.write(
+                f"{dpi:>4} dpi: rasterize {rasterize * 1000:7.1f} ms, tesseract "
+                f"{tesseract * 1000:7.1f} ms per page (median), {len(words):5d} words, "
+                f"{_overlap(words, reference):6.1%} of the {against}"
+            )
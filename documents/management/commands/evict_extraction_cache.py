@@ -0,0 +1,39 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from documents.services import extraction_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete extraction cache entries from older engine versions, entries unused for "
+        "--max-age-days, and least recently used entries beyond --max-mb."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-age-days",
+            type=int,
+            default=settings.EXTRACTION_CACHE_TTL_DAYS,
+            help="0 keeps entries regardless of age.",
+        )
+        parser.add_argument(
+            "--max-mb",
+            type=int,
+            default=settings.EXTRACTION_CACHE_MAX_MB,
+            help="0 keeps entries regardless of total size.",
+        )
+
+    def handle(self, *args, **options):
+        deleted = extraction_cache.evict(
+            max_age=timedelta(days=options["max_age_days"]) if options["max_age_days"] else None,
+            max_bytes=options["max_mb"] * 1024 * 1024 if options["max_mb"] else None,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Evicted {deleted['stale_version']} stale-version, {deleted['expired']} expired "
+                f"and {deleted['over_size']} over-size extraction cache entries."
+            )
+        )
@@ -0,0 +1,52 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from documents.services import replication, storage
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy blobs written by the local storage backend to STORAGE_REPLICA_BACKEND and point "
+        "extraction results, requests and purchase orders at the replicated URLs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain due blobs, then exit.")
+        parser.add_argument("--batch-size", type=int, default=50)
+        parser.add_argument(
+            "--poll-interval", type=float, default=5.0, help="Seconds to sleep when idle."
+        )
+        parser.add_argument(
+            "--delete-local",
+            action="store_true",
+            help="Remove the local copy once the URLs point at the replica.",
+        )
+
+    def handle(self, *args, **options):
+        if not settings.STORAGE_REPLICA_BACKEND:
+            raise CommandError("STORAGE_REPLICA_BACKEND is not set.")
+        source, target = storage.get_backend(), storage.get_replica_backend()
+        if not hasattr(source, "open"):
+            raise CommandError(f"{settings.STORAGE_BACKEND} cannot be read back for replication.")
+        replicated = failed = 0
+        try:
+            while True:
+                replicas = replication.claim(options["batch_size"])
+                if not replicas:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+                done, errors = replication.replicate(
+                    replicas, source=source, target=target, delete_local=options["delete_local"]
+                )
+                replicated += done
+                failed += errors
+                self.stdout.write(f"{done} replicated, {errors} failed")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            self.style.SUCCESS(f"Replicated {replicated} blobs ({failed} failed attempts).")
+        )
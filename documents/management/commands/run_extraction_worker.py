@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from documents.services import jobs
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued extraction jobs. Run as many workers as needed; each claims jobs with "
+        "SELECT ... FOR UPDATE SKIP LOCKED, so they never pick up the same upload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain due jobs, then exit.")
+        parser.add_argument(
+            "--max-jobs", type=int, default=0, help="Exit after N jobs (0 = no limit)."
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=2.0, help="Seconds to sleep when idle."
+        )
+        parser.add_argument(
+            "--requeue-dead",
+            action="store_true",
+            help="Move dead-lettered jobs back to the queue first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_dead"]:
+            self.stdout.write(f"Re-queued {jobs.requeue_dead()} dead-lettered jobs.")
+        worker = jobs.worker_name()
+        processed = 0
+        try:
+            while not options["max_jobs"] or processed < options["max_jobs"]:
+                job = jobs.claim_next(worker)
+                if job is None:
+                    if options["once"]:
+                        break
+                    time.sleep(options["poll_interval"])
+                    continue
+                job = jobs.process(job)
+                processed += 1
+                self.stdout.write(f"{job.pk} {job.doc_type}: {job.status} (attempt {job.attempts})")
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"{worker} processed {processed} extraction jobs."))
@@ -0,0 +1,25 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ('documents', '0001_initial'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='documentextractionresult',
+            index=models.Index(
+                fields=['purchase_request', 'doc_type', '-created_at'],
+                name='docext_request_type_idx',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='receiptvalidationresult',
+            index=models.Index(fields=['is_match', 'purchase_request'], name='receipt_match_request_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0003_extraction_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentextractionresult',
+            name='ocr_truncated',
+            field=models.BooleanField(default=False),
+        ),
+    ]
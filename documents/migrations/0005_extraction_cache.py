@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0004_extraction_ocr_truncated'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExtractionCache',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('doc_type', models.CharField(choices=[('proforma', 'Proforma'), ('po', 'Purchase Order'), ('receipt', 'Receipt')], max_length=20)),
+                ('engine_version', models.CharField(max_length=128)),
+                ('raw_text', models.TextField(blank=True)),
+                ('tokens', models.JSONField(blank=True, default=list)),
+                ('structured_data', models.JSONField(default=dict)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('hit_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='extraction_cache_lru_idx')],
+                'constraints': [models.UniqueConstraint(fields=('content_hash', 'doc_type', 'engine_version'), name='extraction_cache_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0005_extraction_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('blob_name', models.CharField(max_length=255, unique=True)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('public_url', models.URLField(max_length=500)),
+                ('content_type', models.CharField(blank=True, max_length=128)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
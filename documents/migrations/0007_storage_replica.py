@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0006_stored_blob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StorageReplica',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('blob_name', models.CharField(max_length=255, unique=True)),
+                ('content_type', models.CharField(blank=True, max_length=128)),
+                ('local_url', models.URLField(max_length=500)),
+                ('remote_url', models.URLField(blank=True, max_length=500)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=16)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('replicated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('status', 'pending')), fields=['run_after'], name='storage_replica_due_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('documents', '0007_storage_replica'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='documentextractionresult',
+            name='stage_timings',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
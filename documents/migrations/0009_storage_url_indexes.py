@@ -0,0 +1,22 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ("documents", "0008_extraction_stage_timings"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="documentextractionresult",
+            index=models.Index(fields=["firebase_url"], name="docext_firebase_url_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="storedblob",
+            index=models.Index(fields=["public_url"], name="stored_blob_public_url_idx"),
+        ),
+    ]
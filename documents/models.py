@@ -1,6 +1,8 @@
 import uuid
 
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class DocumentExtractionResult(models.Model):
@@ -23,10 +25,21 @@ class DocumentExtractionResult(models.Model):
     final_data = models.JSONField(default=dict)
     engine_used = models.CharField(max_length=64, default="baseline")
     confidence_score = models.FloatField(default=0.0)
+    ocr_truncated = models.BooleanField(default=False)
+    # Milliseconds per pipeline stage: cache, ocr, llm, upload, upload_wait, total.
+    stage_timings = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ('-created_at',)
+        indexes = [
+            models.Index(
+                fields=['purchase_request', 'doc_type', '-created_at'],
+                name='docext_request_type_idx',
+            ),
+            # Storage replication swaps local URLs for remote ones by value.
+            models.Index(fields=['firebase_url'], name='docext_firebase_url_idx'),
+        ]
 
     def __str__(self) -> str:
         return f"{self.purchase_request_id} - {self.doc_type} ({self.confidence_score:.2f})"
@@ -44,5 +57,173 @@ class ReceiptValidationResult(models.Model):
     details = models.JSONField(default=dict, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['is_match', 'purchase_request'], name='receipt_match_request_idx'),
+        ]
+
     def __str__(self) -> str:
         return f"Validation for request {self.purchase_request_id} ({self.score})"
+
+
+class ExtractionJob(models.Model):
+    """
+    A queued run of the extraction pipeline for one uploaded document.
+
+    Workers claim rows with ``SELECT ... FOR UPDATE SKIP LOCKED``; the upload itself travels in
+    ``payload`` so no broker or shared filesystem is needed, and is cleared once the job finishes.
+    """
+
+    class Status(models.TextChoices):
+        QUEUED = "queued", "Queued"
+        RUNNING = "running", "Running"
+        SUCCEEDED = "succeeded", "Succeeded"
+        DEAD = "dead", "Dead letter"
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    purchase_request = models.ForeignKey(
+        'procurement_app.PurchaseRequest',
+        on_delete=models.CASCADE,
+        related_name='extraction_jobs',
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='extraction_jobs',
+    )
+    doc_type = models.CharField(max_length=20, choices=DocumentExtractionResult.DocTypes.choices)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.QUEUED)
+    file_name = models.CharField(max_length=255, blank=True)
+    content_type = models.CharField(max_length=128, blank=True)
+    payload = models.BinaryField(editable=False)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    locked_by = models.CharField(max_length=128, blank=True)
+    last_error = models.TextField(blank=True)
+    result = models.ForeignKey(
+        DocumentExtractionResult,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ('-created_at',)
+        indexes = [
+            # Claim query: the oldest due job among the queued ones.
+            models.Index(
+                fields=['run_after'],
+                condition=models.Q(status='queued'),
+                name='extraction_job_due_idx',
+            ),
+            models.Index(fields=['status', 'locked_at'], name='extraction_job_status_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.purchase_request_id} - {self.doc_type} job ({self.status})"
+
+
+class ExtractionCache(models.Model):
+    """
+    OCR text, tokens and structured output for a document, keyed by its SHA-256.
+
+    ``engine_version`` covers the OCR/prompt revision and the Gemini model, so bumping
+    ``EXTRACTION_ENGINE_VERSION`` or switching models makes older rows unreachable; the
+    ``evict_extraction_cache`` command deletes them along with expired and least-recently
+    used entries.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    content_hash = models.CharField(max_length=64)
+    doc_type = models.CharField(max_length=20, choices=DocumentExtractionResult.DocTypes.choices)
+    engine_version = models.CharField(max_length=128)
+    raw_text = models.TextField(blank=True)
+    tokens = models.JSONField(default=list, blank=True)
+    structured_data = models.JSONField(default=dict)
+    size_bytes = models.PositiveIntegerField(default=0)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_hash', 'doc_type', 'engine_version'],
+                name='extraction_cache_key',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['last_used_at'], name='extraction_cache_lru_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.doc_type} {self.content_hash[:12]} ({self.engine_version})"
+
+
+class StoredBlob(models.Model):
+    """
+    Index of content-addressed blobs already in the storage bucket.
+
+    Lets ``storage.upload_file`` skip re-uploading a file it has stored before without asking
+    the bucket; a missing row only costs one existence check against the bucket.
+    """
+
+    id = models.BigAutoField(primary_key=True)
+    blob_name = models.CharField(max_length=255, unique=True)
+    content_hash = models.CharField(max_length=64)
+    public_url = models.URLField(max_length=500)
+    content_type = models.CharField(max_length=128, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['public_url'], name='stored_blob_public_url_idx'),
+        ]
+
+    def __str__(self) -> str:
+        return self.blob_name
+
+
+class StorageReplica(models.Model):
+    """
+    A blob saved by the local storage backend that still has to be copied to the replica
+    backend. Once ``replicate_storage`` has copied it, rows pointing at ``local_url`` are
+    switched to ``remote_url``.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        DONE = "done", "Done"
+        FAILED = "failed", "Failed"
+
+    id = models.BigAutoField(primary_key=True)
+    blob_name = models.CharField(max_length=255, unique=True)
+    content_type = models.CharField(max_length=128, blank=True)
+    local_url = models.URLField(max_length=500)
+    remote_url = models.URLField(max_length=500, blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    replicated_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['run_after'],
+                condition=models.Q(status='pending'),
+                name='storage_replica_due_idx',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.blob_name} ({self.status})"
@@ -1,16 +1,27 @@
 from __future__ import annotations
 
+import io
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
 from decimal import Decimal
 
-from django.db import transaction
+from django.conf import settings
+from django.db import connections, transaction
 
 from documents.models import DocumentExtractionResult
-from documents.services import llm, ocr, storage
+from documents.services import extraction_cache, hashing, llm, ocr, storage
 from procurement_app.models import PurchaseRequest, RequestItem
+from procurement_app.services.risk import RISK_FIELDS, apply_risk
+
 
 logger = logging.getLogger(__name__)
 
+# Storage uploads overlap OCR and Gemini on these threads; each closes its DB connection.
+_upload_executor = ThreadPoolExecutor(
+    max_workers=max(settings.EXTRACTION_UPLOAD_WORKERS, 1), thread_name_prefix="extraction-upload"
+)
+
 
 def _normalize_json(value):
     if isinstance(value, Decimal):
@@ -22,49 +33,193 @@ def _normalize_json(value):
     return value
 
 
+def _elapsed_ms(started: float) -> int:
+    return round((time.perf_counter() - started) * 1000)
+
+
+class _BufferReader(io.RawIOBase):
+    """A read-only file over a shared buffer, with a position of its own; nothing is copied."""
+
+    def __init__(self, buffer: memoryview, name: str, sha256: str):
+        self._view = buffer
+        self._position = 0
+        self.name = name
+        self.sha256 = sha256
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        chunk = self._view[self._position : self._position + len(target)]
+        target[: len(chunk)] = chunk
+        self._position += len(chunk)
+        return len(chunk)
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._position, io.SEEK_END: len(self._view)}
+        self._position = max(base[whence] + offset, 0)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        # Release the export so the upload's BytesIO can be freed.
+        if not self.closed:
+            self._view.release()
+        super().close()
+
+
+def _storage_handle(uploaded_file, digest: str):
+    """
+    The upload as seen by the storage thread, with a read position of its own so it never
+    races OCR. Spooled uploads are read by path; in-memory ones get a ``_BufferReader`` over
+    the same ``BytesIO`` buffer. Returns ``None`` for other streams, which are uploaded inline.
+    """
+
+    if hasattr(uploaded_file, "temporary_file_path"):
+        return uploaded_file
+    stream = getattr(uploaded_file, "file", uploaded_file)
+    if not isinstance(stream, io.BytesIO):
+        return None
+    name = getattr(uploaded_file, "name", None) or "document.bin"
+    return _BufferReader(stream.getbuffer(), name, digest)
+
+
+def _upload(file_obj, prefix: str) -> tuple[str, int]:
+    started = time.perf_counter()
+    return storage.upload_file(file_obj, prefix), _elapsed_ms(started)
+
+
+def _upload_in_thread(file_obj, prefix: str) -> tuple[str, int]:
+    try:
+        return _upload(file_obj, prefix)
+    finally:
+        if isinstance(file_obj, _BufferReader):
+            file_obj.close()
+        connections.close_all()
+
+
+def _settle_upload(upload, handle) -> None:
+    """Cancel an upload abandoned by a failed extraction, or wait for it if already running."""
+
+    if upload.cancel():
+        if isinstance(handle, _BufferReader):
+            handle.close()
+    else:
+        wait([upload])
+
+
 ####366.66667
-@transaction.atomic
 def extract_document(*, purchase_request: PurchaseRequest, doc_type: str, uploaded_file, update_request: bool = True) -> dict:
-    firebase_url = storage.upload_file(uploaded_file, f"documents/{doc_type}")
-    raw_text, _ = ocr.extract_text_and_tokens(uploaded_file)
-    raw_text = (raw_text or "").replace("\x00", "")
-    structured = llm.structure_document(raw_text, doc_type)
-    if not structured:
-        logger.warning("Gemini returned empty payload for doc_type=%s. Falling back to blank structure.", doc_type)
-        structured = {
-            "vendor_name": "",
-            "currency": "",
-            "document_date": "",
-            "total_amount": 0,
-            "items": [],
-            "terms": "",
-        }
-
-    final_data = _normalize_json(structured)
-    engine_label = "gemini" if structured else "ocr_only"
-    confidence = 0.9 if structured else 0.4
-
-    extraction = DocumentExtractionResult.objects.create(
-        purchase_request=purchase_request,
-        doc_type=doc_type,
-        firebase_url=firebase_url,
-        raw_text=raw_text,
-        baseline_data=final_data,
-        model_data=None,
-        final_data=final_data,
-        engine_used=engine_label,
-        confidence_score=confidence,
-    )
-
-    if doc_type == DocumentExtractionResult.DocTypes.PROFORMA:
-        purchase_request.proforma_url = firebase_url
-        purchase_request.save(update_fields=["proforma_url", "updated_at"])
-    if update_request and doc_type == DocumentExtractionResult.DocTypes.PROFORMA:
-        _apply_proforma_data(purchase_request, final_data)
-
-    if doc_type == DocumentExtractionResult.DocTypes.RECEIPT:
-        purchase_request.receipt_url = firebase_url
-        purchase_request.save(update_fields=["receipt_url", "updated_at"])
+    """
+    Upload, OCR and structure a document, then record the result.
+
+    The storage upload runs on ``_upload_executor`` while OCR and Gemini run here, and no
+    transaction is open during any of it; only the final writes share one short atomic block.
+    Stage durations (ms) are saved on the result's ``stage_timings``.
+    """
+
+    started = time.perf_counter()
+    timings = {}
+    digest = hashing.content_hash(uploaded_file)
+    prefix = f"documents/{doc_type}"
+    handle = None
+    if settings.EXTRACTION_UPLOAD_WORKERS > 0:
+        handle = _storage_handle(uploaded_file, digest)
+    if handle is not None:
+        upload = _upload_executor.submit(_upload_in_thread, handle, prefix)
+    else:
+        upload = None
+        firebase_url, timings["upload"] = _upload(uploaded_file, prefix)
+
+    # The upload may still be reading a view of the caller's buffer, so it is settled on every
+    # path out of here, before the caller gets to close the file.
+    try:
+        stage = time.perf_counter()
+        cached = extraction_cache.lookup(digest, doc_type)
+        timings["cache"] = _elapsed_ms(stage)
+        cacheable = False
+        if cached:
+            raw_text = cached.raw_text
+            structured = cached.structured_data
+            ocr_truncated = False
+        else:
+            stage = time.perf_counter()
+            raw_text, tokens, ocr_truncated = ocr.extract_text_and_tokens(uploaded_file)
+            timings["ocr"] = _elapsed_ms(stage)
+            if ocr_truncated:
+                logger.warning(
+                    "OCR budget reached for %s upload on request %s; using partial text.",
+                    doc_type,
+                    purchase_request.pk,
+                )
+            raw_text = (raw_text or "").replace("\x00", "")
+            stage = time.perf_counter()
+            structured = llm.structure_document(raw_text, doc_type)
+            timings["llm"] = _elapsed_ms(stage)
+            # Only complete runs are cached, so a re-upload after a Gemini failure or an OCR
+            # timeout tries again.
+            cacheable = bool(structured) and not ocr_truncated
+        if not structured:
+            logger.warning("Gemini returned empty payload for doc_type=%s. Falling back to blank structure.", doc_type)
+            structured = {
+                "vendor_name": "",
+                "currency": "",
+                "document_date": "",
+                "total_amount": 0,
+                "items": [],
+                "terms": "",
+            }
+
+        final_data = _normalize_json(structured)
+        engine_label = "gemini" if structured else "ocr_only"
+        confidence = 0.9 if structured else 0.4
+        if upload is not None:
+            stage = time.perf_counter()
+            firebase_url, timings["upload"] = upload.result()
+            timings["upload_wait"] = _elapsed_ms(stage)
+    finally:
+        if upload is not None and not upload.done():
+            _settle_upload(upload, handle)
+    timings["total"] = _elapsed_ms(started)
+
+    with transaction.atomic():
+        if cacheable:
+            extraction_cache.store(
+                digest,
+                doc_type,
+                extraction_cache.CachedExtraction(
+                    raw_text=raw_text, tokens=tokens, structured_data=final_data
+                ),
+            )
+        extraction = DocumentExtractionResult.objects.create(
+            purchase_request=purchase_request,
+            doc_type=doc_type,
+            firebase_url=firebase_url,
+            raw_text=raw_text,
+            baseline_data=final_data,
+            model_data=None,
+            final_data=final_data,
+            engine_used=engine_label,
+            confidence_score=confidence,
+            ocr_truncated=ocr_truncated,
+            stage_timings=timings,
+        )
+        storage.queue_replication(firebase_url)
+
+        if doc_type == DocumentExtractionResult.DocTypes.PROFORMA:
+            purchase_request.proforma_url = firebase_url
+            purchase_request.save(update_fields=["proforma_url", "updated_at"])
+        if update_request and doc_type == DocumentExtractionResult.DocTypes.PROFORMA:
+            _apply_proforma_data(purchase_request, final_data)
+
+        if doc_type == DocumentExtractionResult.DocTypes.RECEIPT:
+            purchase_request.receipt_url = firebase_url
+            purchase_request.save(update_fields=["receipt_url", "updated_at"])
 
     return extraction
 
@@ -88,6 +243,8 @@ def _apply_proforma_data(purchase_request: PurchaseRequest, data: dict):
             update_fields.append("amount_from_proforma")
         except Exception:
             logger.warning("Unable to coerce amount_from_proforma %s", total_amount)
+    if apply_risk(purchase_request):
+        update_fields.extend(RISK_FIELDS)
     if update_fields:
         update_fields.append("updated_at")
         purchase_request.save(update_fields=update_fields)
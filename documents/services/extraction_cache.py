@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import F, Sum, Window
+from django.utils import timezone
+from prometheus_client import Counter
+
+from documents.models import ExtractionCache
+
+
+logger = logging.getLogger(__name__)
+
+CACHE_REQUESTS = Counter(
+    "p2p_extraction_cache_requests_total",
+    "Extraction cache lookups by document type and result (hit, miss).",
+    ["doc_type", "result"],
+)
+
+
+@dataclass(frozen=True)
+class CachedExtraction:
+    raw_text: str
+    tokens: list
+    structured_data: dict
+
+
+def engine_version() -> str:
+    return f"{settings.EXTRACTION_ENGINE_VERSION}/{settings.GEMINI_MODEL_NAME}"
+
+
+def lookup(digest: str, doc_type: str) -> CachedExtraction | None:
+    if not settings.EXTRACTION_CACHE_ENABLED:
+        return None
+    entry = (
+        ExtractionCache.objects.filter(
+            content_hash=digest, doc_type=doc_type, engine_version=engine_version()
+        )
+        .only("id", "raw_text", "tokens", "structured_data")
+        .first()
+    )
+    if entry is None:
+        CACHE_REQUESTS.labels(doc_type=doc_type, result="miss").inc()
+        return None
+    CACHE_REQUESTS.labels(doc_type=doc_type, result="hit").inc()
+    ExtractionCache.objects.filter(pk=entry.pk).update(
+        hit_count=F("hit_count") + 1, last_used_at=timezone.now()
+    )
+    return CachedExtraction(
+        raw_text=entry.raw_text,
+        tokens=entry.tokens,
+        structured_data=entry.structured_data,
+    )
+
+
+def store(digest: str, doc_type: str, result: CachedExtraction) -> None:
+    if not settings.EXTRACTION_CACHE_ENABLED:
+        return
+    size = len(result.raw_text.encode()) + sum(
+        len(json.dumps(value)) for value in (result.tokens, result.structured_data)
+    )
+    # A concurrent upload of the same document may have stored it first; keep that row.
+    ExtractionCache.objects.bulk_create(
+        [
+            ExtractionCache(
+                content_hash=digest,
+                doc_type=doc_type,
+                engine_version=engine_version(),
+                raw_text=result.raw_text,
+                tokens=result.tokens,
+                structured_data=result.structured_data,
+                size_bytes=size,
+            )
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def evict(*, max_age: timedelta | None, max_bytes: int | None) -> dict[str, int]:
+    """
+    Delete entries from other engine versions, entries unused for ``max_age``, then the least
+    recently used ones until the rest fit in ``max_bytes``. Returns deleted counts per reason.
+    """
+
+    deleted = {}
+    deleted["stale_version"], _ = ExtractionCache.objects.exclude(
+        engine_version=engine_version()
+    ).delete()
+    deleted["expired"] = 0
+    if max_age is not None:
+        deleted["expired"], _ = ExtractionCache.objects.filter(
+            last_used_at__lt=timezone.now() - max_age
+        ).delete()
+    deleted["over_size"] = 0
+    if max_bytes is not None:
+        over = (
+            ExtractionCache.objects.annotate(
+                kept_bytes=Window(
+                    Sum("size_bytes"), order_by=[F("last_used_at").desc(), F("id").desc()]
+                )
+            )
+            .filter(kept_bytes__gt=max_bytes)
+            .values_list("id", flat=True)
+        )
+        deleted["over_size"], _ = ExtractionCache.objects.filter(id__in=list(over)).delete()
+    if any(deleted.values()):
+        logger.info("Evicted extraction cache entries: %s", deleted)
+    return deleted
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import hashlib
+import io
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_hash(file_obj) -> str:
+    """
+    SHA-256 of an upload. Uploads parsed by ``documents.upload_handlers`` carry the digest
+    computed while the request body streamed in; anything else is hashed in chunks.
+    """
+
+    digest = getattr(file_obj, "sha256", None)
+    if digest:
+        return digest
+    if isinstance(file_obj, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(file_obj).hexdigest()
+    if hasattr(file_obj, "temporary_file_path"):
+        with open(file_obj.temporary_file_path(), "rb") as handle:
+            return _hash_stream(handle)
+    stream = getattr(file_obj, "file", file_obj)
+    stream.seek(0)
+    try:
+        if isinstance(stream, io.BytesIO):
+            return hashlib.sha256(stream.getbuffer()).hexdigest()
+        return _hash_stream(stream)
+    finally:
+        stream.seek(0)
+
+
+def _hash_stream(stream) -> str:
+    hasher = hashlib.sha256()
+    while chunk := stream.read(HASH_CHUNK_SIZE):
+        hasher.update(chunk)
+    return hasher.hexdigest()
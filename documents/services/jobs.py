@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import logging
+import os
+import socket
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from core.security_logging import log_receipt_validation
+from documents.models import DocumentExtractionResult, ExtractionJob
+from documents.services import extraction, validation
+
+
+logger = logging.getLogger(__name__)
+
+# ``process`` and ``claim_next`` write only these, so the payload bytea is not rewritten.
+_FAILURE_FIELDS = ["status", "last_error", "locked_at", "run_after", "finished_at", "updated_at"]
+_SUCCESS_FIELDS = ["status", "result", "payload", "last_error", "finished_at", "updated_at"]
+
+
+def worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue(*, purchase_request, doc_type: str, uploaded_file, requested_by=None) -> ExtractionJob:
+    """Store the upload on a queued job; a worker runs the pipeline later."""
+
+    if hasattr(uploaded_file, "seek"):
+        uploaded_file.seek(0)
+    return ExtractionJob.objects.create(
+        purchase_request=purchase_request,
+        requested_by=requested_by,
+        doc_type=doc_type,
+        file_name=getattr(uploaded_file, "name", "") or "",
+        content_type=getattr(uploaded_file, "content_type", "") or "",
+        payload=uploaded_file.read(),
+        max_attempts=settings.EXTRACTION_JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim_next(worker: str | None = None) -> ExtractionJob | None:
+    """
+    Lock and mark as running the oldest due job, skipping rows other workers hold.
+
+    ``running`` jobs whose lease expired (the worker died mid-run) are claimable again, unless
+    that run used their last attempt; those are dead-lettered here instead.
+    """
+
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.EXTRACTION_JOB_LEASE_SECONDS)
+    with transaction.atomic():
+        while True:
+            job = (
+                ExtractionJob.objects.select_for_update(skip_locked=True)
+                .filter(
+                    Q(status=ExtractionJob.Status.QUEUED, run_after__lte=now)
+                    | Q(status=ExtractionJob.Status.RUNNING, locked_at__lt=stale)
+                )
+                .order_by("run_after")
+                .first()
+            )
+            if job is None:
+                return None
+            if job.status == ExtractionJob.Status.QUEUED or job.attempts < job.max_attempts:
+                break
+            logger.error(
+                "Extraction job %s lost its worker on its last attempt (%s/%s); dead-lettering",
+                job.pk,
+                job.attempts,
+                job.max_attempts,
+            )
+            job.status = ExtractionJob.Status.DEAD
+            job.last_error = f"Lease held by {job.locked_by} expired"
+            job.locked_at = None
+            job.finished_at = now
+            job.save(update_fields=_FAILURE_FIELDS)
+        job.status = ExtractionJob.Status.RUNNING
+        job.attempts += 1
+        job.locked_at = now
+        job.locked_by = worker or worker_name()
+        job.save(update_fields=["status", "attempts", "locked_at", "locked_by", "updated_at"])
+    return job
+
+
+def run_pipeline(purchase_request, doc_type: str, uploaded_file, actor=None):
+    """The extraction pipeline shared by the synchronous endpoints and the worker."""
+
+    is_receipt = doc_type == DocumentExtractionResult.DocTypes.RECEIPT
+    result = extraction.extract_document(
+        purchase_request=purchase_request,
+        doc_type=doc_type,
+        uploaded_file=uploaded_file,
+        update_request=not is_receipt,
+    )
+    if not is_receipt:
+        return result, None
+    receipt_validation = validation.record_receipt_validation(purchase_request, result.final_data)
+    if actor is not None:
+        log_receipt_validation(actor, purchase_request, receipt_validation)
+    return result, receipt_validation
+
+
+def process(job: ExtractionJob) -> ExtractionJob:
+    """Run a claimed job, then mark it succeeded, re-queue it with backoff, or dead-letter it."""
+
+    uploaded_file = ContentFile(bytes(job.payload), name=job.file_name or f"{job.doc_type}.bin")
+    try:
+        result, _ = run_pipeline(
+            job.purchase_request, job.doc_type, uploaded_file, actor=job.requested_by
+        )
+    except Exception as exc:
+        logger.exception(
+            "Extraction job %s failed (attempt %s/%s)", job.pk, job.attempts, job.max_attempts
+        )
+        job.last_error = f"{type(exc).__name__}: {exc}"
+        job.locked_at = None
+        update_fields = _FAILURE_FIELDS
+        if job.attempts >= job.max_attempts:
+            job.status = ExtractionJob.Status.DEAD
+            job.finished_at = timezone.now()
+        else:
+            delay = settings.EXTRACTION_JOB_RETRY_SECONDS * 2 ** (job.attempts - 1)
+            job.status = ExtractionJob.Status.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=delay)
+    else:
+        job.status = ExtractionJob.Status.SUCCEEDED
+        job.result = result
+        job.payload = b""
+        job.last_error = ""
+        job.finished_at = timezone.now()
+        update_fields = _SUCCESS_FIELDS
+    job.save(update_fields=update_fields)
+    return job
+
+
+def requeue_dead(queryset=None) -> int:
+    """Give dead-lettered jobs a fresh set of attempts."""
+
+    queryset = ExtractionJob.objects.all() if queryset is None else queryset
+    return queryset.filter(status=ExtractionJob.Status.DEAD).update(
+        status=ExtractionJob.Status.QUEUED,
+        attempts=0,
+        run_after=timezone.now(),
+        finished_at=None,
+        updated_at=timezone.now(),
+    )
@@ -1,11 +1,30 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import hashlib
+import io
 import logging
+import mmap
+import multiprocessing
+import os
 import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from contextlib import ExitStack, contextmanager
+from operator import itemgetter
 from pathlib import Path
 
+from django.conf import settings
+from django.core.cache import cache
+from prometheus_client import Counter, Histogram
+
+
 try:
     import pdfplumber
+    from pdfminer.pdftypes import resolve1
+    from pdfplumber.utils import cluster_objects
 except ImportError:  # pragma: no cover
     pdfplumber = None
 
@@ -23,77 +42,398 @@ except ImportError:  # pragma: no cover
     logger.warning("pytesseract is not installed; OCR for images will be limited.")
 
 
-def _as_temp_file(file_obj) -> Path:
+# Words Tesseract recognised with lower confidence (0-100) than this are treated as noise.
+MIN_WORD_CONFIDENCE = 10
+# Uploads already on disk at least this large are memory-mapped rather than read through a file.
+MMAP_MIN_BYTES = 4 * 1024 * 1024
+# Words whose tops are within this many points belong to the same text line (pdfplumber's default).
+LINE_TOLERANCE = 3
+
+# PDF user space is 72 points per inch; rasterized tokens are scaled back to it.
+POINTS_PER_INCH = 72
+
+SCANNED_PAGE_SECONDS = Histogram(
+    "p2p_ocr_scanned_page_seconds",
+    "Time to OCR one scanned PDF page, by stage (rasterize, tesseract) and DPI.",
+    ["stage", "dpi"],
+)
+SCANNED_PAGES = Counter(
+    "p2p_ocr_scanned_pages_total",
+    "Scanned PDF pages by outcome (ocr, cached, failed).",
+    ["result"],
+)
+
+_pdf_executor: ProcessPoolExecutor | None = None
+_pdf_executor_lock = threading.Lock()
+
+
+def _disk_path(file_obj) -> Path | None:
     if isinstance(file_obj, (str, Path)):
         return Path(file_obj)
-    suffix = ""
-    if hasattr(file_obj, "name") and isinstance(file_obj.name, str):
-        suffix = Path(file_obj.name).suffix
-    tmp = tempfile.NamedTemporaryFile(delete=False, suffix=suffix or None)
-    tmp.write(file_obj.read())
-    tmp.flush()
-    tmp.close()
-    file_obj.seek(0)
-    return Path(tmp.name)
-
-
-def extract_text_and_tokens(file_obj) -> tuple[str, list[dict]]:
+    if hasattr(file_obj, "temporary_file_path"):  # Django TemporaryUploadedFile
+        return Path(file_obj.temporary_file_path())
+    stream = getattr(file_obj, "file", file_obj)
+    name = getattr(stream, "name", None)
+    if isinstance(stream, io.BufferedReader) and isinstance(name, str) and os.path.isfile(name):
+        return Path(name)
+    return None
+
+
+def _ocr_image(image) -> tuple[str, list[dict]]:
+    """
+    Run Tesseract once and rebuild ``image_to_string``-style text from ``image_to_data``.
+
+    Words keep Tesseract's reading order: each recognised line becomes a text line and a new
+    block or paragraph is preceded by a blank line. Empty and low-confidence words are dropped.
+    """
+
+    data = pytesseract.image_to_data(image, output_type="dict")
+    lines: list[str] = []
+    tokens: list[dict] = []
+    words: list[str] = []
+    line_key = paragraph_key = None
+    for i, raw_word in enumerate(data["text"]):
+        word = (raw_word or "").strip()
+        if not word or float(data["conf"][i]) < MIN_WORD_CONFIDENCE:
+            continue
+        paragraph = (data["page_num"][i], data["block_num"][i], data["par_num"][i])
+        line = (*paragraph, data["line_num"][i])
+        if line != line_key:
+            if words:
+                lines.append(" ".join(words))
+                words = []
+            if paragraph_key is not None and paragraph != paragraph_key:
+                lines.append("")
+            line_key, paragraph_key = line, paragraph
+        words.append(word)
+        tokens.append(
+            {
+                "text": word,
+                "bbox": [
+                    data["left"][i],
+                    data["top"][i],
+                    data["left"][i] + data["width"][i],
+                    data["top"][i] + data["height"][i],
+                ],
+                "page": data["page_num"][i],
+            }
+        )
+    if words:
+        lines.append(" ".join(words))
+    return "\n".join(lines), tokens
+
+
+@contextmanager
+def _document_source(file_obj):
+    """
+    Yield ``(source, suffix)`` that pdfplumber and PIL can open without copying the upload.
+
+    Files already on disk (paths, ``TemporaryUploadedFile``) are opened in place and large ones
+    memory-mapped; in-memory uploads are handed over as their underlying ``BytesIO``.
+    """
+
+    if isinstance(file_obj, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(file_obj), ""
+        return
+    name = file_obj if isinstance(file_obj, (str, Path)) else getattr(file_obj, "name", None)
+    suffix = Path(name).suffix.lower() if isinstance(name, (str, Path)) else ""
+
+    path = _disk_path(file_obj)
+    if path is not None:
+        suffix = suffix or path.suffix.lower()
+        if path.stat().st_size < MMAP_MIN_BYTES:
+            yield path, suffix
+            return
+        with open(path, "rb") as handle, mmap.mmap(
+            handle.fileno(), 0, access=mmap.ACCESS_READ
+        ) as mapped:
+            yield mapped, suffix
+        return
+
+    stream = getattr(file_obj, "file", file_obj)
+    stream.seek(0)
+    try:
+        yield stream, suffix
+    finally:
+        stream.seek(0)
+
+
+def _page_hash(page) -> str:
+    """Fingerprint of what a page draws: its geometry, content streams and embedded images."""
+
+    digest = hashlib.sha256(repr((page.width, page.height, page.rotation)).encode())
+    for stream in page.page_obj.contents:
+        digest.update(resolve1(stream).get_rawdata() or b"")
+    for image in page.images:
+        digest.update(image["stream"].get_rawdata() or b"")
+    return digest.hexdigest()
+
+
+def _pdf_pages(source, start: int, stop: int, deadline: float | None):
+    """
+    Extract pages ``[start, stop)`` with one ``extract_words`` layout pass per page.
+
+    Line text is rebuilt from the words (grouped by ``top``, ordered by ``x0``), which gives
+    the same result as ``extract_text`` without a second layout pass. Stops before the next page
+    once ``deadline`` (a ``time.time()`` value) has passed. Runs in pool workers, where
+    ``source`` is a path. Returns ``(pages, tokens, finished)`` with ``pages`` as
+    ``(page number, text, scan hash)``; the hash is set only for pages that draw images or
+    curves but have no text layer, i.e. scans that need OCR.
+    """
+
+    pages: list[tuple[int, str, str | None]] = []
+    tokens: list[dict] = []
+    with pdfplumber.open(source) as pdf:
+        for page in pdf.pages[start:stop]:
+            if deadline is not None and time.time() >= deadline:
+                return pages, tokens, False
+            words = page.extract_words()
+            if not words:
+                scanned = bool(page.images or page.curves)
+                pages.append((page.page_number, "", _page_hash(page) if scanned else None))
+                continue
+            lines = cluster_objects(words, "top", LINE_TOLERANCE)
+            text = "\n".join(
+                " ".join(word["text"] for word in sorted(line, key=itemgetter("x0")))
+                for line in lines
+            )
+            pages.append((page.page_number, text, None))
+            tokens.extend(
+                {
+                    "text": word.get("text", ""),
+                    "bbox": [
+                        word.get("x0", 0),
+                        word.get("top", 0),
+                        word.get("x1", 0),
+                        word.get("bottom", 0),
+                    ],
+                    "page": page.page_number,
+                }
+                for word in words
+            )
+    return pages, tokens, True
+
+
+def _scanned_page(source, page_number: int, dpi: int, deadline: float | None):
+    """
+    Rasterize one page at ``dpi`` and OCR it; token boxes are scaled back to PDF points.
+
+    Runs in pool workers, where ``source`` is a path. Returns ``(text, tokens, timings)`` with
+    the rasterize and Tesseract seconds, or ``None`` when ``deadline`` has already passed.
+    """
+
+    if deadline is not None and time.time() >= deadline:
+        return None
+    started = time.perf_counter()
+    with pdfplumber.open(source, pages=[page_number]) as pdf:
+        image = pdf.pages[0].to_image(resolution=dpi).original
+    rasterized = time.perf_counter()
+    text, tokens = _ocr_image(image)
+    scale = POINTS_PER_INCH / dpi
+    for token in tokens:
+        token["bbox"] = [round(value * scale, 2) for value in token["bbox"]]
+        token["page"] = page_number
+    timings = {"rasterize": rasterized - started, "tesseract": time.perf_counter() - rasterized}
+    return text, tokens, timings
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor | None:
+    global _pdf_executor
+    if settings.OCR_PDF_WORKERS <= 0:
+        return None
+    with _pdf_executor_lock:
+        if _pdf_executor is None:
+            _pdf_executor = ProcessPoolExecutor(
+                max_workers=settings.OCR_PDF_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pdf_executor
+
+
+def shutdown_pdf_pool() -> None:
+    global _pdf_executor
+    with _pdf_executor_lock:
+        if _pdf_executor is not None:
+            _pdf_executor.shutdown(wait=True, cancel_futures=True)
+            _pdf_executor = None
+
+
+atexit.register(shutdown_pdf_pool)
+
+
+@contextmanager
+def _pool_path(source, path: Path | None):
+    """Workers open the PDF themselves; in-memory uploads are spilled to one temp file."""
+
+    if path is not None:
+        yield path
+        return
+    with tempfile.NamedTemporaryFile(suffix=".pdf") as spill:
+        source.seek(0)
+        spill.write(source.getbuffer() if isinstance(source, io.BytesIO) else source.read())
+        spill.flush()
+        yield Path(spill.name)
+
+
+def _ocr_scanned_pages(executor, source, worker_path, scanned, deadline):
+    """
+    OCR text-less pages, one page per pool task, reusing results cached by page hash.
+
+    ``scanned`` maps page hashes to page numbers; identical pages are OCR'd once. Returns
+    ``({page hash: (text, tokens)}, finished)``. Pages that fail to OCR are logged and left
+    blank rather than failing the document.
+    """
+
+    dpi = settings.OCR_SCAN_DPI
+    keys = {page_hash: f"ocr:page:{page_hash}:{dpi}" for page_hash in scanned}
+    cached = cache.get_many(keys.values())
+    results = {page_hash: cached[key] for page_hash, key in keys.items() if key in cached}
+    SCANNED_PAGES.labels(result="cached").inc(len(results))
+    missing = [page_hash for page_hash in scanned if page_hash not in results]
+    if not missing:
+        return results, True
+
+    if executor is None or len(missing) == 1:
+        outcomes = {}
+        for page_hash in missing:
+            try:
+                outcomes[page_hash] = _scanned_page(source, scanned[page_hash], dpi, deadline)
+            except Exception as exc:
+                outcomes[page_hash] = exc
+    else:
+        pdf_path = worker_path()
+        futures = {
+            page_hash: executor.submit(
+                _scanned_page, pdf_path, scanned[page_hash], dpi, deadline
+            )
+            for page_hash in missing
+        }
+        timeout = None if deadline is None else max(deadline - time.time(), 0) + 5
+        wait(futures.values(), timeout=timeout)
+        outcomes = {}
+        for page_hash, future in futures.items():
+            if not future.done():
+                future.cancel()
+                outcomes[page_hash] = None
+            else:
+                outcomes[page_hash] = future.exception() or future.result()
+
+    finished = True
+    for page_hash, outcome in outcomes.items():
+        page_number = scanned[page_hash]
+        if outcome is None:
+            finished = False
+            continue
+        if isinstance(outcome, Exception):
+            SCANNED_PAGES.labels(result="failed").inc()
+            logger.warning("OCR of scanned PDF page %s failed: %s", page_number, outcome)
+            continue
+        text, tokens, timings = outcome
+        SCANNED_PAGES.labels(result="ocr").inc()
+        for stage, seconds in timings.items():
+            SCANNED_PAGE_SECONDS.labels(stage=stage, dpi=str(dpi)).observe(seconds)
+        logger.info(
+            "OCR'd scanned PDF page %s at %s dpi: rasterize %.0f ms, tesseract %.0f ms, %s words",
+            page_number,
+            dpi,
+            timings["rasterize"] * 1000,
+            timings["tesseract"] * 1000,
+            len(tokens),
+        )
+        results[page_hash] = (text, tokens)
+        cache.set(keys[page_hash], (text, tokens), settings.OCR_PAGE_CACHE_SECONDS)
+    return results, finished
+
+
+def _extract_pdf(source, path: Path | None) -> tuple[str, list[dict], bool]:
+    max_seconds = settings.OCR_PDF_MAX_SECONDS
+    deadline = time.time() + max_seconds if max_seconds else None
+    with pdfplumber.open(source) as pdf:
+        page_count = len(pdf.pages)
+    pages = min(page_count, settings.OCR_PDF_MAX_PAGES or page_count)
+    truncated = pages < page_count
+    per_task = max(settings.OCR_PDF_PAGES_PER_TASK, 1)
+
+    executor = _get_pdf_executor()
+    with ExitStack() as stack:
+        # In-memory uploads are spilled to disk at most once, and only if workers need them.
+        worker_path = functools.cache(
+            lambda: str(stack.enter_context(_pool_path(source, path)))
+        )
+        if executor is None or pages <= per_task:
+            page_texts, tokens, finished = _pdf_pages(source, 0, pages, deadline)
+            truncated = truncated or not finished
+        else:
+            page_texts, tokens = [], []
+            ranges = [(start, min(start + per_task, pages)) for start in range(0, pages, per_task)]
+            futures = [
+                executor.submit(_pdf_pages, worker_path(), start, stop, deadline)
+                for start, stop in ranges
+            ]
+            # Workers stop at the deadline between pages; the grace covers the page in flight.
+            timeout = None if deadline is None else max(deadline - time.time(), 0) + 5
+            wait(futures, timeout=timeout)
+            for future in futures:  # merged in page order
+                if not future.done():
+                    future.cancel()
+                    truncated = True
+                    continue
+                range_pages, range_tokens, finished = future.result()
+                page_texts.extend(range_pages)
+                tokens.extend(range_tokens)
+                truncated = truncated or not finished
+
+        scanned = {page_hash: number for number, _, page_hash in page_texts if page_hash}
+        ocr_results = {}
+        if scanned and settings.OCR_SCAN_DPI > 0:
+            if not pytesseract:
+                logger.warning("%s scanned PDF page(s) skipped: pytesseract missing.", len(scanned))
+            else:
+                ocr_results, finished = _ocr_scanned_pages(
+                    executor, source, worker_path, scanned, deadline
+                )
+                truncated = truncated or not finished
+
+    texts = []
+    for number, text, page_hash in page_texts:
+        if page_hash in ocr_results:
+            text, page_tokens = ocr_results[page_hash]
+            tokens.extend({**token, "page": number} for token in page_tokens)
+        texts.append(text)
+    if ocr_results:
+        tokens.sort(key=itemgetter("page"))  # stable: keeps word order within a page
+    return "\n".join(texts), tokens, truncated
+
+
+def extract_text_and_tokens(file_obj) -> tuple[str, list[dict], bool]:
     """
     Extract raw text and positional tokens from PDFs/images.
+
+    The third value is ``True`` when a PDF hit the ``OCR_PDF_MAX_PAGES`` or
+    ``OCR_PDF_MAX_SECONDS`` budget and only some of its pages were read.
     """
 
     if not pdfplumber and not pytesseract:
         raise RuntimeError("pdfplumber or pytesseract is required for OCR operations.")
 
-    path = _as_temp_file(file_obj)
     tokens: list[dict] = []
     text_chunks: list[str] = []
+    truncated = False
 
-    try:
-        suffix = path.suffix.lower()
+    with _document_source(file_obj) as (source, suffix):
         if suffix == ".pdf":
             if not pdfplumber:
                 raise RuntimeError("pdfplumber is required for PDF extraction.")
-            with pdfplumber.open(path) as pdf:
-                for page in pdf.pages:
-                    text_chunks.append(page.extract_text() or "")
-                    for word in page.extract_words():
-                        tokens.append(
-                            {
-                                "text": word.get("text", ""),
-                                "bbox": [
-                                    word.get("x0", 0),
-                                    word.get("top", 0),
-                                    word.get("x1", 0),
-                                    word.get("bottom", 0),
-                                ],
-                                "page": page.page_number,
-                            }
-                        )
+            text, tokens, truncated = _extract_pdf(source, _disk_path(file_obj))
+            text_chunks.append(text)
         else:
             if not pytesseract or not Image:
                 raise RuntimeError("pytesseract and Pillow are required for non-PDF OCR")
             try:
-                image = Image.open(path)
+                image = Image.open(source)
             except Exception as exc:  # pragma: no cover - fallback to informative error
                 raise RuntimeError(f"Unable to open document as image for OCR: {exc}") from exc
-            text_chunks.append(pytesseract.image_to_string(image))
-            ocr_data = pytesseract.image_to_data(image, output_type="dict")
-            for i in range(len(ocr_data["text"])):
-                tokens.append(
-                    {
-                        "text": ocr_data["text"][i],
-                        "bbox": [
-                            ocr_data["left"][i],
-                            ocr_data["top"][i],
-                            ocr_data["left"][i] + ocr_data["width"][i],
-                            ocr_data["top"][i] + ocr_data["height"][i],
-                        ],
-                        "page": 1,
-                    }
-                )
-    finally:
-        if path.exists() and path.name.startswith("tmp"):
-            path.unlink()
+            text, tokens = _ocr_image(image)
+            text_chunks.append(text)
 
-    return "\n".join(text_chunks).strip(), tokens
+    return "\n".join(text_chunks).strip(), tokens, truncated
@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, URLField, Value, When
+from django.utils import timezone
+
+from documents.models import DocumentExtractionResult, StorageReplica, StoredBlob
+from procurement_app.models import PurchaseOrder, PurchaseRequest
+
+
+logger = logging.getLogger(__name__)
+
+# Every column that can hold a URL returned by ``storage.upload_file``.
+URL_COLUMNS = (
+    (DocumentExtractionResult, "firebase_url"),
+    (PurchaseRequest, "proforma_url"),
+    (PurchaseRequest, "receipt_url"),
+    (PurchaseRequest, "purchase_order_url"),
+    (PurchaseOrder, "firebase_url"),
+)
+# The content-addressed index is swapped too, but only mirrors the columns above: a blob that is
+# only indexed is not referenced yet.
+INDEX_COLUMNS = ((StoredBlob, "public_url"),)
+
+
+def enqueue(blob_name: str, local_url: str, content_type: str | None) -> None:
+    """
+    Queue a locally saved blob for replication.
+
+    Called through ``storage.queue_replication`` once the rows that reference ``local_url``
+    have committed, so the blob is due straight away. A content-addressed blob can be referenced
+    again after its replica finished (and its local copy was deleted); the replica is re-opened
+    so the new row is swapped too. It keeps its ``remote_url``, so nothing is copied again.
+    """
+
+    StorageReplica.objects.bulk_create(
+        [
+            StorageReplica(
+                blob_name=blob_name,
+                local_url=local_url,
+                content_type=content_type or "",
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    StorageReplica.objects.filter(blob_name=blob_name, status=StorageReplica.Status.DONE).update(
+        status=StorageReplica.Status.PENDING, attempts=0, run_after=timezone.now()
+    )
+
+
+def claim(batch_size: int) -> list[StorageReplica]:
+    """
+    Take up to ``batch_size`` due replicas, skipping rows other replicators hold.
+
+    Claimed rows are leased by pushing ``run_after`` out by the replication lease, so the copy
+    itself happens outside any transaction and a crashed replicator's rows come back.
+    """
+
+    now = timezone.now()
+    with transaction.atomic():
+        replicas = list(
+            StorageReplica.objects.select_for_update(skip_locked=True)
+            .filter(status=StorageReplica.Status.PENDING, run_after__lte=now)
+            .order_by("run_after")[:batch_size]
+        )
+        if replicas:
+            StorageReplica.objects.filter(pk__in=[replica.pk for replica in replicas]).update(
+                attempts=F("attempts") + 1,
+                run_after=now + timedelta(seconds=settings.STORAGE_REPLICATION_LEASE_SECONDS),
+            )
+    for replica in replicas:
+        replica.attempts += 1
+    return replicas
+
+
+def swap_urls(urls: dict[str, str]) -> set[str]:
+    """
+    Point every row that references one of the old (local) URLs at its new URL.
+
+    Returns the old URLs that at least one row now references through the new URL, including
+    rows swapped by an earlier pass.
+    """
+
+    if not urls:
+        return set()
+    for model, column in URL_COLUMNS + INDEX_COLUMNS:
+        whens = [When(**{column: old}, then=Value(new)) for old, new in urls.items()]
+        model.objects.filter(**{f"{column}__in": list(urls)}).update(
+            **{column: Case(*whens, default=F(column), output_field=URLField())}
+        )
+    old_urls = {new: old for old, new in urls.items()}
+    swapped = set()
+    for model, column in URL_COLUMNS:
+        rows = model.objects.filter(**{f"{column}__in": list(old_urls)})
+        swapped.update(old_urls[url] for url in rows.values_list(column, flat=True).distinct())
+    return swapped
+
+
+def _retry_later(replica: StorageReplica, error: str) -> None:
+    replica.last_error = error
+    if replica.attempts >= settings.STORAGE_REPLICATION_MAX_ATTEMPTS:
+        replica.status = StorageReplica.Status.FAILED
+    else:
+        delay = settings.STORAGE_REPLICATION_RETRY_SECONDS * 2 ** (replica.attempts - 1)
+        replica.run_after = timezone.now() + timedelta(seconds=delay)
+
+
+def replicate(
+    replicas: list[StorageReplica], *, source, target, delete_local: bool = False
+) -> tuple[int, int]:
+    """
+    Copy claimed replicas from the ``source`` backend (local) to ``target``, then swap URLs for
+    the ones that made it.
+
+    A replica is done only once at least one row points at its remote URL; until then it is
+    rescheduled and the local copy is kept. Failures are retried with exponential backoff from
+    ``STORAGE_REPLICATION_RETRY_SECONDS`` until ``STORAGE_REPLICATION_MAX_ATTEMPTS``. Returns
+    ``(replicated, failed)``.
+    """
+
+    copied, failed = [], []
+    for replica in replicas:
+        if replica.remote_url:
+            # Copied on an earlier pass that found nothing to swap.
+            copied.append(replica)
+            continue
+        try:
+            with source.open(replica.blob_name) as handle:
+                replica.remote_url = target.save(
+                    handle, replica.blob_name, replica.content_type or None
+                )
+        except Exception as exc:
+            logger.warning(
+                "Replicating %s failed (attempt %s): %s", replica.blob_name, replica.attempts, exc
+            )
+            _retry_later(replica, f"{type(exc).__name__}: {exc}")
+            failed.append(replica)
+        else:
+            copied.append(replica)
+
+    done = []
+    with transaction.atomic():
+        swapped = swap_urls({replica.local_url: replica.remote_url for replica in copied})
+        for replica in copied:
+            if replica.local_url in swapped:
+                replica.status = StorageReplica.Status.DONE
+                replica.replicated_at = timezone.now()
+                replica.last_error = ""
+                done.append(replica)
+            else:
+                _retry_later(replica, "No row references the local URL yet.")
+                failed.append(replica)
+        StorageReplica.objects.bulk_update(
+            replicas,
+            ["remote_url", "status", "run_after", "last_error", "replicated_at"],
+        )
+    if delete_local:
+        for replica in done:
+            source.delete(replica.blob_name)
+    return len(done), len(failed)
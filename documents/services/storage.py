@@ -2,9 +2,22 @@ from __future__ import annotations
 
 import io
 import mimetypes
+import os
+import shutil
+import tempfile
 import uuid
+from functools import partial
+from pathlib import Path
+from urllib.parse import quote, unquote, urljoin
 
 from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+from prometheus_client import Counter
+
+from documents.models import StoredBlob
+from documents.services import hashing, replication
+
 
 try:
     import firebase_admin
@@ -15,6 +28,15 @@ except ImportError:  # pragma: no cover
     storage = None
 
 _firebase_app = None
+# (pid, bucket): the handle and its HTTP session are reused within a process, never across forks.
+_bucket_handle = None
+
+UPLOADS = Counter(
+    "p2p_storage_uploads_total",
+    "Storage writes by result: uploaded, or skipped because the content-addressed blob was "
+    "already indexed or already in the bucket.",
+    ["result"],
+)
 
 
 def _initialize_app():
@@ -34,35 +56,213 @@ def _initialize_app():
     return _firebase_app
 
 
+def _bucket():
+    global _bucket_handle
+    pid = os.getpid()
+    if _bucket_handle is None or _bucket_handle[0] != pid:
+        _initialize_app()
+        _bucket_handle = (pid, storage.bucket())
+    return _bucket_handle[1]
+
+
 def _guess_content_type(filename: str, default: str = "application/octet-stream") -> str:
     content_type, _ = mimetypes.guess_type(filename)
     return content_type or default
 
 
+def _stream_size(stream) -> int:
+    if isinstance(stream, io.BytesIO):
+        return stream.getbuffer().nbytes
+    position = stream.tell()
+    size = stream.seek(0, io.SEEK_END)
+    stream.seek(position)
+    return size
+
+
+def _send(blob, file_obj, content_type: str | None) -> None:
+    """
+    Stream the upload to ``blob``. Files larger than one chunk go up as a resumable upload read
+    ``STORAGE_UPLOAD_CHUNK_MB`` at a time, so memory per upload is bounded by the chunk size.
+    """
+
+    chunk_size = settings.STORAGE_UPLOAD_CHUNK_MB * 1024 * 1024
+    if hasattr(file_obj, "temporary_file_path"):
+        # Already spooled to disk by Django: the client reads it from the path.
+        path = file_obj.temporary_file_path()
+        if os.path.getsize(path) > chunk_size:
+            blob.chunk_size = chunk_size
+        blob.upload_from_filename(path, content_type=content_type)
+        return
+    if isinstance(file_obj, (bytes, bytearray, memoryview)):
+        file_obj = io.BytesIO(file_obj)
+    stream = getattr(file_obj, "file", file_obj)
+    stream.seek(0)
+    size = _stream_size(stream)
+    if size > chunk_size:
+        blob.chunk_size = chunk_size
+    try:
+        blob.upload_from_file(stream, size=size, content_type=content_type)
+    finally:
+        stream.seek(0)
+
+
+def _publish(blob) -> None:
+    # With bucket-level public access the object URL works as soon as the upload finishes.
+    if settings.STORAGE_PUBLIC_ACCESS == "object":
+        blob.make_public()
+
+
+class FirebaseStorage:
+    """The Firebase Storage bucket; uploads stream in chunks and URLs are public."""
+
+    def exists(self, blob_name: str) -> bool:
+        return _bucket().blob(blob_name).exists()
+
+    def save(self, file_obj, blob_name: str, content_type: str | None) -> str:
+        blob = _bucket().blob(blob_name)
+        _send(blob, file_obj, content_type)
+        _publish(blob)
+        return blob.public_url
+
+    def url(self, blob_name: str) -> str:
+        blob = _bucket().blob(blob_name)
+        _publish(blob)
+        return blob.public_url
+
+
+class LocalStorage:
+    """
+    Files under ``STORAGE_LOCAL_ROOT``, addressed as ``STORAGE_LOCAL_URL`` + blob name.
+
+    Needs no credentials or network, so CI and offline development can run the whole pipeline.
+    With ``STORAGE_REPLICA_BACKEND`` set, callers hand the URLs they save to
+    ``queue_replication`` so ``replicate_storage`` copies the files.
+    """
+
+    def path(self, blob_name: str) -> Path:
+        root = Path(settings.STORAGE_LOCAL_ROOT).resolve()
+        path = (root / blob_name).resolve()
+        if not path.is_relative_to(root):
+            raise ValueError(f"Blob name escapes the storage root: {blob_name}")
+        return path
+
+    def exists(self, blob_name: str) -> bool:
+        return self.path(blob_name).is_file()
+
+    def open(self, blob_name: str):
+        return open(self.path(blob_name), "rb")
+
+    def save(self, file_obj, blob_name: str, content_type: str | None) -> str:
+        path = self.path(blob_name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name and renamed, so a half-written file is never served.
+        with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp:
+            try:
+                if hasattr(file_obj, "temporary_file_path"):
+                    with open(file_obj.temporary_file_path(), "rb") as source:
+                        shutil.copyfileobj(source, tmp)
+                elif isinstance(file_obj, (bytes, bytearray, memoryview)):
+                    tmp.write(file_obj)
+                else:
+                    stream = getattr(file_obj, "file", file_obj)
+                    stream.seek(0)
+                    shutil.copyfileobj(stream, tmp)
+                    stream.seek(0)
+            except BaseException:
+                os.unlink(tmp.name)
+                raise
+        os.chmod(tmp.name, 0o644)
+        os.replace(tmp.name, path)
+        return self.url(blob_name)
+
+    def url(self, blob_name: str) -> str:
+        return urljoin(settings.STORAGE_LOCAL_URL, quote(blob_name))
+
+    def delete(self, blob_name: str) -> None:
+        self.path(blob_name).unlink(missing_ok=True)
+
+
+def get_backend():
+    return import_string(settings.STORAGE_BACKEND)()
+
+
+def get_replica_backend():
+    return import_string(settings.STORAGE_REPLICA_BACKEND)()
+
+
+def _upload_content_addressed(backend, file_obj, prefix: str, extension: str, content_type) -> str:
+    digest = hashing.content_hash(file_obj)
+    blob_name = f"{prefix.rstrip('/')}/{digest}.{extension or 'bin'}"
+    public_url = (
+        StoredBlob.objects.filter(blob_name=blob_name).values_list("public_url", flat=True).first()
+    )
+    if public_url:
+        UPLOADS.labels(result="indexed").inc()
+        return public_url
+    if backend.exists(blob_name):
+        # Stored before, but the index row is missing (e.g. its transaction rolled back).
+        public_url = backend.url(blob_name)
+        UPLOADS.labels(result="existing").inc()
+    else:
+        public_url = backend.save(file_obj, blob_name, content_type)
+        UPLOADS.labels(result="uploaded").inc()
+    StoredBlob.objects.bulk_create(
+        [
+            StoredBlob(
+                blob_name=blob_name,
+                content_hash=digest,
+                public_url=public_url,
+                content_type=content_type or "",
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    return public_url
+
+
 def upload_file(file_obj, prefix: str, content_type: str | None = None) -> str:
     """
-    Upload file-like object to Firebase Storage and return a public URL.
+    Store a file-like object with the ``STORAGE_BACKEND`` and return its public URL.
+
+    With ``STORAGE_CONTENT_ADDRESSED`` the blob is named after the content's SHA-256, and content
+    that is already stored under ``prefix`` is not uploaded again; its URL is returned instead.
     """
 
-    _initialize_app()
-    bucket = storage.bucket()
+    backend = get_backend()
     extension = ""
     if hasattr(file_obj, "name") and isinstance(file_obj.name, str) and "." in file_obj.name:
         extension = file_obj.name.rsplit(".", 1)[-1]
-    blob_name = f"{prefix.rstrip('/')}/{uuid.uuid4().hex}.{extension or 'bin'}"
-    blob = bucket.blob(blob_name)
-    data = file_obj.read() if hasattr(file_obj, "read") else file_obj
     if content_type is None and hasattr(file_obj, "name"):
         content_type = _guess_content_type(file_obj.name)
-    blob.upload_from_string(data, content_type=content_type)
-    blob.make_public()
-    if hasattr(file_obj, "seek"):
-        file_obj.seek(0)
-    return blob.public_url
+    if settings.STORAGE_CONTENT_ADDRESSED:
+        return _upload_content_addressed(backend, file_obj, prefix, extension, content_type)
+    blob_name = f"{prefix.rstrip('/')}/{uuid.uuid4().hex}.{extension or 'bin'}"
+    url = backend.save(file_obj, blob_name, content_type)
+    UPLOADS.labels(result="uploaded").inc()
+    return url
+
+
+def queue_replication(*urls: str) -> None:
+    """
+    Queue the local blobs behind ``urls`` for ``replicate_storage`` once the current transaction
+    commits.
+
+    Call it in the transaction that writes the URLs to their rows, so the replicator never runs
+    before a row references the blob. URLs outside ``STORAGE_LOCAL_URL`` are ignored.
+    """
+
+    if not settings.STORAGE_REPLICA_BACKEND:
+        return
+    for url in urls:
+        if not url or not url.startswith(settings.STORAGE_LOCAL_URL):
+            continue
+        blob_name = unquote(url.removeprefix(settings.STORAGE_LOCAL_URL))
+        transaction.on_commit(
+            partial(replication.enqueue, blob_name, url, _guess_content_type(blob_name))
+        )
 
 
 def upload_bytes(data: bytes, prefix: str, filename: str = "document.pdf", content_type: str | None = None) -> str:
-    _initialize_app()
     file_obj = io.BytesIO(data)
     file_obj.name = filename
     content_type = content_type or _guess_content_type(filename, default="application/pdf")
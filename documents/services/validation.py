@@ -4,6 +4,7 @@ import difflib
 from decimal import Decimal
 from typing import Dict, List
 
+from documents.models import ReceiptValidationResult
 from documents.services import llm
 
 
@@ -76,3 +77,15 @@ def validate_receipt_against_po(po_data: Dict, receipt_data: Dict) -> Dict:
     if llm_summary:
         details["llm_analysis"] = llm_summary
     return {"is_match": score >= 0.8, "score": round(score, 2), "details": details}
+
+
+def record_receipt_validation(purchase_request, receipt_data: Dict):
+    """Validate ``receipt_data`` against the request's PO and store the latest result."""
+
+    po_data = purchase_request.purchase_order.structured_data or {}
+    payload = validate_receipt_against_po(po_data, receipt_data)
+    validation, _ = ReceiptValidationResult.objects.update_or_create(
+        purchase_request=purchase_request,
+        defaults=payload,
+    )
+    return validation
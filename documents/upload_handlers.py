@@ -0,0 +1,37 @@
+"""
+Upload handlers that fingerprint files while Django streams the request body.
+
+They replace Django's defaults in ``FILE_UPLOAD_HANDLERS``; each uploaded file gets a
+``sha256`` attribute, so the extraction cache and content-addressed storage never read the
+upload a second time just to hash it.
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import MemoryFileUploadHandler, TemporaryFileUploadHandler
+
+
+class Sha256Mixin:
+    def new_file(self, *args, **kwargs):
+        self._sha256 = hashlib.sha256()
+        return super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        # The memory handler passes files over its size limit on to the next handler.
+        if getattr(self, "activated", True):
+            self._sha256.update(raw_data)
+        return super().receive_data_chunk(raw_data, start)
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.sha256 = self._sha256.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(Sha256Mixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(Sha256Mixin, TemporaryFileUploadHandler):
+    pass
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Approval, PurchaseOrder, PurchaseRequest, RequestItem
+from .models import Approval, EmailOutbox, PurchaseOrder, PurchaseRequest, RequestItem
 
 
 class RequestItemInline(admin.TabularInline):
@@ -25,5 +25,20 @@ class ApprovalAdmin(admin.ModelAdmin):
 
 @admin.register(PurchaseOrder)
 class PurchaseOrderAdmin(admin.ModelAdmin):
-    list_display = ("po_number", "purchase_request", "vendor_name", "currency", "total_amount")
+    list_display = (
+        "po_number",
+        "purchase_request",
+        "vendor_name",
+        "currency",
+        "total_amount",
+        "pdf_status",
+    )
+    list_filter = ("pdf_status",)
     search_fields = ("po_number", "vendor_name")
+
+
+@admin.register(EmailOutbox)
+class EmailOutboxAdmin(admin.ModelAdmin):
+    list_display = ("event_key", "recipient", "status", "attempts", "next_attempt_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("event_key", "recipient")
@@ -1,5 +1,10 @@
 from django.apps import AppConfig
 
+
 class ProcurementAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'procurement_app'
+
+    def ready(self):
+        # Import signal handlers
+        from . import signals  # noqa: F401
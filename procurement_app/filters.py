@@ -1,6 +1,10 @@
 import django_filters
+from django.contrib.postgres.search import SearchRank
+from django.db.models import F
+from rest_framework.filters import SearchFilter
 
 from procurement_app.models import PurchaseRequest
+from procurement_app.services.search import build_search_query
 
 
 class PurchaseRequestFilter(django_filters.FilterSet):
@@ -11,4 +15,27 @@ class PurchaseRequestFilter(django_filters.FilterSet):
 
     class Meta:
         model = PurchaseRequest
-        fields = ["status", "vendor_name", "reference", "created_from", "created_to"]
+        fields = ["status", "risk_level", "vendor_name", "reference", "created_from", "created_to"]
+
+
+class PurchaseRequestSearchFilter(SearchFilter):
+    """
+    ``?search=`` backed by the maintained ``search_vector`` (GIN) instead of ILIKE scans.
+
+    Matching rows are annotated with ``search_rank`` so paginators can order by relevance.
+    References are in the vector part by part, so ``7f3`` or ``20261017`` finds one; use the
+    ``reference`` filter for arbitrary substrings.
+    """
+
+    rank_annotation = "search_rank"
+
+    def filter_queryset(self, request, queryset, view):
+        text = " ".join(self.get_search_terms(request))
+        if not text:
+            return queryset
+        query = build_search_query(text)
+        if query is None:
+            return queryset.none()
+        return queryset.filter(search_vector=query).annotate(
+            **{self.rank_annotation: SearchRank(F("search_vector"), query)}
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from procurement_app.models import PurchaseRequest
+from procurement_app.services.risk import RISK_FIELDS, apply_risk
+
+
+class Command(BaseCommand):
+    help = "Recompute and persist risk_level/risk_reasons for existing purchase requests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--dry-run", action="store_true", help="Report changes without saving.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        queryset = PurchaseRequest.objects.only(
+            "id",
+            "amount_estimated",
+            "vendor_name",
+            "status",
+            "current_approval_level",
+            *RISK_FIELDS,
+        ).order_by("pk")
+
+        scanned = updated = 0
+        pending = []
+        for request_obj in queryset.iterator(chunk_size=batch_size):
+            scanned += 1
+            if apply_risk(request_obj):
+                pending.append(request_obj)
+            if len(pending) >= batch_size:
+                updated += self._flush(pending, options["dry_run"])
+                pending = []
+        updated += self._flush(pending, options["dry_run"])
+
+        verb = "Would update" if options["dry_run"] else "Updated"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {updated} of {scanned} purchase requests."))
+
+    @staticmethod
+    def _flush(batch, dry_run: bool) -> int:
+        if batch and not dry_run:
+            PurchaseRequest.objects.bulk_update(batch, RISK_FIELDS)
+        return len(batch)
@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count, Q
+
+from procurement_app.models import Approval, PurchaseRequest
+from procurement_app.views import APPROVER_LEVELS, approver_inbox
+
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare approver inbox latency for the legacy OR-join + DISTINCT query and the EXISTS "
+        "rewrite. Seed data first, e.g. `explain_request_queries --seed 160000` (~100k approvals)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--username", help="Approver to benchmark (defaults to the busiest one).")
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--page-size", type=int, default=20)
+
+    def handle(self, *args, **options):
+        user = self._approver(options["username"])
+        level = APPROVER_LEVELS[user.role]
+        base = PurchaseRequest.objects.all()
+        variants = {
+            "or_join_distinct": base.filter(
+                Q(status=PurchaseRequest.Status.PENDING, current_approval_level=level)
+                | Q(approvals__approver=user)
+            ).distinct(),
+            "exists": approver_inbox(base, user, level),
+        }
+        self.stdout.write(
+            f"Approver {user.username} (level {level}), {Approval.objects.count()} approvals, "
+            f"{PurchaseRequest.objects.count()} requests"
+        )
+
+        page_ids = {}
+        for label, queryset in variants.items():
+            page = queryset.order_by("-created_at", "-id")[: options["page_size"]]
+            page_ids[label] = list(page.values_list("pk", flat=True))
+            page_ms = self._time(lambda: list(page.all()), options["repeat"])
+            count_ms = self._time(queryset.count, options["repeat"])
+            self.stdout.write(
+                f"{label:>18}: first page median {page_ms:8.2f} ms | count median {count_ms:8.2f} ms"
+            )
+
+        if page_ids["or_join_distinct"] != page_ids["exists"]:
+            raise CommandError("The two inbox formulations returned different first pages.")
+        self.stdout.write(self.style.SUCCESS("Both formulations returned identical first pages."))
+
+    def _approver(self, username):
+        approvers = User.objects.filter(role__in=list(APPROVER_LEVELS))
+        if username:
+            user = approvers.filter(username=username).first()
+        else:
+            busiest = (
+                Approval.objects.filter(approver__role__in=list(APPROVER_LEVELS))
+                .values("approver")
+                .order_by()
+                .annotate(total=Count("pk"))
+                .order_by("-total")
+                .first()
+            )
+            user = approvers.filter(pk=busiest["approver"]).first() if busiest else approvers.first()
+        if not user:
+            raise CommandError("No approver found; seed the database first.")
+        return user
+
+    @staticmethod
+    def _time(func, repeat: int) -> float:
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            samples.append((time.perf_counter() - start) * 1000)
+        return statistics.median(samples)
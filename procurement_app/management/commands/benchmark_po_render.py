@@ -0,0 +1,87 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from procurement_app.services import po_render
+
+
+class Command(BaseCommand):
+    help = (
+        "Report purchase order PDFs rendered per second for different line-item counts: "
+        "rebuilding styles per PO (the old behaviour), cached styles in-process, and the "
+        "process pool."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--line-items", type=int, nargs="+", default=[1, 10, 500], help="Items per PO."
+        )
+        parser.add_argument("--count", type=int, default=20, help="POs rendered per size.")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=max(settings.PO_RENDER_WORKERS, 1),
+            help="Process pool size for the pooled run.",
+        )
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        chunksize = max(1, count // (options["workers"] * 4))
+        with ProcessPoolExecutor(
+            max_workers=options["workers"], mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            # Start the workers (and import reportlab in them) before timing anything.
+            list(executor.map(po_render.render_pdf, [self._payload(1)] * options["workers"]))
+            for size in options["line_items"]:
+                payloads = [self._payload(size, idx) for idx in range(count)]
+                runs = {
+                    "uncached": (self._render_uncached, payloads),
+                    "cached": (lambda batch: [po_render.render_pdf(p) for p in batch], payloads),
+                    f"pool x{options['workers']}": (
+                        lambda batch: list(
+                            executor.map(po_render.render_pdf, batch, chunksize=chunksize)
+                        ),
+                        payloads,
+                    ),
+                }
+                summary = " | ".join(
+                    f"{label} {self._rate(func, batch):8.1f} PO/s"
+                    for label, (func, batch) in runs.items()
+                )
+                self.stdout.write(f"{size:>4} line items: {summary}")
+
+    @staticmethod
+    def _render_uncached(payloads):
+        for payload in payloads:
+            po_render._layout.cache_clear()
+            po_render.render_pdf(payload)
+
+    @staticmethod
+    def _rate(func, payloads) -> float:
+        start = time.perf_counter()
+        func(payloads)
+        return len(payloads) / (time.perf_counter() - start)
+
+    @staticmethod
+    def _payload(line_items: int, idx: int = 0) -> dict:
+        return {
+            "po_number": f"PO-BENCH-{idx:05d}",
+            "vendor_name": "Benchmark Supplies Ltd",
+            "currency": "USD",
+            "requested_by": "bench",
+            "issue_date": "2026-01-01",
+            "items": [
+                {
+                    "name": f"Item {n}",
+                    "quantity": n % 7 + 1,
+                    "unit_price": 12.5 + n,
+                    "total_price": (12.5 + n) * (n % 7 + 1),
+                }
+                for n in range(line_items)
+            ],
+            "total_amount": 1000.0,
+            "terms": po_render.DEFAULT_TERMS,
+        }
@@ -0,0 +1,221 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from documents.models import DocumentExtractionResult, ReceiptValidationResult
+from procurement_app.models import Approval, PurchaseRequest
+from procurement_app.services import spend_rollup
+
+
+User = get_user_model()
+
+ACCESS_PATH_INDEXES = [
+    "preq_pending_level_idx",
+    "preq_owner_status_idx",
+    "preq_status_created_idx",
+    "preq_decided_created_idx",
+    "preq_status_needed_by_idx",
+    "approval_approver_request_idx",
+    "docext_request_type_idx",
+    "receipt_match_request_idx",
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Print EXPLAIN ANALYZE plans for the role-scoped request queries with and without index "
+        "scans (--scratch: without the access-path indexes). Use --seed on a scratch database to "
+        "generate a benchmark dataset."
+    )
+
+    # Planner switches for the comparison pass; SET LOCAL takes no locks and ends with the
+    # transaction, unlike dropping the indexes.
+    INDEX_SCAN_SETTINGS = ("enable_indexscan", "enable_indexonlyscan", "enable_bitmapscan")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Number of purchase requests to generate first."
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--scratch",
+            action="store_true",
+            help=(
+                "Drop the access-path indexes (in a rolled-back transaction) for the comparison "
+                "pass instead of disabling index scans. Takes ACCESS EXCLUSIVE locks on the "
+                "tables, so only use it on a scratch database."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("EXPLAIN plans are only meaningful on PostgreSQL.")
+        if options["seed"]:
+            self._seed(options["seed"], options["batch_size"])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        self.stdout.write(self.style.MIGRATE_HEADING("=== With access-path indexes ==="))
+        self._explain_all()
+
+        if options["scratch"]:
+            heading, statements = "=== Without access-path indexes ===", [
+                f'DROP INDEX IF EXISTS "{name}"' for name in ACCESS_PATH_INDEXES
+            ]
+        else:
+            heading, statements = "=== Without index scans ===", [
+                f"SET LOCAL {name} = off" for name in self.INDEX_SCAN_SETTINGS
+            ]
+        self.stdout.write(self.style.MIGRATE_HEADING(heading))
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    for statement in statements:
+                        cursor.execute(statement)
+                self._explain_all()
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _queries(self):
+        staff = User.objects.filter(role=User.Roles.STAFF).first()
+        approver = User.objects.filter(role=User.Roles.APPROVER_L1).first()
+        sample = PurchaseRequest.objects.order_by().values_list("pk", flat=True).first()
+        today = timezone.now().date()
+        return [
+            (
+                "approver inbox (pending, level 1)",
+                PurchaseRequest.objects.filter(
+                    status=PurchaseRequest.Status.PENDING, current_approval_level=1
+                ).order_by("-created_at")[:20],
+            ),
+            (
+                "staff requests by status",
+                PurchaseRequest.objects.filter(created_by=staff, status=PurchaseRequest.Status.PENDING)
+                .order_by("-created_at")[:20],
+            ),
+            (
+                "finance list (approved/rejected)",
+                PurchaseRequest.objects.filter(
+                    status__in=[PurchaseRequest.Status.APPROVED, PurchaseRequest.Status.REJECTED]
+                ).order_by("-created_at")[:20],
+            ),
+            (
+                "cash-out window (approved, needed_by range)",
+                PurchaseRequest.objects.filter(
+                    status=PurchaseRequest.Status.APPROVED,
+                    needed_by__range=(today, today + timedelta(weeks=8)),
+                ).order_by(),
+            ),
+            (
+                "finance mismatches",
+                PurchaseRequest.objects.filter(
+                    status=PurchaseRequest.Status.APPROVED, receipt_validation__is_match=False
+                ).order_by("-created_at")[:20],
+            ),
+            (
+                "approvals by approver",
+                Approval.objects.filter(approver=approver).order_by().values("purchase_request"),
+            ),
+            (
+                "latest proforma extraction",
+                DocumentExtractionResult.objects.filter(
+                    purchase_request_id=sample, doc_type=DocumentExtractionResult.DocTypes.PROFORMA
+                ).order_by("-created_at")[:1],
+            ),
+        ]
+
+    def _explain_all(self):
+        for label, queryset in self._queries():
+            self.stdout.write(self.style.SUCCESS(f"-- {label}"))
+            self.stdout.write(queryset.explain(analyze=True, buffers=True))
+            self.stdout.write("")
+
+    def _seed(self, total: int, batch_size: int):
+        staff = [
+            User.objects.get_or_create(
+                username=f"bench-staff-{idx}",
+                defaults={"email": f"bench-staff-{idx}@example.com", "role": User.Roles.STAFF},
+            )[0]
+            for idx in range(50)
+        ]
+        approvers = [
+            User.objects.get_or_create(
+                username=f"bench-approver-{level}",
+                defaults={"email": f"bench-approver-{level}@example.com", "role": role},
+            )[0]
+            for level, role in ((1, User.Roles.APPROVER_L1), (2, User.Roles.APPROVER_L2))
+        ]
+        statuses = [PurchaseRequest.Status.PENDING] * 3 + [
+            PurchaseRequest.Status.APPROVED,
+            PurchaseRequest.Status.APPROVED,
+            PurchaseRequest.Status.REJECTED,
+        ]
+        today = timezone.now().date()
+        offset = PurchaseRequest.objects.count()
+        for start in range(0, total, batch_size):
+            requests = []
+            for idx in range(start, min(start + batch_size, total)):
+                status = random.choice(statuses)
+                requests.append(
+                    PurchaseRequest(
+                        reference=f"BENCH-{offset + idx:08d}",
+                        title=f"Benchmark request {offset + idx}",
+                        amount_estimated=random.randint(10, 80000),
+                        vendor_name=f"Vendor {random.randint(1, 500)}",
+                        needed_by=today + timedelta(days=random.randint(-60, 180)),
+                        status=status,
+                        current_approval_level=random.choice((1, 2)),
+                        created_by=random.choice(staff),
+                    )
+                )
+            PurchaseRequest.objects.bulk_create(requests, batch_size=batch_size)
+            approvals, extractions, validations = [], [], []
+            for request_obj in requests:
+                extractions.append(
+                    DocumentExtractionResult(
+                        purchase_request=request_obj,
+                        doc_type=DocumentExtractionResult.DocTypes.PROFORMA,
+                        firebase_url="https://example.com/bench.pdf",
+                        final_data={},
+                    )
+                )
+                pending = request_obj.status == PurchaseRequest.Status.PENDING
+                if pending and request_obj.current_approval_level == 1:
+                    continue
+                approvals.append(
+                    Approval(
+                        purchase_request=request_obj,
+                        approver=approvers[0],
+                        level=1,
+                        decision=Approval.Decision.APPROVED,
+                    )
+                )
+                if request_obj.status == PurchaseRequest.Status.APPROVED and random.random() < 0.5:
+                    validations.append(
+                        ReceiptValidationResult(
+                            purchase_request=request_obj, is_match=random.random() < 0.8
+                        )
+                    )
+            Approval.objects.bulk_create(approvals, batch_size=batch_size)
+            DocumentExtractionResult.objects.bulk_create(extractions, batch_size=batch_size)
+            ReceiptValidationResult.objects.bulk_create(validations, batch_size=batch_size)
+            self.stdout.write(f"Seeded {min(start + batch_size, total)}/{total} requests")
+
+        # auto_now_add overrides created_at on insert; spread rows over a year for realistic plans.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {PurchaseRequest._meta.db_table} "
+                "SET created_at = now() - random() * interval '365 days' WHERE reference LIKE %s",
+                ["BENCH-%"],
+            )
+        # Bulk inserts and the UPDATE above bypass the save hooks that maintain the rollup.
+        spend_rollup.rebuild(batch_size=batch_size)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from procurement_app.services import spend_rollup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the VendorSpendDaily rollup from purchase requests, or with --check report the "
+        "buckets where it has drifted from the live aggregate."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--check", action="store_true", help="Compare only; exit non-zero when drift is found."
+        )
+
+    def handle(self, *args, **options):
+        if not options["check"]:
+            written = spend_rollup.rebuild(batch_size=options["batch_size"])
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt vendor spend rollup: {written} rows."))
+            return
+
+        drift = spend_rollup.find_drift()
+        for bucket in drift:
+            expected_amount, expected_count = bucket["expected"]
+            actual_amount, actual_count = bucket["actual"]
+            self.stdout.write(
+                f"{bucket['day']} {bucket['vendor_name'] or '-'} {bucket['currency'] or '-'} "
+                f"{bucket['status']}: expected {expected_amount} ({expected_count}), "
+                f"stored {actual_amount} ({actual_count})"
+            )
+        if drift:
+            raise CommandError(
+                f"{len(drift)} vendor spend buckets drifted; run without --check to rebuild."
+            )
+        self.stdout.write(self.style.SUCCESS("Vendor spend rollup matches purchase requests."))
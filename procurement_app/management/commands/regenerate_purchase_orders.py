@@ -0,0 +1,231 @@
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from documents.services import storage as storage_service
+from procurement_app.models import PurchaseOrder
+from procurement_app.services import po_generation, po_render
+
+
+logger = logging.getLogger("procure_to_pay")
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-render and re-upload PDFs for existing purchase orders (e.g. after a template or "
+        "terms change). Progress is checkpointed after every batch; re-running the same "
+        "command resumes after the last finished batch and retries the POs that failed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", type=date.fromisoformat, help="Issued on/after YYYY-MM-DD.")
+        parser.add_argument("--until", type=date.fromisoformat, help="Issued on/before YYYY-MM-DD.")
+        parser.add_argument("--vendor", help="Vendor name contains (case-insensitive).")
+        parser.add_argument(
+            "--status",
+            choices=PurchaseOrder.PdfStatus.values,
+            default=PurchaseOrder.PdfStatus.READY,
+            help="Only POs with this pdf_status (default: ready; pending ones belong to "
+            "render_purchase_orders).",
+        )
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=max(settings.PO_RENDER_WORKERS, 1),
+            help="Render processes.",
+        )
+        parser.add_argument("--upload-workers", type=int, default=8, help="Concurrent uploads.")
+        parser.add_argument("--limit", type=int, default=0, help="Stop after N POs (0 = all).")
+        parser.add_argument(
+            "--checkpoint",
+            default=str(settings.LOG_DIR / "regenerate_purchase_orders.checkpoint.json"),
+        )
+        parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint.")
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Render only; report throughput, write nothing."
+        )
+
+    def handle(self, *args, **options):
+        filters = {key: options[key] for key in ("since", "until", "vendor", "status")}
+        filters = {key: str(value) for key, value in filters.items() if value is not None}
+        checkpoint_path = Path(options["checkpoint"])
+        state = {
+            "filters": filters,
+            "last_pk": None,
+            "processed": 0,
+            "failed": 0,
+            "failed_pks": [],
+        }
+        if not options["dry_run"] and not options["restart"] and checkpoint_path.exists():
+            saved = json.loads(checkpoint_path.read_text())
+            if saved.get("filters") != filters:
+                raise CommandError(
+                    f"{checkpoint_path} belongs to a run with filters {saved.get('filters')}; "
+                    "pass the same filters to resume, or --restart."
+                )
+            state = {"failed_pks": [], **saved}
+            self.stdout.write(
+                f"Resuming after {state['last_pk']} ({state['processed']} done); "
+                f"retrying {len(state['failed_pks'])} failed."
+            )
+
+        queryset = self._queryset(options)
+        if state["last_pk"]:
+            queryset = queryset.filter(Q(pk__gt=state["last_pk"]) | Q(pk__in=state["failed_pks"]))
+        if options["limit"]:
+            queryset = queryset[: options["limit"]]
+
+        started = time.perf_counter()
+        rendered = bytes_out = 0
+        seen = set()
+        with (
+            ProcessPoolExecutor(
+                max_workers=options["workers"], mp_context=multiprocessing.get_context("spawn")
+            ) as renderers,
+            ThreadPoolExecutor(max_workers=options["upload_workers"]) as uploaders,
+        ):
+            try:
+                for batch in self._batches(queryset, options["batch_size"]):
+                    pdfs = self._render(renderers, batch)
+                    rendered += len(pdfs)
+                    bytes_out += sum(len(pdf) for _, pdf in pdfs)
+                    if options["dry_run"]:
+                        continue
+                    uploads = self._upload(uploaders, pdfs)
+                    po_generation.publish_regenerated(uploads)
+                    # A failed PO ends up behind last_pk, so it is kept in failed_pks to retry.
+                    done = {str(po.pk) for po, _ in uploads}
+                    attempted = {str(po.pk) for po in batch}
+                    seen |= attempted
+                    state["failed_pks"] = [
+                        pk for pk in state["failed_pks"] if pk not in attempted
+                    ] + sorted(attempted - done)
+                    state["last_pk"] = str(self._max_pk(state["last_pk"], batch[-1].pk))
+                    state["processed"] += len(uploads)
+                    state["failed"] = len(state["failed_pks"])
+                    self._save_checkpoint(checkpoint_path, state)
+                    self.stdout.write(f"{state['processed']} regenerated, {state['failed']} failed")
+            except KeyboardInterrupt:
+                self.stdout.write(f"Interrupted; resume from {checkpoint_path}.")
+                return
+
+        elapsed = time.perf_counter() - started
+        rate = rendered / elapsed if elapsed else 0.0
+        if options["dry_run"]:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"Dry run: rendered {rendered} POs ({bytes_out / 1024:.0f} KiB) in "
+                    f"{elapsed:.1f}s, {rate:.1f} PO/s with {options['workers']} render workers."
+                )
+            )
+            return
+        if not options["limit"]:
+            # Failed POs that a full run never reached no longer match the filters.
+            state["failed_pks"] = [pk for pk in state["failed_pks"] if pk in seen]
+            state["failed"] = len(state["failed_pks"])
+        if state["failed_pks"]:
+            self._save_checkpoint(checkpoint_path, state)
+            self.stdout.write(
+                self.style.WARNING(
+                    f"{state['failed']} purchase orders failed "
+                    f"({', '.join(state['failed_pks'])}); re-run to retry them."
+                )
+            )
+        else:
+            checkpoint_path.unlink(missing_ok=True)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Regenerated {state['processed']} purchase orders ({state['failed']} failed), "
+                f"{rate:.1f} PO/s this run."
+            )
+        )
+
+    @staticmethod
+    def _queryset(options):
+        queryset = PurchaseOrder.objects.select_related("purchase_request__created_by").filter(
+            pdf_status=options["status"]
+        )
+        if options["since"]:
+            queryset = queryset.filter(issue_date__gte=options["since"])
+        if options["until"]:
+            queryset = queryset.filter(issue_date__lte=options["until"])
+        if options["vendor"]:
+            queryset = queryset.filter(vendor_name__icontains=options["vendor"])
+        # Primary-key order makes "everything after last_pk" a stable resume point.
+        return queryset.order_by("pk")
+
+    @staticmethod
+    def _max_pk(last_pk: str | None, pk):
+        # Retried POs come first in pk order, so a batch can end below the saved last_pk.
+        if last_pk is None:
+            return pk
+        return max(PurchaseOrder._meta.pk.to_python(last_pk), pk)
+
+    @staticmethod
+    def _batches(queryset, size: int):
+        batch = []
+        for po in queryset.iterator(chunk_size=size):
+            batch.append(po)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    @staticmethod
+    def _render(executor, batch):
+        futures = [
+            (
+                po,
+                executor.submit(
+                    po_render.render_pdf,
+                    po_render.render_payload(
+                        po.po_number, po.purchase_request, po.structured_data, po.issue_date
+                    ),
+                ),
+            )
+            for po in batch
+        ]
+        pdfs = []
+        for po, future in futures:
+            try:
+                pdfs.append((po, future.result()))
+            except Exception:
+                logger.exception("Failed to render purchase order %s", po.po_number)
+        return pdfs
+
+    @staticmethod
+    def _upload(executor, pdfs):
+        futures = [
+            (
+                po,
+                executor.submit(
+                    storage_service.upload_bytes, pdf, "purchase_orders", f"{po.po_number}.pdf"
+                ),
+            )
+            for po, pdf in pdfs
+        ]
+        uploads = []
+        for po, future in futures:
+            try:
+                uploads.append((po, future.result()))
+            except Exception:
+                logger.exception("Failed to upload purchase order %s", po.po_number)
+        return uploads
+
+    @staticmethod
+    def _save_checkpoint(path: Path, state: dict) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, path)
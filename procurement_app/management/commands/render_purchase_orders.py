@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from procurement_app.services import po_generation
+
+
+class Command(BaseCommand):
+    help = (
+        "Render PO PDFs that are still pending, failed with retries left, or stuck in "
+        "rendering (for example after a web worker restarted before its background render ran)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Render what is due, then exit.")
+        parser.add_argument(
+            "--batch-size", type=int, default=50, help="POs to pick up per sweep."
+        )
+        parser.add_argument(
+            "--poll-interval", type=float, default=30.0, help="Seconds to sleep between sweeps."
+        )
+
+    def handle(self, *args, **options):
+        rendered = failed = 0
+        try:
+            while True:
+                ids = list(
+                    po_generation.outstanding_pdf_renders().values_list("pk", flat=True)[
+                        : options["batch_size"]
+                    ]
+                )
+                for po_id in ids:
+                    po = po_generation.render_purchase_order_pdf(po_id)
+                    if po is None:
+                        continue
+                    if po.pdf_status == po.PdfStatus.READY:
+                        rendered += 1
+                    else:
+                        failed += 1
+                    self.stdout.write(f"{po.po_number}: {po.pdf_status}")
+                if options["once"] and len(ids) < options["batch_size"]:
+                    break
+                if not ids:
+                    time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            self.style.SUCCESS(f"Rendered {rendered} purchase order PDFs ({failed} failed).")
+        )
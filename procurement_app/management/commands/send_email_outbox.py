@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+from prometheus_client import start_http_server
+
+from procurement_app.services import email_outbox
+
+
+class Command(BaseCommand):
+    help = "Deliver queued notification emails from the outbox in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Drain due emails, then exit.")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument(
+            "--poll-interval", type=float, default=5.0, help="Seconds to sleep when idle."
+        )
+        parser.add_argument(
+            "--metrics-port", type=int, default=0, help="Serve Prometheus metrics on this port."
+        )
+
+    def handle(self, *args, **options):
+        if options["metrics_port"]:
+            start_http_server(options["metrics_port"])
+        transport = email_outbox.get_transport()
+        total = 0
+        try:
+            while True:
+                attempted = email_outbox.drain(options["batch_size"], transport=transport)
+                email_outbox.refresh_depth()
+                total += attempted
+                if attempted:
+                    continue
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} outbox emails."))
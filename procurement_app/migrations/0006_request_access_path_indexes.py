@@ -0,0 +1,46 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ("procurement_app", "0005_extended_features"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(
+                condition=models.Q(("status", "PENDING")),
+                fields=["current_approval_level", "-created_at"],
+                name="preq_pending_level_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(fields=["created_by", "status", "-created_at"], name="preq_owner_status_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(fields=["status", "-created_at"], name="preq_status_created_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(
+                condition=models.Q(("status__in", ["APPROVED", "REJECTED"])),
+                fields=["-created_at"],
+                name="preq_decided_created_idx",
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(fields=["status", "needed_by"], name="preq_status_needed_by_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="approval",
+            index=models.Index(fields=["approver", "purchase_request"], name="approval_approver_request_idx"),
+        ),
+    ]
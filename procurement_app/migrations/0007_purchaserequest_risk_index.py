@@ -0,0 +1,17 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("procurement_app", "0006_request_access_path_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(fields=["risk_level", "-created_at"], name="preq_risk_created_idx"),
+        ),
+    ]
@@ -0,0 +1,49 @@
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def enable_trigram_extension(apps, schema_editor):
+    # pg_trgm ships with contrib; skip quietly where the server does not provide it. The trigram
+    # indexes in 0009 are only created when the extension is installed.
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone():
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+
+def backfill_search_vectors(apps, schema_editor):
+    # The vector as defined when this migration was written; later changes to the search
+    # service do not alter it.
+    PurchaseRequest = apps.get_model("procurement_app", "PurchaseRequest")
+    User = apps.get_model("accounts", "User")
+    requester = Subquery(User.objects.filter(pk=OuterRef("created_by_id")).values("full_name")[:1])
+    PurchaseRequest.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="simple")
+            + SearchVector("reference", weight="A", config="simple")
+            + SearchVector("vendor_name", weight="B", config="simple")
+            + SearchVector(Coalesce(requester, Value("")), weight="B", config="simple")
+            + SearchVector("description", weight="C", config="simple")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("accounts", "0002_alter_user_role"),
+        ("procurement_app", "0007_purchaserequest_risk_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(enable_trigram_extension, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name="purchaserequest",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,58 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+TRIGRAM_INDEXES = {
+    "preq_reference_trgm_idx": "reference",
+    "preq_vendor_trgm_idx": "vendor_name",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if not cursor.fetchone():
+            return
+        for name, column in TRIGRAM_INDEXES.items():
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                f'ON "procurement_app_purchaserequest" USING gin ("{column}" gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("procurement_app", "0008_purchaserequest_search_vector"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="preq_search_vector_idx"
+            ),
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name="purchaserequest",
+                    index=django.contrib.postgres.indexes.GinIndex(
+                        fields=[column], name=name, opclasses=["gin_trgm_ops"]
+                    ),
+                )
+                for name, column in TRIGRAM_INDEXES.items()
+            ],
+        ),
+    ]
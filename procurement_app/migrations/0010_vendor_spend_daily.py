@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:13
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+
+
+def backfill_vendor_spend(apps, schema_editor):
+    # The rollup's aggregate as defined when this migration was written, against the
+    # historical models rather than the live service code.
+    PurchaseRequest = apps.get_model("procurement_app", "PurchaseRequest")
+    VendorSpendDaily = apps.get_model("procurement_app", "VendorSpendDaily")
+    rows = (
+        PurchaseRequest.objects.annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values("vendor_name", "currency", "status", "day")
+        .annotate(amount=Sum("amount_estimated"), request_count=Count("pk"))
+        .iterator(chunk_size=5000)
+    )
+    VendorSpendDaily.objects.bulk_create((VendorSpendDaily(**row) for row in rows), batch_size=5000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement_app', '0009_purchaserequest_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VendorSpendDaily',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vendor_name', models.CharField(blank=True, max_length=255)),
+                ('currency', models.CharField(blank=True, max_length=10)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('APPROVED', 'Approved'), ('REJECTED', 'Rejected')], max_length=16)),
+                ('day', models.DateField()),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('request_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'day'], name='vendor_spend_status_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('vendor_name', 'currency', 'status', 'day'), name='vendor_spend_daily_key')],
+            },
+        ),
+        migrations.RunPython(backfill_vendor_spend, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('procurement_app', '0011_email_outbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='pdf_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='pdf_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='purchaseorder',
+            name='pdf_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('rendering', 'Rendering'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='purchaseorder',
+            index=models.Index(condition=models.Q(('pdf_status', 'ready'), _negated=True), fields=['updated_at'], name='po_pdf_outstanding_idx'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Replace
+
+
+# icontains compiles to UPPER("column"::text) LIKE UPPER(...), which the 0009 indexes on the plain
+# columns cannot serve.
+OLD_TRIGRAM_INDEXES = ("preq_reference_trgm_idx", "preq_vendor_trgm_idx")
+TRIGRAM_INDEXES = {
+    "preq_reference_utrgm_idx": "reference",
+    "preq_vendor_utrgm_idx": "vendor_name",
+}
+
+
+def create_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name in OLD_TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if not cursor.fetchone():
+            return
+        for name, column in TRIGRAM_INDEXES.items():
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                f'ON "procurement_app_purchaserequest" '
+                f'USING gin ((UPPER("{column}"::text)) gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for name in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{name}"')
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if not cursor.fetchone():
+            return
+        for name, column in zip(OLD_TRIGRAM_INDEXES, TRIGRAM_INDEXES.values(), strict=True):
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" '
+                f'ON "procurement_app_purchaserequest" USING gin ("{column}" gin_trgm_ops)'
+            )
+
+
+def backfill_search_vectors(apps, schema_editor):
+    # References are indexed with their hyphens as spaces so each part is one token. Frozen
+    # here, like the 0008 backfill.
+    PurchaseRequest = apps.get_model("procurement_app", "PurchaseRequest")
+    User = apps.get_model("accounts", "User")
+    requester = Subquery(User.objects.filter(pk=OuterRef("created_by_id")).values("full_name")[:1])
+    reference = Replace("reference", Value("-"), Value(" "))
+    PurchaseRequest.objects.update(
+        search_vector=(
+            SearchVector("title", weight="A", config="simple")
+            + SearchVector(reference, weight="A", config="simple")
+            + SearchVector("vendor_name", weight="B", config="simple")
+            + SearchVector(Coalesce(requester, Value("")), weight="B", config="simple")
+            + SearchVector("description", weight="C", config="simple")
+        )
+    )
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0002_alter_user_role"),
+        ("procurement_app", "0012_purchase_order_pdf_status"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+            ],
+            state_operations=[
+                *[
+                    migrations.RemoveIndex(model_name="purchaserequest", name=name)
+                    for name in OLD_TRIGRAM_INDEXES
+                ],
+                *[
+                    migrations.AddIndex(
+                        model_name="purchaserequest",
+                        index=django.contrib.postgres.indexes.GinIndex(
+                            django.contrib.postgres.indexes.OpClass(
+                                django.db.models.functions.text.Upper(column),
+                                name="gin_trgm_ops",
+                            ),
+                            name=name,
+                        ),
+                    )
+                    for name, column in TRIGRAM_INDEXES.items()
+                ],
+            ],
+        ),
+        migrations.RunPython(backfill_search_vectors, migrations.RunPython.noop),
+    ]
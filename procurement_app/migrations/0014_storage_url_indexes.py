@@ -0,0 +1,30 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block.
+    atomic = False
+
+    dependencies = [
+        ("procurement_app", "0013_search_upper_trigram_indexes"),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(fields=["proforma_url"], name="preq_proforma_url_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(fields=["receipt_url"], name="preq_receipt_url_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="purchaserequest",
+            index=models.Index(fields=["purchase_order_url"], name="preq_po_url_idx"),
+        ),
+        AddIndexConcurrently(
+            model_name="purchaseorder",
+            index=models.Index(fields=["firebase_url"], name="po_firebase_url_idx"),
+        ),
+    ]
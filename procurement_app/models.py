@@ -1,9 +1,15 @@
 import uuid
+
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Upper
 from django.utils import timezone
 
+from procurement_app.services.search import SEARCHABLE_FIELDS, instance_search_vector
+
 
 def proforma_upload_to(instance, filename):  # pragma: no cover - legacy migration support
     return f"legacy/proforma/{filename}"
@@ -89,16 +95,85 @@ class PurchaseRequest(TimeStampedModel):
     receipt_url = models.URLField(blank=True)
     risk_level = models.CharField(max_length=8, choices=RiskLevel.choices, default=RiskLevel.LOW)
     risk_reasons = models.JSONField(default=list, blank=True)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Approver inbox: pending requests at a given level, newest first.
+            models.Index(
+                fields=["current_approval_level", "-created_at"],
+                condition=models.Q(status="PENDING"),
+                name="preq_pending_level_idx",
+            ),
+            # Staff "my requests", optionally narrowed by status.
+            models.Index(fields=["created_by", "status", "-created_at"], name="preq_owner_status_idx"),
+            # Finance lists: a single status, or the decided set (status IN ...), by recency.
+            models.Index(fields=["status", "-created_at"], name="preq_status_created_idx"),
+            models.Index(
+                fields=["-created_at"],
+                condition=models.Q(status__in=["APPROVED", "REJECTED"]),
+                name="preq_decided_created_idx",
+            ),
+            # Cash-out forecast / needed_by range filters on approved requests.
+            models.Index(fields=["status", "needed_by"], name="preq_status_needed_by_idx"),
+            models.Index(fields=["risk_level", "-created_at"], name="preq_risk_created_idx"),
+            # Full-text search, plus trigram indexes on UPPER(column): the expression the
+            # reference/vendor_name ``icontains`` filters compare with.
+            GinIndex(fields=["search_vector"], name="preq_search_vector_idx"),
+            GinIndex(
+                OpClass(Upper("reference"), name="gin_trgm_ops"), name="preq_reference_utrgm_idx"
+            ),
+            GinIndex(
+                OpClass(Upper("vendor_name"), name="gin_trgm_ops"), name="preq_vendor_utrgm_idx"
+            ),
+            # Storage replication swaps local URLs for remote ones by value.
+            models.Index(fields=["proforma_url"], name="preq_proforma_url_idx"),
+            models.Index(fields=["receipt_url"], name="preq_receipt_url_idx"),
+            models.Index(fields=["purchase_order_url"], name="preq_po_url_idx"),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.reference:
             self.reference = generate_reference()
-        super().save(*args, **kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or SEARCHABLE_FIELDS.intersection(update_fields):
+            # Written by the same INSERT/UPDATE as the row, not a follow-up query.
+            self.search_vector = instance_search_vector(self)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "search_vector"}
+        # Atomic so the vendor-spend rollup (maintained by save signals) commits with the row.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self) -> str:
         return f"{self.reference} — {self.title} ({self.get_status_display()})"
 
 
+class VendorSpendDaily(models.Model):
+    """Per-day spend rollup of purchase requests, maintained incrementally on every write."""
+
+    vendor_name = models.CharField(max_length=255, blank=True)
+    currency = models.CharField(max_length=10, blank=True)
+    status = models.CharField(max_length=16, choices=PurchaseRequest.Status.choices)
+    day = models.DateField()
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    # Signed on purpose: a delta against a drifted bucket must never fail the request write.
+    request_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["vendor_name", "currency", "status", "day"], name="vendor_spend_daily_key"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["status", "day"], name="vendor_spend_status_day_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.vendor_name or '-'} {self.status}: {self.amount} {self.currency}"
+
+
 class RequestItem(UUIDModel):
     purchase_request = models.ForeignKey(
         PurchaseRequest,
@@ -144,12 +219,21 @@ class Approval(TimeStampedModel):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["approver", "purchase_request"], name="approval_approver_request_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.purchase_request_id} - L{self.level} {self.decision}"
 
 
 class PurchaseOrder(TimeStampedModel):
+    class PdfStatus(models.TextChoices):
+        PENDING = "pending", "Pending"
+        RENDERING = "rendering", "Rendering"
+        READY = "ready", "Ready"
+        FAILED = "failed", "Failed"
+
     purchase_request = models.OneToOneField(
         PurchaseRequest,
         on_delete=models.CASCADE,
@@ -167,6 +251,21 @@ class PurchaseOrder(TimeStampedModel):
     terms = models.TextField(blank=True)
     firebase_url = models.URLField(blank=True)
     structured_data = models.JSONField(default=dict, blank=True)
+    pdf_status = models.CharField(
+        max_length=20, choices=PdfStatus.choices, default=PdfStatus.READY
+    )
+    pdf_attempts = models.PositiveIntegerField(default=0)
+    pdf_error = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["updated_at"],
+                name="po_pdf_outstanding_idx",
+                condition=~models.Q(pdf_status="ready"),
+            ),
+            models.Index(fields=["firebase_url"], name="po_firebase_url_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"PO {self.po_number}"
@@ -227,3 +326,45 @@ class FinanceDecision(TimeStampedModel):
 
     def __str__(self) -> str:
         return f"{self.purchase_request_id} - {self.decision}"
+
+
+class EmailOutbox(TimeStampedModel):
+    """
+    A notification email written in the same transaction as the change that triggered it.
+
+    ``manage.py send_email_outbox`` delivers pending rows; one row per (event, recipient) makes
+    re-enqueuing the same event a no-op.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        SENT = "sent", "Sent"
+        FAILED = "failed", "Failed"
+
+    event_key = models.CharField(max_length=128)
+    recipient = models.EmailField()
+    sender = models.CharField(max_length=255)
+    subject = models.CharField(max_length=255)
+    text_body = models.TextField()
+    html_body = models.TextField(blank=True)
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    provider_message_id = models.CharField(max_length=128, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["event_key", "recipient"], name="email_outbox_event_recipient"),
+        ]
+        indexes = [
+            models.Index(
+                fields=["next_attempt_at"],
+                condition=models.Q(status="pending"),
+                name="email_outbox_due_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.event_key} -> {self.recipient} ({self.status})"
@@ -5,9 +5,10 @@ from typing import Any
 
 from django.db import transaction
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 
 from accounts.serializers import UserSerializer
-from documents.models import DocumentExtractionResult, ReceiptValidationResult
+from documents.models import DocumentExtractionResult, ExtractionJob, ReceiptValidationResult
 from procurement_app.models import (
     Approval,
     FinanceDecision,
@@ -18,6 +19,7 @@ from procurement_app.models import (
     RequestItem,
     SavedRequestView,
 )
+from procurement_app.services.risk import apply_risk
 from procurement_app.validators import validate_document
 
 
@@ -66,6 +68,7 @@ class PurchaseOrderSerializer(serializers.ModelSerializer):
             "terms",
             "firebase_url",
             "structured_data",
+            "pdf_status",
         )
         read_only_fields = fields
 
@@ -82,11 +85,43 @@ class DocumentExtractionResultSerializer(serializers.ModelSerializer):
             "model_data",
             "final_data",
             "confidence_score",
+            "ocr_truncated",
+            "stage_timings",
             "created_at",
         )
         read_only_fields = fields
 
 
+class ExtractionJobSerializer(serializers.ModelSerializer):
+    result = DocumentExtractionResultSerializer(read_only=True)
+    status_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExtractionJob
+        fields = (
+            "id",
+            "doc_type",
+            "status",
+            "attempts",
+            "max_attempts",
+            "run_after",
+            "last_error",
+            "result",
+            "status_url",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        )
+        read_only_fields = fields
+
+    def get_status_url(self, obj):
+        return reverse(
+            "requests-extraction-job",
+            args=[obj.purchase_request_id, obj.id],
+            request=self.context.get("request"),
+        )
+
+
 class ReceiptValidationResultSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReceiptValidationResult
@@ -137,25 +172,6 @@ PIPELINE_STAGES = [
 ]
 
 
-def calculate_risk(request_obj: PurchaseRequest):
-    reasons = []
-    amount = request_obj.amount_estimated or Decimal("0")
-    if amount >= Decimal("50000"):
-        reasons.append("Amount > 50,000")
-    elif amount >= Decimal("25000"):
-        reasons.append("Amount > 25,000")
-    if not request_obj.vendor_name:
-        reasons.append("Missing vendor")
-    if request_obj.status == PurchaseRequest.Status.PENDING and request_obj.current_approval_level == 2:
-        reasons.append("Awaiting Level 2 approval")
-    level = PurchaseRequest.RiskLevel.LOW
-    if len(reasons) >= 2:
-        level = PurchaseRequest.RiskLevel.HIGH
-    elif reasons:
-        level = PurchaseRequest.RiskLevel.MEDIUM
-    return level, reasons
-
-
 class PurchaseRequestSerializer(serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     items = RequestItemSerializer(many=True, read_only=True)
@@ -386,20 +402,22 @@ class PurchaseRequestSerializer(serializers.ModelSerializer):
         return base
 
     def get_comment_count(self, obj: PurchaseRequest):
+        annotated = getattr(obj, "comment_count", None)
+        if annotated is not None:
+            return annotated
         return obj.comments.count()
 
     def get_has_unread_comments(self, obj: PurchaseRequest):
+        annotated = getattr(obj, "has_unread_comments", None)
+        if annotated is not None:
+            return annotated
         request = self.context.get("request")
         if not request or not request.user.is_authenticated:
             return False
         return obj.comments.exclude(receipts__user=request.user).exists()
 
     def get_risk_summary(self, obj: PurchaseRequest):
-        level, reasons = calculate_risk(obj)
-        if obj.risk_level != level or obj.risk_reasons != reasons:
-            obj.risk_level = level
-            obj.risk_reasons = reasons
-        return {"level": level, "reasons": reasons}
+        return {"level": obj.risk_level, "reasons": obj.risk_reasons}
 
     def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
         request = self.context.get("request")
@@ -436,7 +454,9 @@ class PurchaseRequestSerializer(serializers.ModelSerializer):
                 {"title": "A pending request with the same title and amount already exists."}
             )
 
-        purchase_request = PurchaseRequest.objects.create(created_by=user, **validated_data)
+        purchase_request = PurchaseRequest(created_by=user, **validated_data)
+        apply_risk(purchase_request)
+        purchase_request.save()
         return purchase_request
 
     @transaction.atomic
@@ -446,6 +466,7 @@ class PurchaseRequestSerializer(serializers.ModelSerializer):
             if self._should_skip(value):
                 continue
             setattr(instance, attr, value)
+        apply_risk(instance)
         instance.save()
         return instance
 
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import time
+from datetime import timedelta
+from typing import Iterable
+
+import resend
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from prometheus_client import Counter, Gauge, Histogram
+
+from procurement_app.models import EmailOutbox
+
+
+logger = logging.getLogger("procure_to_pay")
+
+EMAILS_SENT = Counter("p2p_email_outbox_sent_total", "Outbox emails accepted by the transport.")
+EMAIL_SEND_FAILURES = Counter(
+    "p2p_email_outbox_failures_total",
+    "Outbox emails whose delivery attempt failed.",
+    ["outcome"],
+)
+EMAIL_SEND_SECONDS = Histogram(
+    "p2p_email_outbox_send_seconds", "Latency of one batched transport send."
+)
+OUTBOX_DEPTH = Gauge("p2p_email_outbox_depth", "Pending emails waiting in the outbox.")
+
+
+def refresh_depth() -> int:
+    """Set ``p2p_email_outbox_depth`` from the table; the sender calls it after each pass."""
+
+    depth = EmailOutbox.objects.filter(status=EmailOutbox.Status.PENDING).count()
+    OUTBOX_DEPTH.set(depth)
+    return depth
+
+
+# Transports take a batch and return one entry per message: the provider message id ("" if
+# there is none), or the exception for a message that was not accepted. Raising means nothing
+# in the batch was sent.
+
+
+class ResendTransport:
+    """
+    Deliver through Resend's batch endpoint (up to 100 messages per call). The endpoint
+    accepts or rejects a batch as a whole.
+    """
+
+    max_batch_size = 100
+
+    def send(self, messages: list[EmailOutbox]) -> list[str | Exception]:
+        if not settings.RESEND_API_KEY:
+            raise ImproperlyConfigured("RESEND_API_KEY is not configured.")
+        resend.api_key = settings.RESEND_API_KEY
+        params = [
+            {
+                "from": message.sender,
+                "to": [message.recipient],
+                "subject": message.subject,
+                "text": message.text_body,
+                "html": message.html_body,
+                "reply_to": message.sender,
+            }
+            for message in messages
+        ]
+        # Retrying the same rows reuses the key, so a batch Resend already accepted is not resent.
+        batch_ids = ",".join(sorted(str(message.pk) for message in messages))
+        options = {"idempotency_key": hashlib.sha256(batch_ids.encode()).hexdigest()}
+        response = resend.Batch.send(params, options)
+        return [item.get("id", "") for item in response.get("data", [])]
+
+
+class DjangoMailTransport:
+    """
+    Deliver through Django's ``EMAIL_BACKEND``: SMTP, console, file, or locmem in tests.
+
+    Messages share one connection but are sent one at a time, so a rejected recipient does not
+    fail the ones already delivered.
+    """
+
+    max_batch_size = 100
+
+    def send(self, messages: list[EmailOutbox]) -> list[str | Exception]:
+        results = []
+        with get_connection(fail_silently=False) as connection:
+            for message in messages:
+                email = EmailMultiAlternatives(
+                    message.subject, message.text_body, message.sender, [message.recipient]
+                )
+                if message.html_body:
+                    email.attach_alternative(message.html_body, "text/html")
+                try:
+                    connection.send_messages([email])
+                except Exception as exc:
+                    results.append(exc)
+                else:
+                    results.append("")
+        return results
+
+
+def get_transport():
+    return import_string(settings.EMAIL_OUTBOX_TRANSPORT)()
+
+
+def enqueue(
+    event_key: str, sender: str, subject: str, text: str, html: str, recipients: Iterable[str]
+) -> None:
+    """Queue one email per recipient; an (event, recipient) pair is only ever queued once."""
+
+    EmailOutbox.objects.bulk_create(
+        [
+            EmailOutbox(
+                event_key=event_key,
+                recipient=recipient,
+                sender=sender,
+                subject=subject[:255],
+                text_body=text,
+                html_body=html,
+            )
+            for recipient in dict.fromkeys(recipients)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def drain(batch_size: int | None = None, transport=None) -> int:
+    """
+    Send one batch of due emails and return how many were attempted.
+
+    Rows are locked with ``SKIP LOCKED`` for the duration of the send, so several senders can
+    run side by side; a crash mid-send rolls back and the batch is simply sent again later.
+    Each message is marked sent or scheduled for retry on its own, so one rejected message
+    does not resend the rest of the batch.
+    """
+
+    transport = transport or get_transport()
+    size = min(batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE, transport.max_batch_size)
+    with transaction.atomic():
+        batch = list(
+            EmailOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=EmailOutbox.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at")[:size]
+        )
+        if not batch:
+            return 0
+        started = time.perf_counter()
+        try:
+            results = transport.send(batch)
+        except Exception as exc:
+            EMAIL_SEND_SECONDS.observe(time.perf_counter() - started)
+            logger.exception("Failed to send %s outbox emails.", len(batch))
+            _schedule_retry([(message, exc) for message in batch])
+            return len(batch)
+        EMAIL_SEND_SECONDS.observe(time.perf_counter() - started)
+
+        if len(results) != len(batch):
+            logger.error(
+                "%s returned %s results for %s outbox emails; retrying the unanswered ones.",
+                type(transport).__name__,
+                len(results),
+                len(batch),
+            )
+            missing = RuntimeError("transport returned no result for this message")
+            results = list(results[: len(batch)]) + [missing] * (len(batch) - len(results))
+
+        now = timezone.now()
+        sent, failed = [], []
+        for message, result in zip(batch, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning("Failed to send outbox email %s: %s", message.pk, result)
+                failed.append((message, result))
+                continue
+            message.status = EmailOutbox.Status.SENT
+            message.attempts += 1
+            message.sent_at = now
+            message.provider_message_id = result or ""
+            message.last_error = ""
+            message.updated_at = now
+            sent.append(message)
+        EmailOutbox.objects.bulk_update(
+            sent,
+            ["status", "attempts", "sent_at", "provider_message_id", "last_error", "updated_at"],
+        )
+        _schedule_retry(failed)
+        EMAILS_SENT.inc(len(sent))
+        logger.info("Sent %s notification emails (%s failed).", len(sent), len(failed))
+    return len(batch)
+
+
+def _schedule_retry(failures: list[tuple[EmailOutbox, Exception]]) -> None:
+    now = timezone.now()
+    for message, exc in failures:
+        message.attempts += 1
+        message.last_error = f"{type(exc).__name__}: {exc}"
+        message.updated_at = now
+        if message.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            message.status = EmailOutbox.Status.FAILED
+            EMAIL_SEND_FAILURES.labels(outcome="failed").inc()
+        else:
+            delay = settings.EMAIL_OUTBOX_RETRY_SECONDS * 2 ** (message.attempts - 1)
+            message.next_attempt_at = now + timedelta(seconds=min(delay, 6 * 3600))
+            EMAIL_SEND_FAILURES.labels(outcome="retry").inc()
+    EmailOutbox.objects.bulk_update(
+        [message for message, _ in failures],
+        ["attempts", "last_error", "updated_at", "status", "next_attempt_at"],
+    )
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+
+from django.db.models import Count, DateField, F, Func, IntegerField, Sum, Value
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+
+INTERVALS = ("day", "week", "month")
+
+
+class DaysBetween(Func):
+    """``end - start`` in whole days using PostgreSQL date arithmetic."""
+
+    arg_joiner = " - "
+    template = "(%(expressions)s)"
+    output_field = IntegerField()
+
+
+def _add_months(day: date, months: int) -> date:
+    month_index = day.year * 12 + day.month - 1 + months
+    return date(month_index // 12, month_index % 12 + 1, 1)
+
+
+def _periods(today: date, interval: str, count: int) -> list[tuple[date, date]]:
+    if interval == "day":
+        return [(today + timedelta(days=idx),) * 2 for idx in range(count)]
+    if interval == "week":
+        return [
+            (today + timedelta(weeks=idx), today + timedelta(weeks=idx, days=6))
+            for idx in range(count)
+        ]
+    periods = []
+    for idx in range(count):
+        start = today if idx == 0 else _add_months(today, idx)
+        last_day = calendar.monthrange(start.year, start.month)[1]
+        periods.append((start, start.replace(day=last_day)))
+    return periods
+
+
+def _bucket_expression(today: date, interval: str):
+    if interval == "month":
+        return (
+            ExtractYear("needed_by") * 12
+            + ExtractMonth("needed_by")
+            - Value(today.year * 12 + today.month)
+        )
+    days = DaysBetween(F("needed_by"), Value(today, output_field=DateField()))
+    if interval == "week":
+        return days / Value(7)
+    return days
+
+
+def cashout_forecast(
+    queryset,
+    *,
+    today: date,
+    interval: str = "week",
+    periods: int = 8,
+    by_currency: bool = False,
+) -> list[dict]:
+    """
+    Sum ``amount_estimated`` per ``needed_by`` period with a single grouped query.
+
+    Empty periods are filled in Python so the response always has ``periods`` buckets.
+    """
+
+    windows = _periods(today, interval, periods)
+    group_by = ["bucket", "currency"] if by_currency else ["bucket"]
+    rows = (
+        queryset.filter(needed_by__range=(windows[0][0], windows[-1][1]))
+        .annotate(bucket=_bucket_expression(today, interval))
+        .order_by()
+        .values(*group_by)
+        .annotate(total=Sum("amount_estimated"), count=Count("id"))
+    )
+
+    totals: dict[int, dict] = {}
+    for row in rows:
+        bucket = totals.setdefault(
+            row["bucket"], {"amount_due": 0.0, "count_requests": 0, "currencies": []}
+        )
+        bucket["amount_due"] += float(row["total"] or 0)
+        bucket["count_requests"] += row["count"]
+        if by_currency:
+            bucket["currencies"].append(
+                {
+                    "currency": row["currency"],
+                    "amount_due": float(row["total"] or 0),
+                    "count_requests": row["count"],
+                }
+            )
+
+    buckets = []
+    for idx, (start, end) in enumerate(windows):
+        data = totals.get(idx, {"amount_due": 0.0, "count_requests": 0, "currencies": []})
+        bucket = {
+            "period_start": start.isoformat(),
+            "period_end": end.isoformat(),
+            "amount_due": data["amount_due"],
+            "count_requests": data["count_requests"],
+        }
+        if by_currency:
+            bucket["currencies"] = sorted(data["currencies"], key=lambda item: item["currency"])
+        buckets.append(bucket)
+    return buckets
@@ -1,11 +1,12 @@
 import logging
 from typing import Iterable
 
-import resend
 from django.conf import settings
 from django.contrib.auth import get_user_model
 
 from procurement_app.models import PurchaseRequest
+from procurement_app.services import email_outbox
+
 
 User = get_user_model()
 logger = logging.getLogger("procure_to_pay")
@@ -24,27 +25,17 @@ def _from_identity() -> str | None:
     return f"Procure-to-Pay <{sender}>"
 
 
-def _send_email(subject: str, text: str, html: str, recipients: Iterable[str | None]) -> None:
-    api_key = settings.RESEND_API_KEY
+def _queue_email(
+    event_key: str, subject: str, text: str, html: str, recipients: Iterable[str | None]
+) -> None:
+    """Write the email to the outbox in the caller's transaction; a sender worker delivers it."""
+
     sender = _from_identity()
     to = _valid_recipients(recipients)
-    if not (api_key and sender and to):
-        logger.debug("Skipping email send; Resend not configured or no recipients.")
+    if not (sender and to):
+        logger.debug("Skipping email; no sender identity configured or no recipients.")
         return
-    resend.api_key = api_key
-    payload = {
-        "from": sender,
-        "to": to,
-        "subject": subject,
-        "text": text,
-        "html": html,
-        "reply_to": sender,
-    }
-    try:
-        resend.Emails.send(payload)
-        logger.info("Sent notification email '%s' to %s", subject, to)
-    except Exception:
-        logger.exception("Failed to send email via Resend.")
+    email_outbox.enqueue(event_key, sender, subject, text, html, to)
 
 
 def _format_request_details(request_obj: PurchaseRequest) -> tuple[str, str]:
@@ -93,7 +84,13 @@ def notify_intermediate_approval(request_obj: PurchaseRequest, approver: User, n
         f"{html_details}"
         "<p>This is an automated message from the Procure-to-Pay system.</p>"
     )
-    _send_email(subject, text, html, recipients)
+    _queue_email(
+        f"request:{request_obj.pk}:approved-to-level:{request_obj.current_approval_level}",
+        subject,
+        text,
+        html,
+        recipients,
+    )
 
 
 def notify_final_approval(request_obj: PurchaseRequest, approver: User) -> None:
@@ -106,18 +103,18 @@ def notify_final_approval(request_obj: PurchaseRequest, approver: User) -> None:
     text = (
         "Hello,\n\n"
         f"{approver.get_full_name() or approver.username} approved the final level for this request.\n"
-        "Purchase order generation is complete. Finance can now track receipts.\n\n"
+        "A purchase order has been issued. Finance can now track receipts.\n\n"
         f"{text_details}\n\n"
         "This is an automated message from the Procure-to-Pay system."
     )
     html = (
         "<p>Hello,</p>"
         f"<p>{approver.get_full_name() or approver.username} approved the final level for this request."
-        " Purchase order generation is complete. Finance can now track receipts.</p>"
+        " A purchase order has been issued. Finance can now track receipts.</p>"
         f"{html_details}"
         "<p>This is an automated message from the Procure-to-Pay system.</p>"
     )
-    _send_email(subject, text, html, recipients)
+    _queue_email(f"request:{request_obj.pk}:approved", subject, text, html, recipients)
 
 
 def notify_rejection(request_obj: PurchaseRequest, approver: User, comment: str) -> None:
@@ -142,7 +139,7 @@ def notify_rejection(request_obj: PurchaseRequest, approver: User, comment: str)
         "<p>Please review and resubmit if necessary.</p>"
         "<p>This is an automated message from the Procure-to-Pay system.</p>"
     )
-    _send_email(subject, text, html, recipients)
+    _queue_email(f"request:{request_obj.pk}:rejected", subject, text, html, recipients)
 
 
 def _get_role_emails(role: str) -> list[str]:
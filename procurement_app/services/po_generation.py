@@ -1,19 +1,29 @@
+import logging
 import uuid
-from datetime import date
-from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from functools import partial
 
-from django.db import transaction
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Case, F, Q, URLField, Value, When
 from django.utils import timezone
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import LETTER
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
-from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
 from documents.models import DocumentExtractionResult
 from documents.services import storage as storage_service
 from procurement_app.models import PurchaseOrder, PurchaseRequest
 
+from . import po_render
+
+
+logger = logging.getLogger("procure_to_pay")
+
+# Renders started by a commit hook run here, off the request thread. A process restart can drop
+# queued renders; `manage.py render_purchase_orders` picks those up from `pdf_status`.
+_render_executor = ThreadPoolExecutor(
+    max_workers=max(settings.PO_PDF_WORKERS, 1), thread_name_prefix="po-pdf"
+)
+
 
 def build_po_number() -> str:
     stamp = timezone.now().strftime("%Y%m%d")
@@ -48,106 +58,158 @@ def _po_structured_data(request_obj: PurchaseRequest) -> dict:
     }
 
 
-def _build_po_pdf_bytes(po_number: str, request_obj: PurchaseRequest, structured_data: dict) -> bytes:
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=LETTER,
-        rightMargin=40,
-        leftMargin=40,
-        topMargin=60,
-        bottomMargin=40,
-        title=f"Purchase Order {po_number}",
-    )
-    styles = getSampleStyleSheet()
-    story = [
-        Paragraph(f"Purchase Order #{po_number}", styles["Title"]),
-        Spacer(1, 12),
-        Paragraph(f"Vendor: {structured_data.get('vendor_name') or 'N/A'}", styles["Normal"]),
-        Paragraph(f"Currency: {structured_data.get('currency') or 'USD'}", styles["Normal"]),
-        Paragraph(
-            f"Requested By: {request_obj.created_by.full_name or request_obj.created_by.username}",
-            styles["Normal"],
-        ),
-        Paragraph(f"Issue Date: {date.today().isoformat()}", styles["Normal"]),
-        Spacer(1, 18),
-    ]
-
-    table_data = [["Item", "Qty", "Unit Price", "Total"]]
-    for item in structured_data.get("items", []):
-        table_data.append(
-            [
-                item.get("name", ""),
-                item.get("quantity", 0),
-                f"{structured_data.get('currency', 'USD')} {item.get('unit_price', 0):,.2f}",
-                f"{structured_data.get('currency', 'USD')} {item.get('total_price', 0):,.2f}",
-            ]
-        )
-    table = Table(table_data, colWidths=[3 * inch, 0.8 * inch, 1.3 * inch, 1.3 * inch])
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("ALIGN", (1, 0), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 10),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ]
-        )
-    )
-    story.append(table)
-    story.append(Spacer(1, 12))
-    story.append(
-        Paragraph(
-            f"<b>Total:</b> {structured_data.get('currency', 'USD')} "
-            f"{structured_data.get('total_amount', 0):,.2f}",
-            styles["Heading3"],
-        )
-    )
-    story.append(Spacer(1, 12))
-    story.append(
-        Paragraph(f"<b>Terms:</b><br/>{structured_data.get('terms') or 'Payment within 30 days.'}", styles["BodyText"])
-    )
-    doc.build(story)
-    buffer.seek(0)
-    return buffer.read()
-
-
 @transaction.atomic
 def ensure_purchase_order_exists(request_obj: PurchaseRequest) -> PurchaseOrder:
+    """
+    Create the PO row for an approved request; the PDF is rendered once the transaction commits.
+
+    Only the cheap ``structured_data`` insert happens here, so callers holding the request row
+    lock (``workflow.approve_request``) do not wait on reportlab or the storage upload.
+    """
+
     if hasattr(request_obj, "purchase_order"):
         return request_obj.purchase_order
 
     structured = _po_structured_data(request_obj)
-    po_number = build_po_number()
-    pdf_bytes = _build_po_pdf_bytes(po_number, request_obj, structured)
-    firebase_url = storage_service.upload_bytes(pdf_bytes, "purchase_orders", f"{po_number}.pdf")
-
     po = PurchaseOrder.objects.create(
         purchase_request=request_obj,
-        po_number=po_number,
+        po_number=build_po_number(),
         vendor_name=structured.get("vendor_name") or "",
         currency=structured.get("currency") or "USD",
         issue_date=date.today(),
         total_amount=structured.get("total_amount") or request_obj.amount_estimated,
         terms=structured.get("terms", ""),
-        firebase_url=firebase_url,
         structured_data=structured,
+        pdf_status=PurchaseOrder.PdfStatus.PENDING,
     )
+    transaction.on_commit(partial(schedule_pdf_render, po.pk))
+    return po
 
-    request_obj.purchase_order_url = firebase_url
-    request_obj.save(update_fields=["purchase_order_url", "updated_at"])
 
-    DocumentExtractionResult.objects.create(
-        purchase_request=request_obj,
-        doc_type=DocumentExtractionResult.DocTypes.PO,
-        firebase_url=firebase_url,
-        raw_text="Generated internally",
-        baseline_data=structured,
-        model_data=None,
-        final_data=structured,
-        engine_used="generator",
-        confidence_score=1.0,
+def schedule_pdf_render(po_id) -> None:
+    if settings.PO_PDF_BACKGROUND:
+        _render_executor.submit(_render_in_thread, po_id)
+    else:
+        render_purchase_order_pdf(po_id)
+
+
+def _render_in_thread(po_id) -> None:
+    try:
+        render_purchase_order_pdf(po_id)
+    except Exception:
+        logger.exception("Background PDF render crashed for purchase order %s", po_id)
+    finally:
+        connections.close_all()
+
+
+def _claim_for_render(po_id) -> bool:
+    lease = timezone.now() - timedelta(seconds=settings.PO_PDF_RENDER_LEASE_SECONDS)
+    claimable = Q(pdf_status__in=[PurchaseOrder.PdfStatus.PENDING, PurchaseOrder.PdfStatus.FAILED])
+    claimable |= Q(pdf_status=PurchaseOrder.PdfStatus.RENDERING, updated_at__lt=lease)
+    return bool(
+        PurchaseOrder.objects.filter(claimable, pk=po_id).update(
+            pdf_status=PurchaseOrder.PdfStatus.RENDERING,
+            pdf_attempts=F("pdf_attempts") + 1,
+            updated_at=timezone.now(),
+        )
     )
+
+
+def render_purchase_order_pdf(po_id) -> PurchaseOrder | None:
+    """
+    Render and upload the PDF for one PO, then publish its URL on the PO and its request.
+
+    The row is claimed with a conditional ``UPDATE`` first, so the commit hook and the
+    ``render_purchase_orders`` sweeper never render the same PO twice. Returns ``None`` when
+    the PO is already ready or another process holds it.
+    """
+
+    if not _claim_for_render(po_id):
+        return None
+    po = PurchaseOrder.objects.select_related("purchase_request__created_by").get(pk=po_id)
+    request_obj = po.purchase_request
+    try:
+        pdf_bytes = po_render.render(
+            po_render.render_payload(
+                po.po_number, request_obj, po.structured_data, issue_date=po.issue_date
+            )
+        )
+        firebase_url = storage_service.upload_bytes(
+            pdf_bytes, "purchase_orders", f"{po.po_number}.pdf"
+        )
+    except Exception as exc:
+        logger.exception("PDF render failed for purchase order %s", po.po_number)
+        po.pdf_status = PurchaseOrder.PdfStatus.FAILED
+        po.pdf_error = f"{type(exc).__name__}: {exc}"
+        po.save(update_fields=["pdf_status", "pdf_error", "updated_at"])
+        return po
+
+    now = timezone.now()
+    with transaction.atomic():
+        po.firebase_url = firebase_url
+        po.pdf_status = PurchaseOrder.PdfStatus.READY
+        po.pdf_error = ""
+        po.save(update_fields=["firebase_url", "pdf_status", "pdf_error", "updated_at"])
+        PurchaseRequest.objects.filter(pk=request_obj.pk).update(
+            purchase_order_url=firebase_url, updated_at=now
+        )
+        DocumentExtractionResult.objects.create(
+            purchase_request=request_obj,
+            doc_type=DocumentExtractionResult.DocTypes.PO,
+            firebase_url=firebase_url,
+            raw_text="Generated internally",
+            baseline_data=po.structured_data,
+            model_data=None,
+            final_data=po.structured_data,
+            engine_used="generator",
+            confidence_score=1.0,
+        )
+        storage_service.queue_replication(firebase_url)
     return po
+
+
+def outstanding_pdf_renders():
+    """POs whose PDF still needs rendering: pending, failed with retries left, or stuck."""
+
+    lease = timezone.now() - timedelta(seconds=settings.PO_PDF_RENDER_LEASE_SECONDS)
+    return PurchaseOrder.objects.filter(
+        Q(pdf_status=PurchaseOrder.PdfStatus.PENDING)
+        | Q(
+            pdf_status=PurchaseOrder.PdfStatus.FAILED,
+            pdf_attempts__lt=settings.PO_PDF_MAX_ATTEMPTS,
+        )
+        | Q(pdf_status=PurchaseOrder.PdfStatus.RENDERING, updated_at__lt=lease)
+    ).order_by("updated_at")
+
+
+def publish_regenerated(uploads: list[tuple[PurchaseOrder, str]]) -> None:
+    """Point POs, their requests and the PO extraction rows at freshly uploaded PDFs."""
+
+    if not uploads:
+        return
+    now = timezone.now()
+    requests = []
+    for po, firebase_url in uploads:
+        po.firebase_url = firebase_url
+        po.pdf_status = PurchaseOrder.PdfStatus.READY
+        po.pdf_error = ""
+        po.updated_at = now
+        request_obj = po.purchase_request
+        request_obj.purchase_order_url = firebase_url
+        request_obj.updated_at = now
+        requests.append(request_obj)
+    new_urls = [
+        When(purchase_request_id=po.purchase_request_id, then=Value(url)) for po, url in uploads
+    ]
+    with transaction.atomic():
+        PurchaseOrder.objects.bulk_update(
+            [po for po, _ in uploads], ["firebase_url", "pdf_status", "pdf_error", "updated_at"]
+        )
+        PurchaseRequest.objects.bulk_update(requests, ["purchase_order_url", "updated_at"])
+        DocumentExtractionResult.objects.filter(
+            doc_type=DocumentExtractionResult.DocTypes.PO,
+            purchase_request_id__in=[po.purchase_request_id for po, _ in uploads],
+        ).update(
+            firebase_url=Case(*new_urls, default=F("firebase_url"), output_field=URLField())
+        )
+        storage_service.queue_replication(*(url for _, url in uploads))
@@ -0,0 +1,163 @@
+"""
+Purchase order PDF rendering.
+
+Rendering works on plain dicts (see ``render_payload``) so it can run in worker processes:
+reportlab layout is pure-Python CPU work, and doing it on a web worker thread holds the GIL
+for the whole render. Paragraph styles and the item table style are built once per process.
+"""
+
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import lru_cache
+from io import BytesIO
+
+from django.conf import settings
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+
+DEFAULT_TERMS = "Payment within 30 days."
+ITEM_COLUMN_WIDTHS = (3 * inch, 0.8 * inch, 1.3 * inch, 1.3 * inch)
+PAGE_MARGINS = {"rightMargin": 40, "leftMargin": 40, "topMargin": 60, "bottomMargin": 40}
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _layout() -> dict:
+    styles = getSampleStyleSheet()
+    return {
+        "title": styles["Title"],
+        "normal": styles["Normal"],
+        "heading": styles["Heading3"],
+        "body": styles["BodyText"],
+        "table_style": TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1f2937")),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+                ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 10),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ]
+        ),
+    }
+
+
+def render_payload(
+    po_number: str, request_obj, structured_data: dict, issue_date: date | None = None
+) -> dict:
+    """Everything the template needs, as a picklable dict."""
+
+    creator = request_obj.created_by
+    return {
+        "po_number": po_number,
+        "vendor_name": structured_data.get("vendor_name") or "N/A",
+        "currency": structured_data.get("currency") or "USD",
+        "requested_by": creator.full_name or creator.username,
+        "issue_date": (issue_date or date.today()).isoformat(),
+        "items": structured_data.get("items", []),
+        "total_amount": structured_data.get("total_amount", 0),
+        "terms": structured_data.get("terms") or DEFAULT_TERMS,
+    }
+
+
+def render_pdf(payload: dict) -> bytes:
+    """Render one PO in the current process."""
+
+    layout = _layout()
+    currency = payload["currency"]
+    table_data = [["Item", "Qty", "Unit Price", "Total"]]
+    table_data.extend(
+        [
+            item.get("name", ""),
+            item.get("quantity", 0),
+            f"{currency} {item.get('unit_price', 0):,.2f}",
+            f"{currency} {item.get('total_price', 0):,.2f}",
+        ]
+        for item in payload["items"]
+    )
+    table = Table(table_data, colWidths=ITEM_COLUMN_WIDTHS, repeatRows=1)
+    table.setStyle(layout["table_style"])
+
+    story = [
+        Paragraph(f"Purchase Order #{payload['po_number']}", layout["title"]),
+        Spacer(1, 12),
+        Paragraph(f"Vendor: {payload['vendor_name']}", layout["normal"]),
+        Paragraph(f"Currency: {currency}", layout["normal"]),
+        Paragraph(f"Requested By: {payload['requested_by']}", layout["normal"]),
+        Paragraph(f"Issue Date: {payload['issue_date']}", layout["normal"]),
+        Spacer(1, 18),
+        table,
+        Spacer(1, 12),
+        Paragraph(
+            f"<b>Total:</b> {currency} {payload['total_amount']:,.2f}", layout["heading"]
+        ),
+        Spacer(1, 12),
+        Paragraph(f"<b>Terms:</b><br/>{payload['terms']}", layout["body"]),
+    ]
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=LETTER,
+        title=f"Purchase Order {payload['po_number']}",
+        # No timestamp or random document ID: the same PO renders to the same bytes, so
+        # content-addressed storage can skip re-uploading it.
+        invariant=True,
+        **PAGE_MARGINS,
+    )
+    doc.build(story)
+    return buffer.getvalue()
+
+
+def _get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if settings.PO_RENDER_WORKERS <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            # spawn, not fork: the parent is a threaded web/worker process with open DB sockets.
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.PO_RENDER_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def shutdown() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+
+
+atexit.register(shutdown)
+
+
+def render(payload: dict) -> bytes:
+    """Render one PO on the process pool (inline when ``PO_RENDER_WORKERS`` is 0)."""
+
+    executor = _get_executor()
+    if executor is None:
+        return render_pdf(payload)
+    return executor.submit(render_pdf, payload).result()
+
+
+def render_many(payloads: list[dict]) -> list[bytes]:
+    """Render several POs, spread across the pool; results keep the input order."""
+
+    executor = _get_executor()
+    if executor is None:
+        return [render_pdf(payload) for payload in payloads]
+    chunksize = max(1, len(payloads) // (settings.PO_RENDER_WORKERS * 4))
+    return list(executor.map(render_pdf, payloads, chunksize=chunksize))
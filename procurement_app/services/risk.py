@@ -0,0 +1,36 @@
+from decimal import Decimal
+
+from procurement_app.models import PurchaseRequest
+
+
+RISK_FIELDS = ["risk_level", "risk_reasons"]
+
+
+def calculate_risk(request_obj: PurchaseRequest):
+    reasons = []
+    amount = request_obj.amount_estimated or Decimal("0")
+    if amount >= Decimal("50000"):
+        reasons.append("Amount > 50,000")
+    elif amount >= Decimal("25000"):
+        reasons.append("Amount > 25,000")
+    if not request_obj.vendor_name:
+        reasons.append("Missing vendor")
+    if request_obj.status == PurchaseRequest.Status.PENDING and request_obj.current_approval_level == 2:
+        reasons.append("Awaiting Level 2 approval")
+    level = PurchaseRequest.RiskLevel.LOW
+    if len(reasons) >= 2:
+        level = PurchaseRequest.RiskLevel.HIGH
+    elif reasons:
+        level = PurchaseRequest.RiskLevel.MEDIUM
+    return level, reasons
+
+
+def apply_risk(request_obj: PurchaseRequest) -> bool:
+    """Recompute the stored risk columns in memory; return True when they changed."""
+
+    level, reasons = calculate_risk(request_obj)
+    if request_obj.risk_level == level and request_obj.risk_reasons == reasons:
+        return False
+    request_obj.risk_level = level
+    request_obj.risk_reasons = reasons
+    return True
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import re
+
+from django.contrib.auth import get_user_model
+from django.contrib.postgres.search import SearchQuery, SearchVector
+from django.db.models import OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Replace
+
+
+# "simple" keeps vendor names and references intact instead of stemming them as English words.
+SEARCH_CONFIG = "simple"
+SEARCHABLE_FIELDS = frozenset({"title", "description", "reference", "vendor_name", "created_by"})
+_TOKEN_RE = re.compile(r"\w+")
+# The parser reads "REQ-20261017-7F3A2" as signed numbers ("-20261017", "-7", "f3a2"); with
+# the hyphens as spaces each part is one token, so a prefix query finds the reference.
+REFERENCE_SEPARATOR = "-"
+
+
+def _weighted_vector(title, reference, vendor_name, requester, description):
+    return (
+        SearchVector(title, weight="A", config=SEARCH_CONFIG)
+        + SearchVector(reference, weight="A", config=SEARCH_CONFIG)
+        + SearchVector(vendor_name, weight="B", config=SEARCH_CONFIG)
+        + SearchVector(Coalesce(requester, Value("")), weight="B", config=SEARCH_CONFIG)
+        + SearchVector(description, weight="C", config=SEARCH_CONFIG)
+    )
+
+
+def search_vector_expression(user_model=None):
+    """Weighted tsvector over title/reference (A), vendor/requester (B) and description (C)."""
+
+    user_model = user_model or get_user_model()
+    requester = Subquery(user_model.objects.filter(pk=OuterRef("created_by_id")).values("full_name")[:1])
+    reference = Replace("reference", Value(REFERENCE_SEPARATOR), Value(" "))
+    return _weighted_vector("title", reference, "vendor_name", requester, "description")
+
+
+def instance_search_vector(instance, user_model=None):
+    """
+    The same vector built from ``instance``'s values rather than its columns, so it can be
+    written by the INSERT or UPDATE that saves the row.
+    """
+
+    user_model = user_model or get_user_model()
+    requester = Subquery(
+        user_model.objects.filter(pk=instance.created_by_id).values("full_name")[:1]
+    )
+    return _weighted_vector(
+        Value(instance.title or ""),
+        Value((instance.reference or "").replace(REFERENCE_SEPARATOR, " ")),
+        Value(instance.vendor_name or ""),
+        requester,
+        Value(instance.description or ""),
+    )
+
+
+def refresh_search_vectors(queryset, user_model=None) -> int:
+    """Recompute ``search_vector`` for every row in ``queryset`` with a single UPDATE."""
+
+    return queryset.update(search_vector=search_vector_expression(user_model))
+
+
+def build_search_query(text: str) -> SearchQuery | None:
+    """Turn free text into a prefix-matching tsquery (``lapt dell`` -> ``lapt:* & dell:*``)."""
+
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if not tokens:
+        return None
+    raw = " & ".join(f"{token}:*" for token in tokens)
+    return SearchQuery(raw, search_type="raw", config=SEARCH_CONFIG)
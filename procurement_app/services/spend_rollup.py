@@ -0,0 +1,157 @@
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import connection, transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from procurement_app.models import PurchaseRequest, VendorSpendDaily
+
+
+ROLLUP_FIELDS = ("vendor_name", "currency", "status", "amount_estimated", "created_at")
+KEY_FIELDS = ("vendor_name", "currency", "status", "day")
+CENT = Decimal("0.01")
+
+
+def tracks(update_fields) -> bool:
+    """Whether a save with ``update_fields`` can change a request's rollup contribution."""
+
+    return update_fields is None or not set(ROLLUP_FIELDS).isdisjoint(update_fields)
+
+
+def stored_values(purchase_request: PurchaseRequest) -> dict | None:
+    """Lock the stored row and return the columns the rollup is keyed on."""
+
+    return (
+        PurchaseRequest.objects.select_for_update()
+        .filter(pk=purchase_request.pk)
+        .values(*ROLLUP_FIELDS)
+        .first()
+    )
+
+
+def current_values(purchase_request: PurchaseRequest, previous: dict | None, update_fields) -> dict:
+    """Values as persisted after a save that only wrote ``update_fields``."""
+
+    if previous is None or update_fields is None:
+        return {field: getattr(purchase_request, field) for field in ROLLUP_FIELDS}
+    return {
+        field: getattr(purchase_request, field) if field in update_fields else previous[field]
+        for field in ROLLUP_FIELDS
+    }
+
+
+def record_change(before: dict | None, after: dict | None) -> None:
+    """Move one request's contribution from the ``before`` bucket to the ``after`` bucket."""
+
+    record_changes([(before, after)])
+
+
+def record_changes(changes) -> None:
+    """Apply many ``(before, after)`` moves, netting them into one upsert per bucket."""
+
+    deltas = defaultdict(lambda: [Decimal("0"), 0])
+    for before, after in changes:
+        for values, sign in ((before, -1), (after, 1)):
+            if values is None:
+                continue
+            key = (
+                values["vendor_name"] or "",
+                values["currency"] or "",
+                values["status"],
+                timezone.localdate(values["created_at"]),
+            )
+            amount = Decimal(str(values["amount_estimated"] or 0)).quantize(CENT, ROUND_HALF_UP)
+            deltas[key][0] += sign * amount
+            deltas[key][1] += sign
+    for key, (amount, count) in deltas.items():
+        if amount or count:
+            _apply_delta(key, amount, count)
+
+
+def _apply_delta(key, amount: Decimal, count: int) -> None:
+    table = connection.ops.quote_name(VendorSpendDaily._meta.db_table)
+    columns = ", ".join(KEY_FIELDS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}, amount, request_count) "
+            "VALUES (%s, %s, %s, %s, %s, %s) "
+            f"ON CONFLICT ({columns}) DO UPDATE SET "
+            f"amount = {table}.amount + EXCLUDED.amount, "
+            f"request_count = {table}.request_count + EXCLUDED.request_count",
+            [*key, amount, count],
+        )
+        if count < 0:
+            conditions = " AND ".join(f"{column} = %s" for column in KEY_FIELDS)
+            cursor.execute(
+                f"DELETE FROM {table} WHERE {conditions} AND request_count <= 0", list(key)
+            )
+
+
+def live_totals(queryset=None):
+    """Aggregate requests exactly as the rollup stores them."""
+
+    queryset = PurchaseRequest.objects.all() if queryset is None else queryset
+    return (
+        queryset.annotate(day=TruncDate("created_at"))
+        .order_by()
+        .values(*KEY_FIELDS)
+        .annotate(amount=Sum("amount_estimated"), request_count=Count("pk"))
+    )
+
+
+@transaction.atomic
+def rebuild(batch_size: int = 5000) -> int:
+    """Recompute the whole rollup from the request table; returns the number of rows written."""
+
+    # Block request writes for the duration so the rebuilt snapshot cannot miss a delta.
+    with connection.cursor() as cursor:
+        cursor.execute(f"LOCK TABLE {PurchaseRequest._meta.db_table} IN SHARE MODE")
+    VendorSpendDaily.objects.all().delete()
+    rows = live_totals().iterator(chunk_size=batch_size)
+    created = VendorSpendDaily.objects.bulk_create(
+        (VendorSpendDaily(**row) for row in rows), batch_size=batch_size
+    )
+    return len(created)
+
+
+def find_drift() -> list[dict]:
+    """Compare the rollup with a live aggregate and list every bucket that disagrees."""
+
+    expected = {
+        tuple(row[field] for field in KEY_FIELDS): (row["amount"], row["request_count"])
+        for row in live_totals()
+    }
+    actual = {
+        tuple(row[field] for field in KEY_FIELDS): (row["amount"], row["request_count"])
+        for row in VendorSpendDaily.objects.values(*KEY_FIELDS, "amount", "request_count")
+    }
+    drift = []
+    for key in sorted(expected.keys() | actual.keys(), key=str):
+        if expected.get(key) != actual.get(key):
+            drift.append(
+                {
+                    **dict(zip(KEY_FIELDS, key, strict=True)),
+                    "expected": expected.get(key, (Decimal("0"), 0)),
+                    "actual": actual.get(key, (Decimal("0"), 0)),
+                }
+            )
+    return drift
+
+
+def vendor_spend(*, status: str, vendor_contains="", day_from=None, day_to=None, limit: int = 5):
+    """Top vendors by spend, answered from the rollup instead of the request table."""
+
+    queryset = VendorSpendDaily.objects.filter(status=status).exclude(vendor_name="")
+    if vendor_contains:
+        queryset = queryset.filter(vendor_name__icontains=vendor_contains)
+    if day_from:
+        queryset = queryset.filter(day__gte=day_from)
+    if day_to:
+        queryset = queryset.filter(day__lte=day_to)
+    return list(
+        queryset.values("vendor_name")
+        .annotate(total_amount=Sum("amount"), count_requests=Sum("request_count"))
+        .order_by("-total_amount", "vendor_name")[:limit]
+    )
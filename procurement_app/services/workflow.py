@@ -1,12 +1,18 @@
+import logging
+import uuid
+
 from django.contrib.auth import get_user_model
 from django.db import transaction
 from django.utils import timezone
 
 from procurement_app.models import Approval, PurchaseRequest
 
-from . import po_generation, notifications
+from . import notifications, po_generation, spend_rollup
+from .risk import RISK_FIELDS, apply_risk
+
 
 User = get_user_model()
+logger = logging.getLogger("procure_to_pay")
 
 
 class WorkflowError(Exception):
@@ -70,17 +76,19 @@ def approve_request(purchase_request_id, user: User, comment: str = "") -> Purch
     )
 
     remaining = _decrement_required_levels(request_obj)
-    update_fields = ["required_approval_levels", "updated_at"]
+    update_fields = ["required_approval_levels", "updated_at", *RISK_FIELDS]
 
     if remaining == 0:
         request_obj.status = PurchaseRequest.Status.APPROVED
         request_obj.current_approval_level = level
         update_fields.extend(["status", "current_approval_level"])
+        apply_risk(request_obj)
         request_obj.save(update_fields=update_fields)
         po_generation.ensure_purchase_order_exists(request_obj)
     else:
         request_obj.current_approval_level = min(request_obj.current_approval_level + 1, level + 1)
         update_fields.append("current_approval_level")
+        apply_risk(request_obj)
         request_obj.save(update_fields=update_fields)
         next_role = ROLE_BY_LEVEL.get(request_obj.current_approval_level)
         notifications.notify_intermediate_approval(request_obj, user, next_role)
@@ -90,6 +98,115 @@ def approve_request(purchase_request_id, user: User, comment: str = "") -> Purch
     return request_obj
 
 
+def bulk_approve_requests(purchase_request_ids, user: User, comment: str = "") -> dict:
+    """
+    Approve many requests in one transaction and return ``{"approved": [...], "errors": [...]}``.
+
+    All target rows are locked by a single ``SELECT ... FOR UPDATE`` in primary-key order (so
+    concurrent batches cannot deadlock), validated in memory, and written back with one
+    ``bulk_create``/``bulk_update`` pair. Notifications are queued in the same transaction; PO
+    generation runs after commit.
+    """
+
+    clean_comment = _clean_comment(comment)
+    approved: list[str] = []
+    errors: list[dict] = []
+    finals: list[PurchaseRequest] = []
+    intermediates: list[PurchaseRequest] = []
+
+    requested: list[tuple[str, uuid.UUID | None]] = []
+    for raw_id in purchase_request_ids:
+        try:
+            requested.append((str(raw_id), uuid.UUID(str(raw_id))))
+        except ValueError:
+            requested.append((str(raw_id), None))
+
+    with transaction.atomic():
+        locked = {
+            obj.pk: obj
+            for obj in PurchaseRequest.objects.select_for_update(of=("self",))
+            .select_related("created_by")
+            .filter(pk__in={pk for _, pk in requested if pk is not None})
+            .order_by("pk")
+        }
+        now = timezone.now()
+        approvals, changed, rollup_changes, seen = [], [], [], set()
+        for raw_id, pk in requested:
+            request_obj = locked.get(pk)
+            if request_obj is None:
+                errors.append({"id": raw_id, "detail": "Purchase request not found."})
+                continue
+            if pk in seen:
+                errors.append({"id": raw_id, "detail": "Request listed more than once."})
+                continue
+            seen.add(pk)
+            if request_obj.status != PurchaseRequest.Status.PENDING:
+                errors.append({"id": raw_id, "detail": "Only pending requests can be approved."})
+                continue
+            level = request_obj.current_approval_level
+            try:
+                _validate_user_for_level(user, level)
+            except WorkflowError as exc:
+                errors.append({"id": raw_id, "detail": str(exc)})
+                continue
+
+            approvals.append(
+                Approval(
+                    purchase_request=request_obj,
+                    approver=user,
+                    level=level,
+                    decision=Approval.Decision.APPROVED,
+                    comment=clean_comment,
+                )
+            )
+            before = spend_rollup.current_values(request_obj, None, None)
+            if _decrement_required_levels(request_obj) == 0:
+                request_obj.status = PurchaseRequest.Status.APPROVED
+                request_obj.current_approval_level = level
+                after = spend_rollup.current_values(request_obj, None, None)
+                rollup_changes.append((before, after))
+                finals.append(request_obj)
+            else:
+                request_obj.current_approval_level = level + 1
+                intermediates.append(request_obj)
+            request_obj.updated_at = now
+            apply_risk(request_obj)
+            changed.append(request_obj)
+            approved.append(str(request_obj.pk))
+
+        Approval.objects.bulk_create(approvals)
+        # bulk_update skips the save signals, so the rollup deltas are applied here in one pass.
+        PurchaseRequest.objects.bulk_update(
+            changed,
+            [
+                "status",
+                "current_approval_level",
+                "required_approval_levels",
+                "updated_at",
+                *RISK_FIELDS,
+            ],
+        )
+        spend_rollup.record_changes(rollup_changes)
+        # Notifications go to the outbox in this transaction; only PO generation waits for commit.
+        for request_obj in finals:
+            notifications.notify_final_approval(request_obj, user)
+        for request_obj in intermediates:
+            next_role = ROLE_BY_LEVEL.get(request_obj.current_approval_level)
+            notifications.notify_intermediate_approval(request_obj, user, next_role)
+        if finals:
+            transaction.on_commit(lambda: _generate_purchase_orders(finals))
+
+    return {"approved": approved, "errors": errors}
+
+
+def _generate_purchase_orders(finals) -> None:
+    for request_obj in finals:
+        try:
+            po_generation.ensure_purchase_order_exists(request_obj)
+        except Exception:  # one failed PO must not block the rest of the batch
+            logger.exception("Purchase order generation failed for %s", request_obj.pk)
+
+
 @transaction.atomic
 def reject_request(purchase_request_id, user: User, comment: str = "") -> PurchaseRequest:
     """Reject the purchase request and stop the workflow."""
@@ -118,6 +235,7 @@ def reject_request(purchase_request_id, user: User, comment: str = "") -> Purcha
     request_obj.status = PurchaseRequest.Status.REJECTED
     request_obj.updated_at = timezone.now()
     request_obj.required_approval_levels = 0
-    request_obj.save(update_fields=["status", "required_approval_levels", "updated_at"])
+    apply_risk(request_obj)
+    request_obj.save(update_fields=["status", "required_approval_levels", "updated_at", *RISK_FIELDS])
     notifications.notify_rejection(request_obj, user, clean_comment)
     return request_obj
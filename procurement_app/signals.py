@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from procurement_app.models import PurchaseRequest
+from procurement_app.services import spend_rollup
+from procurement_app.services.search import refresh_search_vectors
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def refresh_requester_search_vectors(sender, instance=None, created=False, update_fields=None, **kwargs):
+    """Keep the requester name inside ``search_vector`` in sync when a user is renamed."""
+
+    if created or instance is None:
+        return
+    if update_fields is not None and "full_name" not in update_fields:
+        return
+    refresh_search_vectors(PurchaseRequest.objects.filter(created_by=instance))
+
+
+@receiver(pre_save, sender=PurchaseRequest)
+def capture_spend_contribution(sender, instance, update_fields=None, **kwargs):
+    """Lock the stored row and remember what it currently contributes to the spend rollup."""
+
+    instance._spend_rollup_before = None
+    if instance._state.adding or not spend_rollup.tracks(update_fields):
+        return
+    instance._spend_rollup_before = spend_rollup.stored_values(instance)
+
+
+@receiver(post_save, sender=PurchaseRequest)
+def update_spend_rollup(sender, instance, update_fields=None, **kwargs):
+    if not spend_rollup.tracks(update_fields):
+        return
+    before = getattr(instance, "_spend_rollup_before", None)
+    after = spend_rollup.current_values(instance, before, update_fields)
+    spend_rollup.record_change(before, after)
+
+
+@receiver(pre_delete, sender=PurchaseRequest)
+def capture_deleted_spend_contribution(sender, instance, **kwargs):
+    instance._spend_rollup_before = spend_rollup.stored_values(instance)
+
+
+@receiver(post_delete, sender=PurchaseRequest)
+def remove_spend_contribution(sender, instance, **kwargs):
+    spend_rollup.record_change(getattr(instance, "_spend_rollup_before", None), None)
@@ -1,21 +1,46 @@
-from datetime import timedelta
-from django.db.models import Count, Q, Sum
+import hashlib
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import (
+    Count,
+    Exists,
+    IntegerField,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date
 from django.views.decorators.cache import cache_page
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import mixins, serializers, status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.filters import OrderingFilter
 from rest_framework.parsers import FormParser, JSONParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
 from accounts.permissions import IsFinance
+from core.pagination import ChronologicalPagination, KeysetPagination
 from core.security_logging import log_receipt_validation, log_request_approved
 from core.throttling import HeavyActionThrottle
-from django.utils import timezone
-from django.utils.dateparse import parse_date
-from documents.models import DocumentExtractionResult, ReceiptValidationResult
-from documents.services import extraction as extraction_service, validation as validation_service
+from documents.models import DocumentExtractionResult
+from documents.services import (
+    extraction as extraction_service,
+    jobs as extraction_jobs,
+    validation as validation_service,
+)
+from procurement_app.filters import PurchaseRequestFilter, PurchaseRequestSearchFilter
 from procurement_app.models import (
+    Approval,
     FinanceDecision,
     PurchaseRequest,
     RequestComment,
@@ -26,15 +51,73 @@ from procurement_app.permissions import IsOwnerOrReadOnly
 from procurement_app.serializers import (
     ApprovalActionSerializer,
     DocumentExtractionResultSerializer,
+    ExtractionJobSerializer,
     FinanceDecisionSerializer,
     PurchaseRequestSerializer,
-    RequestCommentSerializer,
     ReceiptUploadSerializer,
     ReceiptValidationResultSerializer,
+    RequestCommentSerializer,
     SavedRequestViewSerializer,
 )
-from procurement_app.services import workflow
-from procurement_app.filters import PurchaseRequestFilter
+from procurement_app.services import forecast as forecast_service, spend_rollup, workflow
+
+
+UUID_PATTERN = r"[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+
+# Query parameters the vendor-spend rollup can answer without touching the request table.
+SPEND_ROLLUP_PARAMS = {
+    "status",
+    "vendor_name",
+    "created_from",
+    "start_date",
+    "end_date",
+    "limit",
+    "ordering",
+    "format",
+}
+
+
+def _wants_async_extraction(request) -> bool:
+    """``?async=1``/``?async=0`` overrides the ``EXTRACTION_ASYNC`` default for one upload."""
+
+    value = request.query_params.get("async")
+    if value is None:
+        return settings.EXTRACTION_ASYNC
+    return value.lower() in {"1", "true", "yes"}
+
+
+def _with_comment_activity(queryset, user):
+    """Annotate ``comment_count`` and ``has_unread_comments`` as correlated subqueries."""
+
+    comments = RequestComment.objects.filter(purchase_request=OuterRef("pk")).order_by()
+    comment_count = Subquery(
+        comments.values("purchase_request").annotate(total=Count("pk")).values("total"),
+        output_field=IntegerField(),
+    )
+    unread = comments.filter(
+        ~Exists(RequestCommentReceipt.objects.filter(comment=OuterRef("pk"), user=user))
+    )
+    return queryset.annotate(
+        comment_count=Coalesce(comment_count, Value(0)),
+        has_unread_comments=Exists(unread),
+    )
+
+
+APPROVER_LEVELS = {"approver_lvl1": 1, "approver_lvl2": 2}
+
+
+def approver_inbox(queryset, user, level: int):
+    """
+    Requests waiting on ``level`` plus any request ``user`` has already decided on.
+
+    The "already decided" half is a correlated EXISTS rather than a join, so rows are never
+    duplicated and the main query needs no DISTINCT.
+    """
+
+    decided = Approval.objects.filter(purchase_request=OuterRef("pk"), approver=user)
+    return queryset.filter(
+        Q(status=PurchaseRequest.Status.PENDING, current_approval_level=level) | Exists(decided)
+    )
 
 
 @cache_page(60)
@@ -56,11 +139,27 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
     parser_classes = (MultiPartParser, FormParser, JSONParser)
     queryset = (
         PurchaseRequest.objects.all()
-        .select_related("created_by", "purchase_order", "receipt_validation", "finance_decision")
-        .prefetch_related("items", "approvals", "extraction_results", "comments", "comments__receipts")
+        .select_related(
+            "created_by",
+            "purchase_order",
+            "receipt_validation",
+            "finance_decision__decided_by",
+        )
+        .prefetch_related(
+            "items",
+            Prefetch("approvals", queryset=Approval.objects.select_related("approver")),
+            # The timeline only needs doc_type/created_at; skip the raw OCR text and JSON payloads.
+            Prefetch(
+                "extraction_results",
+                queryset=DocumentExtractionResult.objects.only(
+                    "id", "purchase_request_id", "doc_type", "created_at"
+                ),
+            ),
+        )
     )
     filterset_class = PurchaseRequestFilter
-    search_fields = ["title", "reference", "vendor_name", "created_by__full_name"]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, PurchaseRequestSearchFilter, OrderingFilter]
     ordering_fields = ["created_at", "amount_estimated", "needed_by"]
     ordering = ["-created_at"]
 
@@ -94,19 +193,12 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         qs = super().get_queryset()
         if not user.is_authenticated:
             return qs.none()
+        qs = _with_comment_activity(qs, user)
 
         if user.role == "staff":
             return qs.filter(created_by=user)
-        if user.role == "approver_lvl1":
-            return qs.filter(
-                Q(status=PurchaseRequest.Status.PENDING, current_approval_level=1)
-                | Q(approvals__approver=user)
-            ).distinct()
-        if user.role == "approver_lvl2":
-            return qs.filter(
-                Q(status=PurchaseRequest.Status.PENDING, current_approval_level=2)
-                | Q(approvals__approver=user)
-            ).distinct()
+        if user.role in APPROVER_LEVELS:
+            return approver_inbox(qs, user, APPROVER_LEVELS[user.role])
         if user.role == "finance":
             return qs.filter(status__in=[PurchaseRequest.Status.APPROVED, PurchaseRequest.Status.REJECTED])
         return qs
@@ -131,14 +223,34 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         proforma_file = self.request.FILES.get("proforma_file")
         if not proforma_file:
             raise serializers.ValidationError({"proforma_file": "This field is required."})
-        purchase_request = serializer.save()
-        if hasattr(proforma_file, "seek"):
-            proforma_file.seek(0)
-        extraction_service.extract_document(
-            purchase_request=purchase_request,
-            doc_type=DocumentExtractionResult.DocTypes.PROFORMA,
-            uploaded_file=proforma_file,
-        )
+        if not _wants_async_extraction(self.request):
+            purchase_request = serializer.save()
+            if hasattr(proforma_file, "seek"):
+                proforma_file.seek(0)
+            extraction_service.extract_document(
+                purchase_request=purchase_request,
+                doc_type=DocumentExtractionResult.DocTypes.PROFORMA,
+                uploaded_file=proforma_file,
+            )
+            return
+        with transaction.atomic():
+            purchase_request = serializer.save()
+            self.extraction_job = extraction_jobs.enqueue(
+                purchase_request=purchase_request,
+                doc_type=DocumentExtractionResult.DocTypes.PROFORMA,
+                uploaded_file=proforma_file,
+                requested_by=self.request.user,
+            )
+
+    def create(self, request, *args, **kwargs):
+        self.extraction_job = None
+        response = super().create(request, *args, **kwargs)
+        if self.extraction_job is not None:
+            job = ExtractionJobSerializer(self.extraction_job, context=self.get_serializer_context()).data
+            response.data = {**response.data, "extraction_job": job}
+            response.status_code = status.HTTP_202_ACCEPTED
+            response["Location"] = job["status_url"]
+        return response
 
     @action(detail=True, methods=["patch"], url_path="approve", serializer_class=ApprovalActionSerializer)
     def approve(self, request, pk=None):
@@ -171,12 +283,18 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
     def comments(self, request, pk=None):
         purchase_request = self.get_object()
         if request.method == "GET":
-            serializer = RequestCommentSerializer(purchase_request.comments.all(), many=True)
-            if request.user.is_authenticated:
-                unread = purchase_request.comments.exclude(receipts__user=request.user)
-                for comment in unread:
-                    RequestCommentReceipt.objects.get_or_create(comment=comment, user=request.user)
-            return Response(serializer.data)
+            paginator = ChronologicalPagination()
+            page = paginator.paginate_queryset(
+                purchase_request.comments.select_related("author"), request, view=self
+            )
+            if request.user.is_authenticated and page:
+                # One INSERT for the whole page; receipts that already exist are skipped.
+                RequestCommentReceipt.objects.bulk_create(
+                    [RequestCommentReceipt(comment=comment, user=request.user) for comment in page],
+                    ignore_conflicts=True,
+                )
+            serializer = RequestCommentSerializer(page, many=True)
+            return paginator.get_paginated_response(serializer.data)
         if not request.user.is_authenticated:
             raise PermissionDenied("Authentication required.")
         body = request.data.get("body", "").strip()
@@ -209,21 +327,30 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
             raise PermissionDenied("Purchase order not available for this request.")
 
         receipt_file = serializer.validated_data["receipt"]
+        if _wants_async_extraction(request):
+            job = extraction_jobs.enqueue(
+                purchase_request=purchase_request,
+                doc_type=DocumentExtractionResult.DocTypes.RECEIPT,
+                uploaded_file=receipt_file,
+                requested_by=request.user,
+            )
+            context = self.get_serializer_context()
+            data = {
+                "request": PurchaseRequestSerializer(purchase_request, context=context).data,
+                "extraction_job": ExtractionJobSerializer(job, context=context).data,
+            }
+            return Response(
+                data,
+                status=status.HTTP_202_ACCEPTED,
+                headers={"Location": data["extraction_job"]["status_url"]},
+            )
         extraction = extraction_service.extract_document(
             purchase_request=purchase_request,
             doc_type=DocumentExtractionResult.DocTypes.RECEIPT,
             uploaded_file=receipt_file,
             update_request=False,
         )
-        receipt_data = extraction.final_data
-        validation_payload = validation_service.validate_receipt_against_po(
-            purchase_request.purchase_order.structured_data or {},
-            receipt_data,
-        )
-        validation, _ = ReceiptValidationResult.objects.update_or_create(
-            purchase_request=purchase_request,
-            defaults=validation_payload,
-        )
+        validation = validation_service.record_receipt_validation(purchase_request, extraction.final_data)
         log_receipt_validation(request.user, purchase_request, validation)
         response_serializer = PurchaseRequestSerializer(purchase_request, context=self.get_serializer_context())
         data = {
@@ -241,15 +368,20 @@ class PurchaseRequestViewSet(viewsets.ModelViewSet):
         comment = request.data.get("comment", "")
         if not isinstance(request_ids, list) or not request_ids:
             raise serializers.ValidationError({"request_ids": "Provide a list of request IDs."})
-        approved = []
-        errors = []
-        for req_id in request_ids:
-            try:
-                updated = workflow.approve_request(req_id, request.user, comment)
-                approved.append(str(updated.id))
-            except workflow.WorkflowError as exc:
-                errors.append({"id": str(req_id), "detail": str(exc)})
-        return Response({"approved": approved, "errors": errors})
+        return Response(workflow.bulk_approve_requests(request_ids, request.user, comment))
+
+    @action(detail=True, methods=["get"], url_path=rf"extraction-jobs/(?P<job_id>{UUID_PATTERN})")
+    def extraction_job(self, request, pk=None, job_id=None):
+        purchase_request = self.get_object()
+        job = (
+            purchase_request.extraction_jobs.select_related("result")
+            .defer("payload")
+            .filter(pk=job_id)
+            .first()
+        )
+        if not job:
+            return Response({"detail": "Extraction job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ExtractionJobSerializer(job, context=self.get_serializer_context()).data)
 
     @action(detail=True, methods=["get"], url_path="validation")
     def latest_validation(self, request, pk=None):
@@ -275,12 +407,13 @@ class FinanceRequestViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, vi
     permission_classes = [IsAuthenticated, IsFinance]
     queryset = PurchaseRequestViewSet.queryset
     filterset_class = PurchaseRequestFilter
-    search_fields = ["title", "reference", "vendor_name", "created_by__full_name"]
+    pagination_class = KeysetPagination
+    filter_backends = [DjangoFilterBackend, PurchaseRequestSearchFilter, OrderingFilter]
     ordering_fields = ["created_at", "amount_estimated"]
     ordering = ["-created_at"]
 
     def get_queryset(self):
-        qs = super().get_queryset()
+        qs = _with_comment_activity(super().get_queryset(), self.request.user)
         status_filter = self.request.query_params.get("status")
         if status_filter:
             qs = qs.filter(status=status_filter)
@@ -316,36 +449,85 @@ class FinanceRequestViewSet(mixins.ListModelMixin, mixins.RetrieveModelMixin, vi
 
     @action(detail=False, methods=["get"], url_path="summary/vendor-spend")
     def vendor_spend(self, request):
-        qs = self.filter_queryset(self.get_queryset())
         limit = int(request.query_params.get("limit", 5))
+        rollup_filters = self._spend_rollup_filters(request.query_params)
+        if rollup_filters is not None:
+            return Response(spend_rollup.vendor_spend(limit=limit, **rollup_filters))
+        qs = self.filter_queryset(self.get_queryset())
         spend = (
             qs.exclude(vendor_name="")
             .values("vendor_name")
             .annotate(total_amount=Sum("amount_estimated"), count_requests=Count("id"))
-            .order_by("-total_amount")[:limit]
+            .order_by("-total_amount", "vendor_name")[:limit]
         )
         return Response(list(spend))
 
+    def _spend_rollup_filters(self, params):
+        """
+        Translate the query string into ``VendorSpendDaily`` filters.
+
+        Returns ``None`` when a filter needs columns the rollup does not keep (validation state,
+        risk, search, ``created_to``'s timestamp cut-off, ...); the caller then runs the live query.
+        """
+
+        used = {key for key, value in params.items() if value != ""}
+        if not used <= SPEND_ROLLUP_PARAMS:
+            return None
+        status_value = params.get("status") or PurchaseRequest.Status.APPROVED
+        if status_value not in PurchaseRequest.Status.values:
+            return None
+        day_from, day_to = [], []
+        try:
+            if params.get("created_from"):
+                parsed = parse_date(params["created_from"])
+                if parsed is None:
+                    return None  # let the filterset report the invalid date
+                day_from.append(parsed)
+            for param, bounds in (("start_date", day_from), ("end_date", day_to)):
+                parsed = parse_date(params.get(param) or "")
+                if parsed:
+                    bounds.append(parsed)
+        except ValueError:
+            return None
+        return {
+            "status": status_value,
+            "vendor_contains": params.get("vendor_name", ""),
+            "day_from": max(day_from, default=None),
+            "day_to": min(day_to, default=None),
+        }
+
     @action(detail=False, methods=["get"], url_path="summary/cashout-forecast")
     def cashout_forecast(self, request):
-        weeks = int(request.query_params.get("weeks", 8))
-        now = timezone.now().date()
-        buckets = []
-        qs = self.filter_queryset(self.get_queryset())
-        for idx in range(weeks):
-            start = now + timedelta(weeks=idx)
-            end = start + timedelta(days=6)
-            bucket_total = qs.filter(needed_by__range=(start, end)).aggregate(total=Sum("amount_estimated"))["total"] or 0
-            bucket_count = qs.filter(needed_by__range=(start, end)).count()
-            buckets.append(
-                {
-                    "period_start": start.isoformat(),
-                    "period_end": end.isoformat(),
-                    "amount_due": float(bucket_total),
-                    "count_requests": bucket_count,
-                }
+        params = request.query_params
+        interval = params.get("interval", "week")
+        if interval not in forecast_service.INTERVALS:
+            choices = ", ".join(forecast_service.INTERVALS)
+            raise serializers.ValidationError({"interval": f"Choose one of {choices}."})
+        try:
+            periods = int(params.get("periods") or params.get("weeks") or 8)
+        except ValueError:
+            raise serializers.ValidationError(
+                {"periods": "Provide a whole number of periods."}
+            ) from None
+        if not 1 <= periods <= 366:
+            raise serializers.ValidationError({"periods": "Periods must be between 1 and 366."})
+        by_currency = params.get("by_currency", "").lower() in {"1", "true", "yes"}
+        today = timezone.now().date()
+
+        # Buckets are relative to today, so the date is part of the (filters, interval) key.
+        raw_key = urlencode(sorted(params.lists()), doseq=True) + f"|{today}|{interval}|{periods}"
+        cache_key = f"cashout-forecast:{hashlib.sha256(raw_key.encode()).hexdigest()}"
+        buckets = cache.get(cache_key)
+        if buckets is None:
+            buckets = forecast_service.cashout_forecast(
+                self.filter_queryset(self.get_queryset()),
+                today=today,
+                interval=interval,
+                periods=periods,
+                by_currency=by_currency,
             )
-        return Response({"buckets": buckets})
+            cache.set(cache_key, buckets, settings.CASHOUT_FORECAST_CACHE_SECONDS)
+        return Response({"interval": interval, "buckets": buckets})
 
     @action(detail=True, methods=["get"], url_path="validation-detail")
     def validation_detail(self, request, pk=None):
@@ -0,0 +1,116 @@
+import uuid
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from procurement_app.models import Approval, PurchaseRequest
+from procurement_app.services import spend_rollup, workflow
+
+
+@patch("procurement_app.services.workflow.notifications")
+@patch("procurement_app.services.workflow.po_generation")
+class BulkApprovalTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.lvl1 = User.objects.create_user(
+            username="lvl1", email="lvl1@example.com", password="pass1234", role="approver_lvl1"
+        )
+        self.lvl2 = User.objects.create_user(
+            username="lvl2", email="lvl2@example.com", password="pass1234", role="approver_lvl2"
+        )
+
+    def _requests(self, count, **extra):
+        return [
+            PurchaseRequest.objects.create(
+                title=f"Bulk {idx}",
+                amount_estimated="100.00",
+                vendor_name="Acme",
+                created_by=self.staff,
+                **extra,
+            )
+            for idx in range(count)
+        ]
+
+    def test_report_matches_per_request_workflow(self, mock_po, mock_notifications):
+        pending = self._requests(2)
+        level2 = self._requests(1, current_approval_level=2, required_approval_levels=1)[0]
+        rejected = self._requests(1, status=PurchaseRequest.Status.REJECTED)[0]
+        ids = [str(pending[0].pk), "not-a-uuid", str(level2.pk), str(rejected.pk)]
+        ids += [str(pending[1].pk), str(pending[0].pk), str(uuid.uuid4())]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            report = workflow.bulk_approve_requests(ids, self.lvl1, "  ok  ")
+
+        self.assertEqual(report["approved"], [str(pending[0].pk), str(pending[1].pk)])
+        self.assertEqual(
+            [error["id"] for error in report["errors"]], [ids[1], ids[2], ids[3], ids[5], ids[6]]
+        )
+        self.assertIn("not allowed to approve level 2", report["errors"][1]["detail"])
+        for purchase_request in pending:
+            purchase_request.refresh_from_db()
+            self.assertEqual(purchase_request.status, PurchaseRequest.Status.PENDING)
+            self.assertEqual(purchase_request.current_approval_level, 2)
+            self.assertEqual(purchase_request.required_approval_levels, 1)
+            self.assertEqual(purchase_request.risk_reasons, ["Awaiting Level 2 approval"])
+        approvals = Approval.objects.filter(approver=self.lvl1)
+        self.assertEqual(approvals.count(), 2)
+        self.assertEqual(set(approvals.values_list("comment", flat=True)), {"ok"})
+        self.assertEqual(mock_notifications.notify_intermediate_approval.call_count, 2)
+        mock_po.ensure_purchase_order_exists.assert_not_called()
+
+    def test_final_approval_defers_only_po_generation(self, mock_po, mock_notifications):
+        targets = self._requests(3, current_approval_level=2, required_approval_levels=1)
+        ids = [str(obj.pk) for obj in targets]
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            report = workflow.bulk_approve_requests(ids, self.lvl2)
+            mock_po.ensure_purchase_order_exists.assert_not_called()
+            self.assertEqual(mock_notifications.notify_final_approval.call_count, 3)
+        self.assertEqual(report["errors"], [])
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+
+        self.assertEqual(mock_po.ensure_purchase_order_exists.call_count, 3)
+        self.assertEqual(
+            PurchaseRequest.objects.filter(status=PurchaseRequest.Status.APPROVED).count(), 3
+        )
+        self.assertEqual(spend_rollup.find_drift(), [])
+
+    def test_failed_side_effect_does_not_stop_the_batch(self, mock_po, mock_notifications):
+        targets = self._requests(2, current_approval_level=2, required_approval_levels=1)
+        mock_po.ensure_purchase_order_exists.side_effect = [RuntimeError("storage down"), None]
+        with self.assertLogs("procure_to_pay"), self.captureOnCommitCallbacks(execute=True):
+            workflow.bulk_approve_requests([str(obj.pk) for obj in targets], self.lvl2)
+        self.assertEqual(mock_po.ensure_purchase_order_exists.call_count, 2)
+        self.assertEqual(mock_notifications.notify_final_approval.call_count, 2)
+
+    def test_query_count_does_not_grow_with_batch_size(self, mock_po, mock_notifications):
+        def run(count):
+            ids = [str(obj.pk) for obj in self._requests(count)]
+            with CaptureQueriesContext(connection) as ctx:
+                workflow.bulk_approve_requests(ids, self.lvl1)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(run(2), run(25))
+
+    def test_endpoint_returns_report(self, mock_po, mock_notifications):
+        target = self._requests(1)[0]
+        self.client.force_authenticate(user=self.lvl1)
+        response = self.client.post(
+            reverse("requests-bulk-approve"),
+            {"request_ids": [str(target.pk), "missing"]},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["approved"], [str(target.pk)])
+        self.assertEqual(
+            response.data["errors"], [{"id": "missing", "detail": "Purchase request not found."}]
+        )
+
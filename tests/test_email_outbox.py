@@ -0,0 +1,198 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+
+from procurement_app.models import EmailOutbox, PurchaseRequest
+from procurement_app.services import email_outbox, notifications, workflow
+
+
+class FailingTransport:
+    max_batch_size = 100
+
+    def send(self, messages):
+        raise ConnectionError("provider unavailable")
+
+
+class ShortTransport:
+    max_batch_size = 100
+
+    def send(self, messages):
+        return ["em_1"]
+
+
+@override_settings(
+    RESEND_FROM_EMAIL="p2p@example.com",
+    EMAIL_OUTBOX_TRANSPORT="procurement_app.services.email_outbox.DjangoMailTransport",
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    EMAIL_OUTBOX_RETRY_SECONDS=60,
+)
+class EmailOutboxTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.approver = User.objects.create_user(
+            username="lvl1", email="lvl1@example.com", password="pass1234", role="approver_lvl1"
+        )
+        self.purchase_request = PurchaseRequest.objects.create(
+            title="Chairs", amount_estimated="100", vendor_name="Acme", created_by=self.staff
+        )
+
+    def test_workflow_queues_email_instead_of_sending(self):
+        workflow.reject_request(self.purchase_request.pk, self.approver, "Too expensive")
+        self.assertEqual(mail.outbox, [])
+        queued = EmailOutbox.objects.get()
+        self.assertEqual(queued.recipient, "staff@example.com")
+        self.assertEqual(queued.event_key, f"request:{self.purchase_request.pk}:rejected")
+        self.assertIn("Too expensive", queued.text_body)
+
+        self.assertEqual(email_outbox.drain(), 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["staff@example.com"])
+        self.assertEqual(mail.outbox[0].alternatives[0].mimetype, "text/html")
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, EmailOutbox.Status.SENT)
+
+    def test_outbox_rows_roll_back_with_the_transaction(self):
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            notifications.notify_rejection(self.purchase_request, self.approver, "")
+            raise RuntimeError("workflow failed")
+        self.assertFalse(EmailOutbox.objects.exists())
+
+    @patch("procurement_app.services.workflow.po_generation")
+    def test_bulk_approval_queues_email_in_its_transaction(self, mock_po):
+        second = PurchaseRequest.objects.create(
+            title="Desks", amount_estimated="100", vendor_name="Acme", created_by=self.staff
+        )
+        ids = [str(self.purchase_request.pk), str(second.pk)]
+        real_notify = notifications.notify_intermediate_approval
+        calls = []
+
+        def notify_then_fail(*args):
+            calls.append(args)
+            real_notify(*args)
+            if len(calls) == 2:
+                raise RuntimeError("outbox write failed")
+
+        with (
+            patch.object(notifications, "notify_intermediate_approval", notify_then_fail),
+            self.assertRaises(RuntimeError),
+        ):
+            workflow.bulk_approve_requests(ids, self.approver)
+        self.assertFalse(EmailOutbox.objects.exists())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            workflow.bulk_approve_requests(ids, self.approver)
+        self.assertEqual(callbacks, [])
+        self.assertEqual(EmailOutbox.objects.filter(recipient="staff@example.com").count(), 2)
+
+    def test_same_event_and_recipient_is_queued_once(self):
+        notifications.notify_rejection(self.purchase_request, self.approver, "")
+        notifications.notify_rejection(self.purchase_request, self.approver, "")
+        email_outbox.enqueue("manual", "p2p@example.com", "Hi", "Hi", "", ["a@x.com", "a@x.com"])
+        self.assertEqual(EmailOutbox.objects.count(), 2)
+
+    def test_batches_respect_batch_size(self):
+        recipients = [f"user{idx}@example.com" for idx in range(5)]
+        email_outbox.enqueue("bulk", "p2p@example.com", "Hi", "Hi", "", recipients)
+        self.assertEqual(email_outbox.drain(batch_size=2), 2)
+        self.assertEqual(len(mail.outbox), 2)
+        call_command("send_email_outbox", once=True, batch_size=2, stdout=StringIO())
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertFalse(EmailOutbox.objects.exclude(status=EmailOutbox.Status.SENT).exists())
+
+    def test_failed_sends_back_off_then_give_up(self):
+        notifications.notify_rejection(self.purchase_request, self.approver, "")
+        failures = REGISTRY.get_sample_value(
+            "p2p_email_outbox_failures_total", {"outcome": "retry"}
+        ) or 0
+
+        with self.assertLogs("procure_to_pay", "ERROR"):
+            email_outbox.drain(transport=FailingTransport())
+        queued = EmailOutbox.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (EmailOutbox.Status.PENDING, 1))
+        self.assertGreater(queued.next_attempt_at, timezone.now() + timedelta(seconds=50))
+        self.assertEqual(queued.last_error, "ConnectionError: provider unavailable")
+        self.assertEqual(email_outbox.drain(transport=FailingTransport()), 0)  # not due yet
+        self.assertEqual(
+            REGISTRY.get_sample_value("p2p_email_outbox_failures_total", {"outcome": "retry"}),
+            failures + 1,
+        )
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs("procure_to_pay", "ERROR"):
+            email_outbox.drain(transport=FailingTransport())
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, EmailOutbox.Status.FAILED)
+
+    def test_one_rejected_message_does_not_resend_the_batch(self):
+        recipients = ["a@example.com", "bad@example.com", "c@example.com"]
+        email_outbox.enqueue("bulk", "p2p@example.com", "Hi", "Hi", "", recipients)
+        deliver = locmem.EmailBackend.send_messages
+
+        def reject_bad(backend, messages):
+            if messages[0].to == ["bad@example.com"]:
+                raise ValueError("mailbox unavailable")
+            return deliver(backend, messages)
+
+        with (
+            patch.object(
+                locmem.EmailBackend, "send_messages", autospec=True, side_effect=reject_bad
+            ),
+            self.assertLogs("procure_to_pay", "WARNING"),
+        ):
+            self.assertEqual(email_outbox.drain(), 3)
+        self.assertEqual(
+            dict(EmailOutbox.objects.values_list("recipient", "status")),
+            {
+                "a@example.com": EmailOutbox.Status.SENT,
+                "bad@example.com": EmailOutbox.Status.PENDING,
+                "c@example.com": EmailOutbox.Status.SENT,
+            },
+        )
+
+        EmailOutbox.objects.update(next_attempt_at=timezone.now())
+        call_command("send_email_outbox", once=True, stdout=StringIO())
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), recipients)  # nobody got two
+        self.assertEqual(REGISTRY.get_sample_value("p2p_email_outbox_depth"), 0)
+
+    def test_messages_without_a_result_are_retried(self):
+        email_outbox.enqueue("bulk", "p2p@example.com", "Hi", "Hi", "", ["a@x.com", "b@x.com"])
+
+        with self.assertLogs("procure_to_pay", "ERROR"):
+            self.assertEqual(email_outbox.drain(transport=ShortTransport()), 2)
+
+        sent = EmailOutbox.objects.get(status=EmailOutbox.Status.SENT)
+        self.assertEqual(sent.provider_message_id, "em_1")
+        retried = EmailOutbox.objects.get(status=EmailOutbox.Status.PENDING)
+        self.assertEqual(retried.attempts, 1)
+        self.assertIn("no result", retried.last_error)
+
+    @override_settings(RESEND_API_KEY="re_test")
+    @patch("procurement_app.services.email_outbox.resend.Batch.send")
+    def test_resend_transport_uses_batch_endpoint(self, mock_batch):
+        email_outbox.enqueue(
+            "bulk", "p2p@example.com", "Hi", "Hi", "<p>Hi</p>", ["a@example.com", "b@example.com"]
+        )
+        mock_batch.return_value = {"data": [{"id": "em_1"}, {"id": "em_2"}]}
+
+        email_outbox.drain(transport=email_outbox.ResendTransport())
+
+        params, options = mock_batch.call_args.args
+        self.assertEqual(sorted(p["to"][0] for p in params), ["a@example.com", "b@example.com"])
+        self.assertIn("idempotency_key", options)
+        self.assertEqual(
+            sorted(EmailOutbox.objects.values_list("provider_message_id", flat=True)),
+            ["em_1", "em_2"],
+        )
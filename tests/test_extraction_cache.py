@@ -0,0 +1,259 @@
+import hashlib
+import io
+import threading
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+
+from documents.models import DocumentExtractionResult, ExtractionCache
+from documents.services import extraction, extraction_cache, hashing
+from procurement_app.models import PurchaseRequest
+
+
+PROFORMA = DocumentExtractionResult.DocTypes.PROFORMA
+STRUCTURED = {"vendor_name": "Acme", "currency": "USD", "total_amount": 42, "items": []}
+
+
+@override_settings(EXTRACTION_ENGINE_VERSION="1", GEMINI_MODEL_NAME="gemini-test")
+class ExtractionCacheTests(APITestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.purchase_request = PurchaseRequest.objects.create(
+            title="Chairs", amount_estimated=Decimal("100"), created_by=self.staff
+        )
+
+    def _file(self, content=b"%PDF-1.4 proforma"):
+        return SimpleUploadedFile("proforma.pdf", content, content_type="application/pdf")
+
+    def _extract(self, content=b"%PDF-1.4 proforma", structured=STRUCTURED, truncated=False):
+        with (
+            patch.object(extraction.storage, "upload_file", return_value="https://cdn/p.pdf"),
+            patch.object(
+                extraction.ocr,
+                "extract_text_and_tokens",
+                return_value=("Acme total 42", [{"text": "Acme"}], truncated),
+            ) as mock_ocr,
+            patch.object(extraction.llm, "structure_document", return_value=structured) as mock_llm,
+        ):
+            result = extraction.extract_document(
+                purchase_request=self.purchase_request,
+                doc_type=PROFORMA,
+                uploaded_file=self._file(content),
+            )
+        return result, mock_ocr, mock_llm
+
+    def _lookups(self, result):
+        return REGISTRY.get_sample_value(
+            "p2p_extraction_cache_requests_total", {"doc_type": PROFORMA, "result": result}
+        ) or 0
+
+    def test_identical_upload_skips_ocr_and_llm(self):
+        hits, misses = self._lookups("hit"), self._lookups("miss")
+        first, _, _ = self._extract()
+        second, mock_ocr, mock_llm = self._extract()
+
+        mock_ocr.assert_not_called()
+        mock_llm.assert_not_called()
+        self.assertEqual(second.final_data, first.final_data)
+        self.assertEqual(second.raw_text, "Acme total 42")
+        entry = ExtractionCache.objects.get()
+        self.assertEqual(entry.content_hash, hashlib.sha256(b"%PDF-1.4 proforma").hexdigest())
+        self.assertEqual((entry.engine_version, entry.hit_count), ("1/gemini-test", 1))
+        self.assertEqual(entry.tokens, [{"text": "Acme"}])
+        self.assertEqual(self._lookups("hit") - hits, 1)
+        self.assertEqual(self._lookups("miss") - misses, 1)
+
+    def test_failed_and_truncated_runs_are_not_cached(self):
+        self._extract(structured={})
+        self._extract(truncated=True)
+        self.assertFalse(ExtractionCache.objects.exists())
+
+    def test_engine_version_bump_invalidates_entries(self):
+        self._extract()
+        with override_settings(EXTRACTION_ENGINE_VERSION="2"):
+            _, mock_ocr, _ = self._extract()
+            mock_ocr.assert_called_once()
+            deleted = extraction_cache.evict(max_age=None, max_bytes=None)
+        self.assertEqual(deleted["stale_version"], 1)
+        self.assertEqual(ExtractionCache.objects.get().engine_version, "2/gemini-test")
+
+    def test_eviction_by_age_and_size(self):
+        for n in range(4):
+            self._extract(content=f"document {n}".encode())
+        now = timezone.now()
+        for n, entry in enumerate(ExtractionCache.objects.order_by("id")):
+            entry.size_bytes = 100
+            entry.last_used_at = now - timedelta(days=10 - 2 * n)  # document 3 is the newest
+            entry.save()
+
+        out = StringIO()
+        call_command("evict_extraction_cache", "--max-age-days", "9", "--max-mb", "0", stdout=out)
+        self.assertIn("1 expired", out.getvalue())
+        deleted = extraction_cache.evict(max_age=None, max_bytes=250)
+        self.assertEqual(deleted["over_size"], 1)
+        self.assertEqual(
+            sorted(ExtractionCache.objects.values_list("content_hash", flat=True)),
+            sorted(hashlib.sha256(f"document {n}".encode()).hexdigest() for n in (2, 3)),
+        )
+
+    def test_upload_is_hashed_while_streaming(self):
+        self.client.force_authenticate(user=self.staff)
+        content = b"%PDF-1.4 streamed"
+        with patch("procurement_app.views.extraction_service.extract_document") as mock_extract:
+            self.client.post(
+                reverse("requests-list"),
+                {"title": "Desks", "amount_estimated": "50", "proforma_file": self._file(content)},
+                format="multipart",
+            )
+        uploaded = mock_extract.call_args.kwargs["uploaded_file"]
+        self.assertEqual(uploaded.sha256, hashlib.sha256(content).hexdigest())
+        with patch.object(hashing, "_hash_stream") as mock_hash:
+            self.assertEqual(hashing.content_hash(uploaded), uploaded.sha256)
+        mock_hash.assert_not_called()
+
+
+class ExtractionPipelineTests(APITestCase):
+    def setUp(self):
+        staff = get_user_model().objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.purchase_request = PurchaseRequest.objects.create(
+            title="Chairs", amount_estimated=Decimal("100"), created_by=staff
+        )
+        self.calls = {}
+
+    def _record(self, stage, result):
+        def side_effect(*args):
+            # APITestCase wraps each test in a transaction, so only deeper blocks count.
+            self.calls[stage] = (threading.get_ident(), len(connection.atomic_blocks))
+            return result
+
+        return side_effect
+
+    def _extract(self):
+        upload = SimpleUploadedFile("p.pdf", b"%PDF-1.4 proforma", content_type="application/pdf")
+        self.baseline_depth = len(connection.atomic_blocks)
+        with (
+            patch.object(
+                extraction.storage, "upload_file",
+                side_effect=self._record("upload", "https://cdn/p.pdf"),
+            ),
+            patch.object(
+                extraction.ocr, "extract_text_and_tokens",
+                side_effect=self._record("ocr", ("Acme total 42", [], False)),
+            ),
+            patch.object(
+                extraction.llm, "structure_document", side_effect=self._record("llm", STRUCTURED)
+            ),
+        ):
+            return extraction.extract_document(
+                purchase_request=self.purchase_request, doc_type=PROFORMA, uploaded_file=upload
+            )
+
+    def test_upload_overlaps_ocr_outside_any_transaction(self):
+        result = self._extract()
+
+        upload_thread, _ = self.calls["upload"]
+        ocr_thread, ocr_depth = self.calls["ocr"]
+        _, llm_depth = self.calls["llm"]
+        self.assertNotEqual(upload_thread, ocr_thread)
+        self.assertEqual(ocr_thread, threading.get_ident())
+        self.assertEqual((ocr_depth, llm_depth), (self.baseline_depth,) * 2)
+        self.assertEqual(result.firebase_url, "https://cdn/p.pdf")
+        self.purchase_request.refresh_from_db()
+        self.assertEqual(self.purchase_request.proforma_url, "https://cdn/p.pdf")
+        result.refresh_from_db()
+        self.assertEqual(
+            set(result.stage_timings), {"cache", "ocr", "llm", "upload", "upload_wait", "total"}
+        )
+        self.assertTrue(all(ms >= 0 for ms in result.stage_timings.values()))
+
+    @override_settings(EXTRACTION_UPLOAD_WORKERS=0)
+    def test_zero_workers_uploads_inline(self):
+        result = self._extract()
+
+        upload_thread, upload_depth = self.calls["upload"]
+        self.assertEqual(upload_thread, threading.get_ident())
+        self.assertEqual(upload_depth, self.baseline_depth)
+        self.assertNotIn("upload_wait", result.stage_timings)
+        self.assertIn("upload", result.stage_timings)
+
+    def test_in_memory_upload_is_not_copied(self):
+        payload = b"%PDF-1.4 " + b"x" * (8 * 1024 * 1024)
+        # Written into, as MemoryFileUploadHandler does; BytesIO(payload) would share the bytes.
+        stream = io.BytesIO()
+        stream.write(payload)
+        upload = InMemoryUploadedFile(
+            stream, "proforma_file", "big.pdf", "application/pdf", len(payload), None
+        )
+        received = hashlib.sha256()
+
+        def read_in_chunks(file_obj, prefix):
+            file_obj.seek(0)
+            while chunk := file_obj.read(64 * 1024):
+                received.update(chunk)
+            return "https://cdn/big.pdf"
+
+        tracemalloc.start()
+        try:
+            with (
+                patch.object(extraction.storage, "upload_file", side_effect=read_in_chunks),
+                patch.object(
+                    extraction.ocr, "extract_text_and_tokens", return_value=("text", [], False)
+                ),
+                patch.object(extraction.llm, "structure_document", return_value=STRUCTURED),
+            ):
+                extraction.extract_document(
+                    purchase_request=self.purchase_request, doc_type=PROFORMA, uploaded_file=upload
+                )
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(received.hexdigest(), hashlib.sha256(payload).hexdigest())
+        self.assertLess(peak, len(payload) // 4)
+        stream.truncate(0)  # raises BufferError if the upload thread kept its view
+
+    def test_failed_extraction_waits_for_in_memory_upload(self):
+        stream = io.BytesIO()
+        stream.write(b"%PDF-1.4 proforma")
+        upload = InMemoryUploadedFile(
+            stream, "proforma_file", "p.pdf", "application/pdf", stream.tell(), None
+        )
+        in_flight = threading.Event()
+
+        def slow_upload(file_obj, prefix):
+            in_flight.set()
+            threading.Event().wait(0.2)
+            file_obj.read()
+            return "https://cdn/p.pdf"
+
+        def failing_ocr(uploaded_file):
+            in_flight.wait(5)
+            raise RuntimeError("tesseract crashed")
+
+        with (
+            patch.object(extraction.storage, "upload_file", side_effect=slow_upload),
+            patch.object(extraction.ocr, "extract_text_and_tokens", side_effect=failing_ocr),
+            self.assertRaises(RuntimeError),
+        ):
+            extraction.extract_document(
+                purchase_request=self.purchase_request, doc_type=PROFORMA, uploaded_file=upload
+            )
+
+        stream.truncate(0)  # raises BufferError if the upload still held its view
+        self.assertFalse(DocumentExtractionResult.objects.exists())
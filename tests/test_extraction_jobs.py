@@ -0,0 +1,186 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from documents.models import DocumentExtractionResult, ExtractionJob
+from documents.services import jobs
+from procurement_app.models import PurchaseOrder, PurchaseRequest
+
+
+@override_settings(EXTRACTION_JOB_MAX_ATTEMPTS=2, EXTRACTION_JOB_RETRY_SECONDS=30)
+class ExtractionJobTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.client.force_authenticate(user=self.staff)
+
+    def _file(self, name="proforma.pdf"):
+        return SimpleUploadedFile(name, b"%PDF-1.4 test", content_type="application/pdf")
+
+    def _extraction(self, purchase_request, doc_type):
+        return DocumentExtractionResult.objects.create(
+            purchase_request=purchase_request,
+            doc_type=doc_type,
+            firebase_url="https://example.com/doc.pdf",
+            final_data={"vendor_name": "Acme", "total_amount": 10, "items": []},
+        )
+
+    def _create_async(self):
+        with patch("procurement_app.views.extraction_service.extract_document") as mock_extract:
+            response = self.client.post(
+                reverse("requests-list") + "?async=1",
+                {"title": "Laptops", "amount_estimated": "900", "proforma_file": self._file()},
+                format="multipart",
+            )
+        mock_extract.assert_not_called()
+        return response
+
+    def test_async_create_returns_202_and_queues_upload(self):
+        response = self._create_async()
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = ExtractionJob.objects.get(pk=response.data["extraction_job"]["id"])
+        self.assertEqual(str(job.purchase_request_id), response.data["id"])
+        self.assertEqual(job.status, ExtractionJob.Status.QUEUED)
+        self.assertEqual(bytes(job.payload), b"%PDF-1.4 test")
+        self.assertTrue(response["Location"].endswith(f"/extraction-jobs/{job.pk}/"))
+
+        status_response = self.client.get(response["Location"])
+        self.assertEqual(status_response.status_code, 200)
+        self.assertEqual(status_response.data["status"], ExtractionJob.Status.QUEUED)
+
+    @patch("documents.services.jobs.extraction.extract_document")
+    def test_worker_runs_pipeline_and_records_result(self, mock_extract):
+        job = ExtractionJob.objects.get(pk=self._create_async().data["extraction_job"]["id"])
+        mock_extract.side_effect = lambda **kwargs: self._extraction(
+            kwargs["purchase_request"], kwargs["doc_type"]
+        )
+
+        call_command("run_extraction_worker", once=True, stdout=StringIO())
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExtractionJob.Status.SUCCEEDED)
+        self.assertEqual(bytes(job.payload), b"")
+        self.assertIsNotNone(job.result_id)
+        uploaded = mock_extract.call_args.kwargs["uploaded_file"]
+        self.assertEqual(uploaded.name, "proforma.pdf")
+        self.assertTrue(mock_extract.call_args.kwargs["update_request"])
+        url = reverse("requests-extraction-job", args=[job.purchase_request_id, job.pk])
+        self.assertEqual(self.client.get(url).data["result"]["id"], str(job.result_id))
+
+    @patch(
+        "documents.services.jobs.extraction.extract_document", side_effect=RuntimeError("OCR down")
+    )
+    def test_failures_back_off_then_dead_letter(self, mock_extract):
+        job = ExtractionJob.objects.get(pk=self._create_async().data["extraction_job"]["id"])
+
+        with self.assertLogs("documents.services.jobs", "ERROR"):
+            job = jobs.process(jobs.claim_next("test"))
+        self.assertEqual(job.status, ExtractionJob.Status.QUEUED)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=20))
+        self.assertEqual(job.last_error, "RuntimeError: OCR down")
+        self.assertIsNone(jobs.claim_next("test"))  # not due yet
+
+        ExtractionJob.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        with self.assertLogs("documents.services.jobs", "ERROR"):
+            job = jobs.process(jobs.claim_next("test"))
+        self.assertEqual(job.status, ExtractionJob.Status.DEAD)
+        self.assertEqual(job.attempts, 2)
+
+        self.assertEqual(jobs.requeue_dead(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ExtractionJob.Status.QUEUED, 0))
+
+    def test_expired_lease_is_reclaimed(self):
+        job = ExtractionJob.objects.get(pk=self._create_async().data["extraction_job"]["id"])
+        claimed = jobs.claim_next("crashed-worker")
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertIsNone(jobs.claim_next("other"))
+
+        ExtractionJob.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        reclaimed = jobs.claim_next("other")
+        self.assertEqual(
+            (reclaimed.pk, reclaimed.locked_by, reclaimed.attempts), (job.pk, "other", 2)
+        )
+
+    def test_expired_lease_on_last_attempt_is_dead_lettered(self):
+        job = ExtractionJob.objects.get(pk=self._create_async().data["extraction_job"]["id"])
+        ExtractionJob.objects.filter(pk=job.pk).update(
+            status=ExtractionJob.Status.RUNNING,
+            attempts=2,
+            locked_at=timezone.now() - timedelta(hours=1),
+            locked_by="crashed-worker",
+        )
+
+        with self.assertLogs("documents.services.jobs", "ERROR"):
+            self.assertIsNone(jobs.claim_next("other"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (ExtractionJob.Status.DEAD, 2))
+        self.assertIsNotNone(job.finished_at)
+        self.assertIn("crashed-worker", job.last_error)
+
+    @patch(
+        "documents.services.jobs.extraction.extract_document", side_effect=RuntimeError("OCR down")
+    )
+    def test_failed_attempt_leaves_payload_untouched(self, mock_extract):
+        job = ExtractionJob.objects.get(pk=self._create_async().data["extraction_job"]["id"])
+        claimed = jobs.claim_next("test")
+        claimed.payload = b"stale copy"
+
+        with self.assertLogs("documents.services.jobs", "ERROR"):
+            jobs.process(claimed)
+        job.refresh_from_db()
+        self.assertEqual(bytes(job.payload), b"%PDF-1.4 test")
+        self.assertEqual(job.status, ExtractionJob.Status.QUEUED)
+
+    @patch("documents.services.jobs.extraction.extract_document")
+    def test_async_receipt_is_validated_by_worker(self, mock_extract):
+        purchase_request = PurchaseRequest.objects.create(
+            title="Desk",
+            amount_estimated="10",
+            status=PurchaseRequest.Status.APPROVED,
+            created_by=self.staff,
+        )
+        PurchaseOrder.objects.create(
+            purchase_request=purchase_request,
+            po_number="PO-TEST-1",
+            vendor_name="Acme",
+            issue_date=timezone.now().date(),
+            total_amount="10",
+            structured_data={"vendor_name": "Acme", "total_amount": 10, "items": []},
+        )
+        response = self.client.post(
+            reverse("requests-submit-receipt", args=[purchase_request.pk]) + "?async=1",
+            {"receipt": self._file("receipt.pdf")},
+            format="multipart",
+        )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        mock_extract.assert_not_called()
+
+        mock_extract.side_effect = lambda **kwargs: self._extraction(
+            kwargs["purchase_request"], kwargs["doc_type"]
+        )
+        job = jobs.process(jobs.claim_next("test"))
+        self.assertEqual(job.status, ExtractionJob.Status.SUCCEEDED)
+        self.assertFalse(mock_extract.call_args.kwargs["update_request"])
+        purchase_request.refresh_from_db()
+        self.assertTrue(hasattr(purchase_request, "receipt_validation"))
+
+    def test_unknown_job_returns_404(self):
+        purchase_request = PurchaseRequest.objects.create(
+            title="Desk", amount_estimated="10", created_by=self.staff
+        )
+        url = f"/api/requests/{purchase_request.pk}/extraction-jobs/{purchase_request.pk}/"
+        self.assertEqual(self.client.get(url).status_code, 404)
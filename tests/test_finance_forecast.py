@@ -0,0 +1,83 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from procurement_app.models import PurchaseRequest
+
+
+class CashoutForecastTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        User = get_user_model()
+        self.finance = User.objects.create_user(
+            username="finance", email="finance@example.com", password="pass1234", role="finance"
+        )
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.client.force_authenticate(user=self.finance)
+        self.url = reverse("finance-requests-cashout-forecast")
+        self.today = timezone.now().date()
+        for offset, amount, currency in [
+            (0, "100.00", "USD"),
+            (6, "50.00", "EUR"),
+            (7, "25.00", "USD"),
+            (20, "10.00", "USD"),
+            (-1, "999.00", "USD"),
+        ]:
+            PurchaseRequest.objects.create(
+                title=f"Due in {offset}",
+                amount_estimated=amount,
+                currency=currency,
+                needed_by=self.today + timedelta(days=offset),
+                status=PurchaseRequest.Status.APPROVED,
+                created_by=self.staff,
+            )
+
+    def test_weekly_buckets_match_per_bucket_queries(self):
+        response = self.client.get(self.url, {"weeks": 4})
+        self.assertEqual(response.status_code, 200)
+        buckets = response.data["buckets"]
+        self.assertEqual(len(buckets), 4)
+        self.assertEqual([b["amount_due"] for b in buckets], [150.0, 25.0, 10.0, 0.0])
+        self.assertEqual([b["count_requests"] for b in buckets], [2, 1, 1, 0])
+        self.assertEqual(buckets[0]["period_start"], self.today.isoformat())
+        self.assertEqual(buckets[0]["period_end"], (self.today + timedelta(days=6)).isoformat())
+
+    def test_forecast_runs_a_single_aggregate_query(self):
+        self.client.get(self.url, {"weeks": 1})  # warm auth/session queries
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {"weeks": 52})
+
+    def test_currency_breakdown_and_daily_interval(self):
+        response = self.client.get(self.url, {"interval": "day", "periods": 7, "by_currency": "1"})
+        buckets = response.data["buckets"]
+        self.assertEqual(len(buckets), 7)
+        self.assertEqual(
+            buckets[0]["currencies"],
+            [{"currency": "USD", "amount_due": 100.0, "count_requests": 1}],
+        )
+        self.assertEqual(buckets[6]["currencies"][0]["currency"], "EUR")
+
+    def test_monthly_interval(self):
+        response = self.client.get(self.url, {"interval": "month", "periods": 3})
+        buckets = response.data["buckets"]
+        self.assertEqual(buckets[0]["period_start"], self.today.isoformat())
+        self.assertEqual(sum(b["count_requests"] for b in buckets), 4)
+
+    def test_results_are_cached_per_filters(self):
+        first = self.client.get(self.url, {"weeks": 2})
+        PurchaseRequest.objects.update(amount_estimated=1)
+        cached = self.client.get(self.url, {"weeks": 2})
+        self.assertEqual(first.data, cached.data)
+        fresh = self.client.get(self.url, {"weeks": 2, "interval": "week"})
+        self.assertNotEqual(first.data, fresh.data)
+
+    def test_invalid_interval_rejected(self):
+        response = self.client.get(self.url, {"interval": "year"})
+        self.assertEqual(response.status_code, 400)
@@ -0,0 +1,286 @@
+import mmap
+import shutil
+import tempfile
+import unittest
+from io import BytesIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile, TemporaryUploadedFile
+from django.test import override_settings
+from PIL import Image, ImageDraw
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+from rest_framework.test import APITestCase
+
+from documents.services import ocr, storage
+
+
+def _pdf_bytes(text="Invoice INV-42 total 99.00", pages=1):
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for page in range(1, pages + 1):
+        pdf.drawString(72, 720, text)
+        pdf.drawString(300, 700, f"Page {page}")
+        pdf.drawString(72, 700, "Qty 3")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def _scanned_pdf_bytes(pages=("scan",)):
+    """Pages are ``"scan"`` (an image, no text layer), ``"text"`` or ``"blank"``."""
+
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for n, kind in enumerate(pages, start=1):
+        if kind == "scan":
+            image = Image.new("L", (400, 100), color=255)
+            ImageDraw.Draw(image).text((10, 10), "Scanned proforma", fill=0)
+            pdf.drawImage(ImageReader(image), 72, 600, width=400, height=100)
+        elif kind == "text":
+            pdf.drawString(72, 720, f"Typed cover page {n}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+class OcrInputTests(APITestCase):
+    def _temporary_upload(self):
+        data = _pdf_bytes()
+        upload = TemporaryUploadedFile("proforma.pdf", "application/pdf", len(data), None)
+        upload.write(data)
+        upload.seek(0)
+        self.addCleanup(upload.close)
+        return upload
+
+    def test_in_memory_upload_is_read_in_place(self):
+        upload = SimpleUploadedFile("proforma.pdf", _pdf_bytes(), content_type="application/pdf")
+        with patch.object(ocr.pdfplumber, "open", wraps=ocr.pdfplumber.open) as mock_open:
+            text, tokens, truncated = ocr.extract_text_and_tokens(upload)
+        self.assertIn("INV-42", text)
+        self.assertFalse(truncated)
+        self.assertEqual(tokens[0]["page"], 1)
+        self.assertIs(mock_open.call_args.args[0], upload.file)
+        self.assertEqual(upload.tell(), 0)
+
+    def test_spooled_upload_is_opened_from_its_temp_path(self):
+        upload = self._temporary_upload()
+        temp_path = Path(upload.temporary_file_path())
+        with (
+            patch.object(ocr.pdfplumber, "open", wraps=ocr.pdfplumber.open) as mock_open,
+            patch("tempfile.NamedTemporaryFile") as mock_tempfile,
+        ):
+            text, _, _ = ocr.extract_text_and_tokens(upload)
+        self.assertIn("INV-42", text)
+        self.assertEqual(mock_open.call_args.args[0], temp_path)
+        mock_tempfile.assert_not_called()
+        self.assertTrue(temp_path.exists())  # Django's temp file is left for Django to clean up
+
+    def test_large_files_on_disk_are_memory_mapped(self):
+        upload = self._temporary_upload()
+        with (
+            patch.object(ocr, "MMAP_MIN_BYTES", 0),
+            patch.object(ocr.pdfplumber, "open", wraps=ocr.pdfplumber.open) as mock_open,
+        ):
+            text, _, _ = ocr.extract_text_and_tokens(upload)
+        self.assertIn("INV-42", text)
+        self.assertIsInstance(mock_open.call_args.args[0], mmap.mmap)
+
+    @patch("documents.services.storage._bucket_handle", None)
+    @patch("documents.services.storage._initialize_app")
+    @patch("documents.services.storage.storage")
+    def test_storage_streams_spooled_uploads_from_disk(self, mock_storage, mock_init):
+        blob = MagicMock(public_url="https://cdn.example.com/doc.pdf")
+        mock_storage.bucket.return_value.blob.return_value = blob
+        upload = self._temporary_upload()
+
+        url = storage.upload_file(upload, "documents/proforma")
+
+        self.assertEqual(url, "https://cdn.example.com/doc.pdf")
+        blob.upload_from_filename.assert_called_once_with(
+            upload.temporary_file_path(), content_type="application/pdf"
+        )
+        blob.upload_from_string.assert_not_called()
+
+
+def _tesseract_data(rows):
+    """Build an ``image_to_data`` dict from (block, par, line, text, conf) word rows."""
+
+    keys = ("level", "page_num", "block_num", "par_num", "line_num", "word_num", "left", "top")
+    data = {key: [] for key in (*keys, "width", "height", "conf", "text")}
+    for n, (block, par, line, text, conf) in enumerate(rows):
+        for key, value in zip(keys, (5, 1, block, par, line, n, 10 * n, 20 * line), strict=True):
+            data[key].append(value)
+        data["width"].append(8)
+        data["height"].append(12)
+        data["conf"].append(conf)
+        data["text"].append(text)
+    return data
+
+
+class ImageOcrTests(APITestCase):
+    def _image_upload(self):
+        buffer = BytesIO()
+        Image.new("L", (40, 20), color=255).save(buffer, format="PNG")
+        return SimpleUploadedFile("receipt.png", buffer.getvalue(), content_type="image/png")
+
+    def test_text_is_rebuilt_from_a_single_tesseract_pass(self):
+        data = _tesseract_data(
+            [
+                (0, 0, 0, "", "-1"),  # page/block/paragraph rows carry no text
+                (1, 1, 1, "ACME", "96.1"),
+                (1, 1, 1, "STORE", 95),
+                (1, 1, 2, "Receipt", 91),
+                (1, 1, 2, "#42", 88),
+                (1, 1, 2, "~", 3),  # speck of noise
+                (2, 1, 1, "Milk", 93),
+                (2, 1, 1, "2.50", 90),
+                (2, 1, 1, " ", 95),
+                (2, 2, 1, "Total", 97),
+                (2, 2, 1, "2.50", 96),
+            ]
+        )
+        with (
+            patch.object(ocr.pytesseract, "image_to_data", return_value=data) as mock_data,
+            patch.object(ocr.pytesseract, "image_to_string") as mock_string,
+        ):
+            text, tokens, _ = ocr.extract_text_and_tokens(self._image_upload())
+
+        mock_data.assert_called_once()
+        mock_string.assert_not_called()
+        self.assertEqual(text, "ACME STORE\nReceipt #42\n\nMilk 2.50\n\nTotal 2.50")
+        self.assertEqual(
+            [token["text"] for token in tokens],
+            ["ACME", "STORE", "Receipt", "#42", "Milk", "2.50", "Total", "2.50"],
+        )
+        self.assertEqual(tokens[0]["bbox"], [10, 20, 18, 32])
+
+    @unittest.skipUnless(shutil.which("tesseract"), "tesseract binary not installed")
+    def test_matches_image_to_string_output(self):
+        image = Image.new("L", (900, 260), color=255)
+        draw = ImageDraw.Draw(image)
+        for n, line in enumerate(["ACME STORE", "Receipt 42", "Milk 2.50", "Total 2.50"]):
+            draw.text((40, 40 + 50 * n), line)
+        image = image.resize((image.width * 3, image.height * 3))
+
+        expected = ocr.pytesseract.image_to_string(image)
+        text, _ = ocr._ocr_image(image)
+        self.assertEqual(text.split(), expected.split())
+
+
+@override_settings(OCR_PDF_WORKERS=0, OCR_SCAN_DPI=144)
+class ScannedPdfTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _upload(self, *pages):
+        return SimpleUploadedFile(
+            "scan.pdf", _scanned_pdf_bytes(pages), content_type="application/pdf"
+        )
+
+    def _data(self, *words):
+        return _tesseract_data([(1, 1, 1, word, 95) for word in words])
+
+    def test_scanned_pages_are_rasterized_and_ocrd_in_page_order(self):
+        with patch.object(
+            ocr.pytesseract, "image_to_data", return_value=self._data("Proforma", "ACME")
+        ) as mock_data:
+            text, tokens, truncated = ocr.extract_text_and_tokens(self._upload("text", "scan"))
+
+        self.assertEqual(text, "Typed cover page 1\nProforma ACME")
+        self.assertFalse(truncated)
+        image = mock_data.call_args.args[0]
+        self.assertEqual(image.size, (1191, 1684))  # A4 at 144 dpi
+        self.assertEqual([token["page"] for token in tokens], [1, 1, 1, 1, 2, 2])
+        # Pixel boxes at 144 dpi come back in PDF points (half the size).
+        self.assertEqual(tokens[-2]["bbox"], [0.0, 10.0, 4.0, 16.0])
+
+    def test_identical_pages_are_ocrd_once_and_cached(self):
+        with patch.object(
+            ocr.pytesseract, "image_to_data", return_value=self._data("Stamp")
+        ) as mock_data:
+            text, tokens, _ = ocr.extract_text_and_tokens(self._upload("scan", "scan"))
+            self.assertEqual(text, "Stamp\nStamp")
+            self.assertEqual([token["page"] for token in tokens], [1, 2])
+            ocr.extract_text_and_tokens(self._upload("scan", "scan"))
+        mock_data.assert_called_once()
+
+        with override_settings(OCR_SCAN_DPI=200), patch.object(
+            ocr.pytesseract, "image_to_data", return_value=self._data("Stamp")
+        ) as mock_data:
+            ocr.extract_text_and_tokens(self._upload("scan"))
+        mock_data.assert_called_once()  # the cache key includes the DPI
+
+    def test_ocr_failures_and_blank_pages_stay_empty(self):
+        with patch.object(
+            ocr.pytesseract,
+            "image_to_data",
+            side_effect=ocr.pytesseract.TesseractNotFoundError(),
+        ) as mock_data:
+            text, tokens, truncated = ocr.extract_text_and_tokens(
+                self._upload("blank", "scan", "text")
+            )
+        mock_data.assert_called_once()
+        self.assertEqual(text, "Typed cover page 3")
+        self.assertEqual({token["page"] for token in tokens}, {3})
+        self.assertFalse(truncated)
+
+    @override_settings(OCR_SCAN_DPI=0)
+    def test_fallback_can_be_disabled(self):
+        with patch.object(ocr.pytesseract, "image_to_data") as mock_data:
+            text, _, _ = ocr.extract_text_and_tokens(self._upload("scan"))
+        mock_data.assert_not_called()
+        self.assertEqual(text, "")
+
+    @unittest.skipUnless(shutil.which("tesseract"), "tesseract binary not installed")
+    @override_settings(OCR_PDF_WORKERS=2, OCR_SCAN_DPI=200)
+    def test_pool_ocrs_scanned_pages(self):
+        self.addCleanup(ocr.shutdown_pdf_pool)
+        text, _, _ = ocr.extract_text_and_tokens(self._upload("scan", "text", "scan"))
+        self.assertIn("Typed cover page 2", text)
+        self.assertEqual(text.count("Scanned"), 2)
+
+
+class PdfPageBudgetTests(APITestCase):
+    def _upload(self, pages):
+        return SimpleUploadedFile(
+            "catalog.pdf", _pdf_bytes(pages=pages), content_type="application/pdf"
+        )
+
+    @override_settings(OCR_PDF_WORKERS=0, OCR_PDF_MAX_PAGES=0)
+    def test_text_is_built_from_one_word_pass_per_page(self):
+        with patch.object(ocr.pdfplumber.page.Page, "extract_text") as mock_extract_text:
+            text, tokens, truncated = ocr.extract_text_and_tokens(self._upload(2))
+        mock_extract_text.assert_not_called()
+        self.assertEqual(
+            text,
+            "Invoice INV-42 total 99.00\nQty 3 Page 1\nInvoice INV-42 total 99.00\nQty 3 Page 2",
+        )
+        self.assertEqual({token["page"] for token in tokens}, {1, 2})
+        self.assertFalse(truncated)
+
+    @override_settings(OCR_PDF_WORKERS=0, OCR_PDF_MAX_PAGES=3)
+    def test_page_budget_returns_partial_result(self):
+        text, tokens, truncated = ocr.extract_text_and_tokens(self._upload(5))
+        self.assertTrue(truncated)
+        self.assertEqual(sorted({token["page"] for token in tokens}), [1, 2, 3])
+        self.assertNotIn("Page 4", text)
+
+    def test_deadline_stops_between_pages(self):
+        with tempfile.NamedTemporaryFile(suffix=".pdf") as pdf:
+            pdf.write(_pdf_bytes(pages=3))
+            pdf.flush()
+            texts, tokens, finished = ocr._pdf_pages(pdf.name, 0, 3, deadline=0)
+        self.assertEqual((texts, tokens, finished), ([], [], False))
+
+    @override_settings(OCR_PDF_WORKERS=1, OCR_PDF_PAGES_PER_TASK=2, OCR_PDF_MAX_PAGES=0)
+    def test_process_pool_merges_page_ranges_in_order(self):
+        self.addCleanup(ocr.shutdown_pdf_pool)
+        pooled = ocr.extract_text_and_tokens(self._upload(5))
+        with override_settings(OCR_PDF_WORKERS=0):
+            serial = ocr.extract_text_and_tokens(self._upload(5))
+        self.assertEqual(pooled, serial)
+        pages = [token["page"] for token in pooled[1]]
+        self.assertEqual((pages, sorted(set(pages))), (sorted(pages), [1, 2, 3, 4, 5]))
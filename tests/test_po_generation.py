@@ -0,0 +1,261 @@
+import json
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from documents.models import DocumentExtractionResult
+from procurement_app.models import PurchaseOrder, PurchaseRequest
+from procurement_app.services import po_generation, po_render, workflow
+
+
+PDF_URL = "https://storage.example.com/purchase_orders/po.pdf"
+
+
+@override_settings(PO_PDF_BACKGROUND=False, PO_RENDER_WORKERS=0)
+@patch("procurement_app.services.workflow.notifications")
+@patch("procurement_app.services.po_generation.storage_service.upload_bytes", return_value=PDF_URL)
+class PurchaseOrderPdfTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.lvl2 = User.objects.create_user(
+            username="lvl2", email="lvl2@example.com", password="pass1234", role="approver_lvl2"
+        )
+        self.purchase_request = PurchaseRequest.objects.create(
+            title="Chairs",
+            amount_estimated="250",
+            vendor_name="Acme",
+            created_by=self.staff,
+            current_approval_level=2,
+            required_approval_levels=1,
+        )
+
+    def test_pdf_is_rendered_after_the_approval_commits(self, mock_upload, mock_notifications):
+        with self.captureOnCommitCallbacks() as callbacks:
+            workflow.approve_request(self.purchase_request.pk, self.lvl2)
+            po = PurchaseOrder.objects.get(purchase_request=self.purchase_request)
+            self.assertEqual(po.pdf_status, PurchaseOrder.PdfStatus.PENDING)
+            self.assertEqual(po.structured_data["vendor_name"], "Acme")
+            mock_upload.assert_not_called()
+
+        self.assertEqual(len(callbacks), 1)
+        callbacks[0]()
+
+        po.refresh_from_db()
+        self.assertEqual((po.pdf_status, po.firebase_url, po.pdf_attempts), ("ready", PDF_URL, 1))
+        self.purchase_request.refresh_from_db()
+        self.assertEqual(self.purchase_request.purchase_order_url, PDF_URL)
+        self.assertTrue(
+            DocumentExtractionResult.objects.filter(
+                purchase_request=self.purchase_request, doc_type="po", firebase_url=PDF_URL
+            ).exists()
+        )
+        self.assertTrue(mock_upload.call_args.args[0].startswith(b"%PDF"))
+        self.assertIsNone(po_generation.render_purchase_order_pdf(po.pk))  # already ready
+
+    def test_approve_endpoint_reports_pdf_status(self, mock_upload, mock_notifications):
+        self.client.force_authenticate(user=self.lvl2)
+        with self.captureOnCommitCallbacks():
+            response = self.client.patch(
+                reverse("requests-approve", args=[self.purchase_request.pk]), {}, format="json"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["purchase_order"]["pdf_status"], "pending")
+        self.assertEqual(response.data["purchase_order"]["firebase_url"], "")
+
+    def test_background_mode_submits_render_to_executor(self, mock_upload, mock_notifications):
+        with (
+            override_settings(PO_PDF_BACKGROUND=True),
+            patch.object(po_generation._render_executor, "submit") as mock_submit,
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            workflow.approve_request(self.purchase_request.pk, self.lvl2)
+        po = self.purchase_request.purchase_order
+        mock_submit.assert_called_once_with(po_generation._render_in_thread, po.pk)
+        mock_upload.assert_not_called()
+
+    def test_failed_render_is_retried_by_sweeper(self, mock_upload, mock_notifications):
+        mock_upload.side_effect = [ConnectionError("bucket unavailable"), PDF_URL]
+        with self.assertLogs("procure_to_pay", "ERROR"), self.captureOnCommitCallbacks(
+            execute=True
+        ):
+            workflow.approve_request(self.purchase_request.pk, self.lvl2)
+        po = PurchaseOrder.objects.get(purchase_request=self.purchase_request)
+        self.assertEqual(po.pdf_status, PurchaseOrder.PdfStatus.FAILED)
+        self.assertEqual(po.pdf_error, "ConnectionError: bucket unavailable")
+
+        out = StringIO()
+        call_command("render_purchase_orders", once=True, stdout=out)
+        po.refresh_from_db()
+        self.assertEqual((po.pdf_status, po.pdf_attempts), (PurchaseOrder.PdfStatus.READY, 2))
+        self.assertIn("Rendered 1 purchase order PDFs (0 failed).", out.getvalue())
+        self.assertFalse(po_generation.outstanding_pdf_renders().exists())
+
+
+class PurchaseOrderRenderTests(APITestCase):
+    def _payload(self, po_number, line_items):
+        return {
+            "po_number": po_number,
+            "vendor_name": "Acme",
+            "currency": "EUR",
+            "requested_by": "staff",
+            "issue_date": "2026-01-01",
+            "items": [
+                {"name": f"Item {n}", "quantity": 1, "unit_price": 5.0, "total_price": 5.0}
+                for n in range(line_items)
+            ],
+            "total_amount": 5.0 * line_items,
+            "terms": po_render.DEFAULT_TERMS,
+        }
+
+    @override_settings(PO_RENDER_WORKERS=0)
+    def test_styles_are_built_once_per_process(self):
+        po_render._layout.cache_clear()
+        pdfs = po_render.render_many([self._payload("PO-1", 1), self._payload("PO-2", 120)])
+        self.assertEqual(po_render._layout.cache_info().misses, 1)
+        self.assertTrue(all(pdf.startswith(b"%PDF") for pdf in pdfs))
+        self.assertIn(b"/Title (Purchase Order PO-1)", pdfs[0])
+        self.assertIn(b"/Title (Purchase Order PO-2)", pdfs[1])
+        self.assertGreater(len(pdfs[1]), len(pdfs[0]))  # 120 rows spill onto a second page
+
+    @override_settings(PO_RENDER_WORKERS=1)
+    def test_process_pool_renders_in_order(self):
+        self.addCleanup(po_render.shutdown)
+        payloads = [self._payload(f"PO-{n}", n + 1) for n in range(3)]
+        pdfs = po_render.render_many(payloads)
+        for n, pdf in enumerate(pdfs):
+            self.assertIn(f"/Title (Purchase Order PO-{n})".encode(), pdf)
+        self.assertTrue(po_render.render(payloads[0]).startswith(b"%PDF"))
+
+
+@patch("documents.services.storage.upload_bytes")
+class RegeneratePurchaseOrdersTests(APITestCase):
+    def setUp(self):
+        staff = get_user_model().objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.orders = []
+        for idx, vendor in enumerate(["Acme", "Acme", "Globex"]):
+            purchase_request = PurchaseRequest.objects.create(
+                title=f"Order {idx}",
+                amount_estimated="100",
+                vendor_name=vendor,
+                created_by=staff,
+                status=PurchaseRequest.Status.APPROVED,
+                purchase_order_url="https://example.com/old.pdf",
+            )
+            self.orders.append(
+                PurchaseOrder.objects.create(
+                    purchase_request=purchase_request,
+                    po_number=f"PO-REGEN-{idx}",
+                    vendor_name=vendor,
+                    issue_date="2026-01-0%d" % (idx + 1),
+                    total_amount="100",
+                    firebase_url="https://example.com/old.pdf",
+                    structured_data={"vendor_name": vendor, "total_amount": 100.0, "items": []},
+                )
+            )
+            DocumentExtractionResult.objects.create(
+                purchase_request=purchase_request,
+                doc_type=DocumentExtractionResult.DocTypes.PO,
+                firebase_url="https://example.com/old.pdf",
+                final_data={},
+            )
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.checkpoint = Path(tmp.name) / "checkpoint.json"
+
+    def _run(self, **options):
+        out = StringIO()
+        call_command(
+            "regenerate_purchase_orders",
+            workers=1,
+            batch_size=2,
+            checkpoint=str(self.checkpoint),
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_interrupted_run_resumes_from_checkpoint(self, mock_upload):
+        mock_upload.side_effect = lambda data, prefix, name: f"https://cdn.example.com/new/{name}"
+        publish = po_generation.publish_regenerated
+        calls = []
+
+        def publish_then_interrupt(uploads):
+            calls.append(uploads)
+            if len(calls) == 2:
+                raise KeyboardInterrupt
+            publish(uploads)
+
+        with patch(
+            "procurement_app.services.po_generation.publish_regenerated",
+            side_effect=publish_then_interrupt,
+        ):
+            self.assertIn("Interrupted", self._run())
+        ordered = sorted(self.orders, key=lambda po: po.pk)
+        state = json.loads(self.checkpoint.read_text())
+        self.assertEqual(state["last_pk"], str(ordered[1].pk))
+
+        self.assertIn("Resuming after", self._run())
+        self.assertFalse(self.checkpoint.exists())
+        # the interrupted batch was uploaded again; every PO was uploaded at least once
+        self.assertEqual(mock_upload.call_count, 4)
+        for po in ordered:
+            po.refresh_from_db()
+            self.assertEqual(po.firebase_url, f"https://cdn.example.com/new/{po.po_number}.pdf")
+            self.assertEqual(po.purchase_request.purchase_order_url, po.firebase_url)
+            self.assertEqual(
+                po.purchase_request.extraction_results.get(doc_type="po").firebase_url,
+                po.firebase_url,
+            )
+
+    def test_failed_pos_are_retried_on_resume(self, mock_upload):
+        ordered = sorted(self.orders, key=lambda po: po.pk)
+        flaky = {ordered[0].po_number}
+
+        def upload(data, prefix, name):
+            if name.removesuffix(".pdf") in flaky:
+                raise ConnectionError("storage unavailable")
+            return f"https://cdn.example.com/new/{name}"
+
+        mock_upload.side_effect = upload
+        with self.assertLogs("procure_to_pay", "ERROR"):
+            output = self._run()
+        self.assertIn(f"1 purchase orders failed ({ordered[0].pk})", output)
+        state = json.loads(self.checkpoint.read_text())
+        self.assertEqual(state["last_pk"], str(ordered[2].pk))
+        self.assertEqual(state["failed_pks"], [str(ordered[0].pk)])
+
+        flaky.clear()
+        mock_upload.reset_mock()
+        self.assertIn("retrying 1 failed", self._run())
+        mock_upload.assert_called_once()
+        self.assertFalse(self.checkpoint.exists())
+        ordered[0].refresh_from_db()
+        self.assertEqual(
+            ordered[0].firebase_url, f"https://cdn.example.com/new/{ordered[0].po_number}.pdf"
+        )
+
+    def test_filters_and_dry_run(self, mock_upload):
+        output = self._run(vendor="acme", since=date(2026, 1, 2), dry_run=True)
+        self.assertIn("Dry run: rendered 1 POs", output)
+        mock_upload.assert_not_called()
+        self.assertFalse(self.checkpoint.exists())
+        self.assertFalse(
+            PurchaseOrder.objects.exclude(firebase_url="https://example.com/old.pdf").exists()
+        )
+
+        self.checkpoint.write_text(json.dumps({"filters": {"status": "failed"}}))
+        with self.assertRaisesMessage(CommandError, "pass the same filters"):
+            self._run()
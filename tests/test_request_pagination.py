@@ -0,0 +1,111 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from core.pagination import KeysetPagination
+from procurement_app.models import PurchaseRequest
+
+
+@patch.object(KeysetPagination, "page_size", 3)
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="pass1234",
+            role="staff",
+        )
+        self.client.force_authenticate(user=self.staff)
+        self.url = reverse("requests-list")
+        now = timezone.now()
+        for idx in range(8):
+            purchase_request = PurchaseRequest.objects.create(
+                title=f"Request {idx}",
+                amount_estimated=str(100 * (idx % 3) + 100),
+                needed_by=(now + timedelta(days=idx)).date() if idx % 2 else None,
+                created_by=self.staff,
+            )
+            # Force identical timestamps for pairs so the id tiebreaker matters.
+            PurchaseRequest.objects.filter(pk=purchase_request.pk).update(
+                created_at=now - timedelta(minutes=idx // 2)
+            )
+
+    def _walk(self, params=None):
+        ids = []
+        response = self.client.get(self.url, params or {})
+        pages = [response]
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row["id"] for row in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+            pages.append(response)
+        return ids, pages
+
+    def _expected(self, *ordering):
+        return [str(pk) for pk in PurchaseRequest.objects.order_by(*ordering).values_list("pk", flat=True)]
+
+    def test_cursor_walk_matches_created_at_ordering(self):
+        ids, pages = self._walk()
+        self.assertEqual(ids, self._expected("-created_at", "-id"))
+        self.assertEqual(len(pages), 3)
+        self.assertIsNone(pages[0].data["previous"])
+        self.assertTrue(pages[0].data["count_is_estimate"])
+
+    def test_cursor_walk_is_stable_for_non_unique_ordering(self):
+        ids, _ = self._walk({"ordering": "amount_estimated"})
+        self.assertEqual(ids, self._expected("amount_estimated", "-created_at", "-id"))
+
+    def test_cursor_walk_handles_nullable_ordering(self):
+        ids, _ = self._walk({"ordering": "-needed_by"})
+        self.assertEqual(len(ids), 8)
+        self.assertEqual(len(set(ids)), 8)
+        dated = PurchaseRequest.objects.filter(needed_by__isnull=False).order_by("-needed_by")
+        self.assertEqual(ids[: dated.count()], [str(pk) for pk in dated.values_list("pk", flat=True)])
+
+    def test_previous_link_returns_previous_page(self):
+        first = self.client.get(self.url)
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(
+            [row["id"] for row in back.data["results"]],
+            [row["id"] for row in first.data["results"]],
+        )
+        self.assertIsNone(back.data["previous"])
+        self.assertIsNotNone(back.data["next"])
+
+    def test_previous_links_walk_back_over_nullable_ordering(self):
+        _, pages = self._walk({"ordering": "needed_by"})
+        self.assertEqual(len(pages), 3)
+        response = pages[-1]
+        for expected in reversed(pages[:-1]):
+            response = self.client.get(response.data["previous"])
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(
+                [row["id"] for row in response.data["results"]],
+                [row["id"] for row in expected.data["results"]],
+            )
+            self.assertEqual(response.data["next"] is None, expected.data["next"] is None)
+        self.assertIsNone(response.data["previous"])
+        self.assertIsNotNone(pages[1].data["previous"])
+
+    def test_exact_count_is_opt_in(self):
+        response = self.client.get(self.url, {"with_count": "1"})
+        self.assertEqual(response.data["count"], 8)
+        self.assertFalse(response.data["count_is_estimate"])
+
+    def test_page_number_mode_is_still_available(self):
+        response = self.client.get(self.url, {"page": 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["count"], 8)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertNotIn("count_is_estimate", response.data)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,265 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from documents.models import DocumentExtractionResult
+from procurement_app.models import (
+    Approval,
+    PurchaseRequest,
+    RequestComment,
+    RequestCommentReceipt,
+)
+from procurement_app.views import PurchaseRequestViewSet, approver_inbox
+
+
+class RequestListQueryTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="pass1234",
+            role="staff",
+        )
+        self.colleague = User.objects.create_user(
+            username="colleague",
+            email="colleague@example.com",
+            password="pass1234",
+            role="approver_lvl1",
+        )
+        self.client.force_authenticate(user=self.staff)
+        self.url = reverse("requests-list")
+        self.requests = [
+            PurchaseRequest.objects.create(
+                title=f"Request {idx}",
+                amount_estimated="100.00",
+                vendor_name="Acme",
+                created_by=self.staff,
+            )
+            for idx in range(3)
+        ]
+
+    def _add_comments(self, purchase_request, count, read=False):
+        for idx in range(count):
+            comment = RequestComment.objects.create(
+                purchase_request=purchase_request,
+                author=self.colleague,
+                body=f"Comment {idx}",
+            )
+            if read:
+                RequestCommentReceipt.objects.create(comment=comment, user=self.staff)
+
+    def _list_query_count(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_comment_fields_come_from_annotations(self):
+        self._add_comments(self.requests[0], 3, read=True)
+        self._add_comments(self.requests[1], 2)
+        _, response = self._list_query_count()
+        by_id = {row["id"]: row for row in response.data["results"]}
+
+        first = by_id[str(self.requests[0].id)]
+        self.assertEqual(first["comment_count"], 3)
+        self.assertFalse(first["has_unread_comments"])
+
+        second = by_id[str(self.requests[1].id)]
+        self.assertEqual(second["comment_count"], 2)
+        self.assertTrue(second["has_unread_comments"])
+
+        third = by_id[str(self.requests[2].id)]
+        self.assertEqual(third["comment_count"], 0)
+        self.assertFalse(third["has_unread_comments"])
+
+    def test_list_query_count_does_not_grow_with_rows_or_comments(self):
+        baseline, _ = self._list_query_count()
+        for idx in range(5):
+            self.requests.append(
+                PurchaseRequest.objects.create(
+                    title=f"Extra {idx}",
+                    amount_estimated="50.00",
+                    vendor_name="Acme",
+                    created_by=self.staff,
+                )
+            )
+        for purchase_request in self.requests:
+            self._add_comments(purchase_request, 5, read=True)
+            self._add_comments(purchase_request, 5)
+        with_comments, _ = self._list_query_count()
+        self.assertEqual(baseline, with_comments)
+
+    def _add_history(self, purchase_request):
+        approver = get_user_model().objects.create_user(
+            username=f"approver-{purchase_request.pk}",
+            email=f"approver-{purchase_request.pk}@example.com",
+            password="pass1234",
+            role="approver_lvl1",
+        )
+        Approval.objects.create(
+            purchase_request=purchase_request,
+            approver=approver,
+            level=1,
+            decision=Approval.Decision.APPROVED,
+        )
+        DocumentExtractionResult.objects.create(
+            purchase_request=purchase_request,
+            doc_type=DocumentExtractionResult.DocTypes.PROFORMA,
+            firebase_url="https://example.com/proforma.pdf",
+            raw_text="OCR " * 2048,
+            final_data={"items": []},
+        )
+
+    def test_list_query_count_does_not_grow_with_approvals(self):
+        self._add_history(self.requests[0])
+        baseline, _ = self._list_query_count()
+        for purchase_request in self.requests[1:]:
+            self._add_history(purchase_request)
+        with_history, response = self._list_query_count()
+        self.assertEqual(baseline, with_history)
+        level1 = response.data["results"][0]["stage_history"][2]
+        self.assertEqual(level1["stage"], "level1")
+        self.assertIsNotNone(level1["actor"])
+
+    def test_list_does_not_fetch_extraction_payloads(self):
+        for purchase_request in self.requests:
+            self._add_history(purchase_request)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        table = DocumentExtractionResult._meta.db_table
+        extraction_queries = [q["sql"] for q in ctx.captured_queries if f'FROM "{table}"' in q["sql"]]
+        self.assertEqual(len(extraction_queries), 1)
+        for column in ("raw_text", "final_data", "baseline_data", "model_data"):
+            self.assertNotIn(f'"{column}"', extraction_queries[0])
+
+    def test_prefetched_extraction_results_defer_raw_text(self):
+        self._add_history(self.requests[0])
+        purchase_request = PurchaseRequestViewSet.queryset.get(pk=self.requests[0].pk)
+        with self.assertNumQueries(0):
+            extraction = purchase_request.extraction_results.all()[0]
+            approver = purchase_request.approvals.all()[0].approver
+        self.assertIn("raw_text", extraction.get_deferred_fields())
+        self.assertTrue(approver.username.startswith("approver-"))
+
+
+class ApproverInboxTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.approver = User.objects.create_user(
+            username="lvl1", email="lvl1@example.com", password="pass1234", role="approver_lvl1"
+        )
+        self.other = User.objects.create_user(
+            username="lvl1-other", email="other@example.com", password="pass1234", role="approver_lvl1"
+        )
+        scenarios = [
+            (PurchaseRequest.Status.PENDING, 1, [self.other]),
+            (PurchaseRequest.Status.PENDING, 1, []),
+            (PurchaseRequest.Status.PENDING, 2, [self.approver]),
+            (PurchaseRequest.Status.PENDING, 2, [self.other]),
+            (PurchaseRequest.Status.APPROVED, 2, [self.approver, self.approver]),
+            (PurchaseRequest.Status.REJECTED, 1, [self.approver, self.other]),
+            (PurchaseRequest.Status.REJECTED, 1, [self.other]),
+        ]
+        for idx, (status, level, approvers) in enumerate(scenarios):
+            purchase_request = PurchaseRequest.objects.create(
+                title=f"Inbox {idx}",
+                amount_estimated="10.00",
+                status=status,
+                current_approval_level=level,
+                created_by=self.staff,
+            )
+            for approver in approvers:
+                Approval.objects.create(
+                    purchase_request=purchase_request,
+                    approver=approver,
+                    level=1,
+                    decision=Approval.Decision.APPROVED,
+                )
+
+    def _legacy_ids(self, user, level):
+        legacy = PurchaseRequest.objects.filter(
+            Q(status=PurchaseRequest.Status.PENDING, current_approval_level=level)
+            | Q(approvals__approver=user)
+        ).distinct()
+        return sorted(str(pk) for pk in legacy.values_list("pk", flat=True))
+
+    def test_inbox_matches_legacy_or_distinct_query(self):
+        for user in (self.approver, self.other):
+            for level in (1, 2):
+                inbox = approver_inbox(PurchaseRequest.objects.all(), user, level)
+                ids = [str(pk) for pk in inbox.values_list("pk", flat=True)]
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(sorted(ids), self._legacy_ids(user, level))
+                self.assertNotIn("DISTINCT", str(inbox.query))
+
+    def test_list_endpoint_returns_each_request_once(self):
+        self.client.force_authenticate(user=self.approver)
+        response = self.client.get(reverse("requests-list"), {"with_count": "1"})
+        ids = [row["id"] for row in response.data["results"]]
+        self.assertEqual(sorted(ids), self._legacy_ids(self.approver, 1))
+        self.assertEqual(response.data["count"], len(ids))
+
+
+class CommentThreadQueryTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.reviewer = User.objects.create_user(
+            username="reviewer", email="reviewer@example.com", password="pass1234", role="finance"
+        )
+        self.purchase_request = PurchaseRequest.objects.create(
+            title="Thread", amount_estimated="10.00", created_by=self.staff
+        )
+        self.url = reverse("requests-comments", args=[self.purchase_request.pk])
+        self.client.force_authenticate(user=self.staff)
+
+    def _add_comments(self, count):
+        for idx in range(count):
+            RequestComment.objects.create(
+                purchase_request=self.purchase_request, author=self.reviewer, body=f"#{idx}"
+            )
+
+    def _get(self, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, params or {})
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_query_count_does_not_grow_with_thread_length(self):
+        self._add_comments(3)
+        short_thread, _ = self._get()
+        RequestCommentReceipt.objects.all().delete()
+        self._add_comments(120)
+        long_thread, response = self._get()
+        self.assertEqual(short_thread, long_thread)
+        self.assertEqual(len(response.data["results"]), 50)
+        self.assertIsNotNone(response.data["next"])
+
+    def test_only_the_served_page_is_marked_read(self):
+        self._add_comments(60)
+        _, first = self._get()
+        page_ids = {row["id"] for row in first.data["results"]}
+        receipts = RequestCommentReceipt.objects.filter(user=self.staff)
+        read_ids = {str(pk) for pk in receipts.values_list("comment_id", flat=True)}
+        self.assertEqual(read_ids, page_ids)
+
+        self._get()  # re-opening the same page must not fail on existing receipts
+        self.assertEqual(RequestCommentReceipt.objects.filter(user=self.staff).count(), 50)
+
+        self.client.get(first.data["next"])
+        self.assertEqual(RequestCommentReceipt.objects.filter(user=self.staff).count(), 60)
+
+    def test_thread_is_oldest_first_and_ignores_parent_ordering(self):
+        self._add_comments(3)
+        _, response = self._get({"ordering": "-amount_estimated"})
+        self.assertEqual([row["body"] for row in response.data["results"]], ["#0", "#1", "#2"])
@@ -0,0 +1,76 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from procurement_app.models import PurchaseRequest
+from procurement_app.services import workflow
+
+
+class RequestRiskTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.approver = User.objects.create_user(
+            username="lvl1", email="lvl1@example.com", password="pass1234", role="approver_lvl1"
+        )
+        self.url = reverse("requests-list")
+
+    @patch("procurement_app.views.extraction_service.extract_document")
+    def test_risk_is_persisted_on_create(self, mock_extract):
+        self.client.force_authenticate(user=self.staff)
+        payload = {
+            "title": "Servers",
+            "amount_estimated": "60000",
+            "proforma_file": self._file(),
+        }
+        response = self.client.post(self.url, payload, format="multipart")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        stored = PurchaseRequest.objects.get(pk=response.data["id"])
+        self.assertEqual(stored.risk_level, PurchaseRequest.RiskLevel.HIGH)
+        self.assertEqual(stored.risk_reasons, ["Amount > 50,000", "Missing vendor"])
+        self.assertEqual(response.data["risk_summary"]["level"], PurchaseRequest.RiskLevel.HIGH)
+
+    @patch("procurement_app.services.workflow.notifications")
+    def test_risk_is_refreshed_on_approval(self, mock_notifications):
+        purchase_request = PurchaseRequest.objects.create(
+            title="Chairs", amount_estimated="100", vendor_name="Acme", created_by=self.staff
+        )
+        workflow.approve_request(purchase_request.pk, self.approver)
+        purchase_request.refresh_from_db()
+        self.assertEqual(purchase_request.risk_level, PurchaseRequest.RiskLevel.MEDIUM)
+        self.assertEqual(purchase_request.risk_reasons, ["Awaiting Level 2 approval"])
+
+    def test_risk_level_filter(self):
+        PurchaseRequest.objects.create(
+            title="Low", amount_estimated="10", vendor_name="Acme", created_by=self.staff
+        )
+        risky = PurchaseRequest.objects.create(
+            title="High",
+            amount_estimated="90000",
+            created_by=self.staff,
+            risk_level=PurchaseRequest.RiskLevel.HIGH,
+        )
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get(self.url, {"risk_level": "high"})
+        self.assertEqual([row["id"] for row in response.data["results"]], [str(risky.pk)])
+
+    def test_backfill_command_updates_stale_rows(self):
+        stale = PurchaseRequest.objects.create(
+            title="Stale", amount_estimated="30000", created_by=self.staff
+        )
+        out = StringIO()
+        call_command("backfill_request_risk", batch_size=1, stdout=out)
+        stale.refresh_from_db()
+        self.assertEqual(stale.risk_level, PurchaseRequest.RiskLevel.HIGH)
+        self.assertIn("Updated 1 of 1", out.getvalue())
+
+    def _file(self):
+        return SimpleUploadedFile("proforma.pdf", b"x" * 64, content_type="application/pdf")
@@ -0,0 +1,117 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from documents.services.extraction import _apply_proforma_data
+from procurement_app.filters import PurchaseRequestFilter, PurchaseRequestSearchFilter
+from procurement_app.models import PurchaseRequest
+
+
+def _has_trigram_extension():
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        return cursor.fetchone() is not None
+
+
+class RequestSearchTests(APITestCase):
+    def setUp(self):
+        self.staff = get_user_model().objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="pass1234",
+            role="staff",
+            full_name="Grace Hopper",
+        )
+        self.client.force_authenticate(user=self.staff)
+        self.url = reverse("requests-list")
+        self.laptops = PurchaseRequest.objects.create(
+            title="Developer laptops",
+            description="Replacement machines",
+            amount_estimated="2000",
+            vendor_name="Dell",
+            created_by=self.staff,
+        )
+        self.chairs = PurchaseRequest.objects.create(
+            title="Office chairs",
+            description="Ergonomic chairs for the laptop bar",
+            amount_estimated="500",
+            vendor_name="Herman Miller",
+            created_by=self.staff,
+        )
+
+    def _search(self, term):
+        response = self.client.get(self.url, {"search": term})
+        self.assertEqual(response.status_code, 200)
+        return [row["id"] for row in response.data["results"]]
+
+    def test_prefix_search_is_ranked_by_field_weight(self):
+        self.assertEqual(self._search("lapt"), [str(self.laptops.pk), str(self.chairs.pk)])
+
+    def test_search_matches_vendor_and_requester(self):
+        self.assertEqual(self._search("herman"), [str(self.chairs.pk)])
+        self.assertCountEqual(self._search("grace"), [str(self.laptops.pk), str(self.chairs.pk)])
+
+    def test_partial_reference_matches(self):
+        fragment = self.chairs.reference[-5:]
+        self.assertEqual(self._search(fragment), [str(self.chairs.pk)])
+
+    def test_vector_follows_proforma_and_requester_updates(self):
+        self.chairs.refresh_from_db()
+        _apply_proforma_data(self.chairs, {"vendor_name": "Steelcase"})
+        self.assertEqual(self._search("steelcase"), [str(self.chairs.pk)])
+
+        self.staff.full_name = "Ada Lovelace"
+        self.staff.save()
+        self.assertCountEqual(self._search("lovelace"), [str(self.laptops.pk), str(self.chairs.pk)])
+        self.assertEqual(self._search("hopper"), [])
+
+    def test_vector_is_written_by_the_same_update(self):
+        self.laptops.title = "Standing desks"
+        with CaptureQueriesContext(connection) as queries:
+            self.laptops.save(update_fields=["title"])
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"search_vector"', updates[0])
+        self.assertEqual(self._search("standing"), [str(self.laptops.pk)])
+
+        with CaptureQueriesContext(connection) as queries:
+            self.laptops.save(update_fields=["status"])
+        self.assertNotIn("search_vector", " ".join(q["sql"] for q in queries))
+
+    def test_explicit_ordering_overrides_rank(self):
+        response = self.client.get(self.url, {"search": "lapt", "ordering": "amount_estimated"})
+        self.assertEqual(
+            [row["id"] for row in response.data["results"]],
+            [str(self.chairs.pk), str(self.laptops.pk)],
+        )
+
+
+class RequestSearchPlanTests(APITestCase):
+    """The planner must be able to answer search and the substring filters from an index."""
+
+    def _plan(self, queryset):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertNotIn("Seq Scan", plan)
+        return plan
+
+    def test_search_uses_the_vector_index(self):
+        request = Request(APIRequestFactory().get("/", {"search": "REQ-2026 lapt"}))
+        queryset = PurchaseRequestSearchFilter().filter_queryset(
+            request, PurchaseRequest.objects.all(), view=None
+        )
+        self.assertIn("preq_search_vector_idx", self._plan(queryset))
+
+    def test_substring_filters_use_trigram_indexes(self):
+        if not _has_trigram_extension():
+            self.skipTest("pg_trgm is not installed on this server")
+        for field, index in (
+            ("vendor_name", "preq_vendor_utrgm_idx"),
+            ("reference", "preq_reference_utrgm_idx"),
+        ):
+            queryset = PurchaseRequestFilter({field: "abc"}, PurchaseRequest.objects.all()).qs
+            self.assertIn(index, self._plan(queryset))
@@ -0,0 +1,296 @@
+import hashlib
+import io
+import tempfile
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from rest_framework.test import APITestCase
+
+from documents.models import DocumentExtractionResult, StorageReplica, StoredBlob
+from documents.services import storage
+from procurement_app.models import PurchaseRequest
+
+
+class BucketTestCase(APITestCase):
+    def setUp(self):
+        patcher = patch("documents.services.storage._bucket_handle", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch("documents.services.storage._initialize_app")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = patch("documents.services.storage.storage")
+        self.mock_storage = patcher.start()
+        self.bucket = self.mock_storage.bucket.return_value
+        self.addCleanup(patcher.stop)
+        self.blobs = {}
+        self.bucket.blob.side_effect = self._blob
+
+    def _blob(self, name):
+        if name not in self.blobs:
+            blob = MagicMock(public_url=f"https://cdn.example.com/{name}", chunk_size=None)
+            blob.exists.return_value = False
+            self.blobs[name] = blob
+        return self.blobs[name]
+
+
+@override_settings(STORAGE_CONTENT_ADDRESSED=True)
+class ContentAddressedStorageTests(BucketTestCase):
+
+    def test_same_content_is_uploaded_once(self):
+        content = b"%PDF-1.4 proforma"
+        digest = hashlib.sha256(content).hexdigest()
+
+        first, second = (
+            storage.upload_file(
+                SimpleUploadedFile(name, content, content_type="application/pdf"),
+                "documents/proforma",
+            )
+            for name in ("a.pdf", "b.pdf")
+        )
+
+        blob = self.blobs[f"documents/proforma/{digest}.pdf"]
+        self.assertEqual(first, second)
+        self.assertEqual(first, f"https://cdn.example.com/documents/proforma/{digest}.pdf")
+        blob.upload_from_file.assert_called_once()
+        blob.exists.assert_called_once()  # the second upload is answered by the index
+        self.assertEqual(StoredBlob.objects.get().content_hash, digest)
+
+    @override_settings(STORAGE_PUBLIC_ACCESS="object")
+    def test_blob_missing_from_index_is_not_uploaded_again(self):
+        pdf = b"%PDF-1.4 purchase order"
+        name = f"purchase_orders/{hashlib.sha256(pdf).hexdigest()}.pdf"
+        self._blob(name).exists.return_value = True
+
+        url = storage.upload_bytes(pdf, "purchase_orders", "PO-1.pdf")
+
+        self.assertEqual(url, f"https://cdn.example.com/{name}")
+        self.blobs[name].upload_from_file.assert_not_called()
+        self.blobs[name].make_public.assert_called_once()
+        self.assertTrue(StoredBlob.objects.filter(blob_name=name).exists())
+
+    @override_settings(STORAGE_CONTENT_ADDRESSED=False)
+    def test_default_mode_keeps_unique_names(self):
+        for _ in range(2):
+            storage.upload_bytes(b"same", "purchase_orders", "PO-1.pdf")
+        self.assertEqual(len(self.blobs), 2)
+        self.assertFalse(StoredBlob.objects.exists())
+
+
+@override_settings(STORAGE_UPLOAD_CHUNK_MB=1)
+class StreamingUploadTests(BucketTestCase):
+    def test_large_upload_streams_in_resumable_chunks(self):
+        upload = SimpleUploadedFile("scan.pdf", b"x" * (3 * 1024 * 1024 + 1))
+        storage.upload_file(upload, "documents/receipt")
+
+        (blob,) = self.blobs.values()
+        self.assertEqual(blob.chunk_size, 1024 * 1024)
+        blob.upload_from_file.assert_called_once_with(
+            upload.file, size=3 * 1024 * 1024 + 1, content_type="application/pdf"
+        )
+        blob.make_public.assert_not_called()  # bucket-level public access by default
+        self.assertEqual(upload.tell(), 0)
+
+    def test_small_upload_is_a_single_request(self):
+        storage.upload_bytes(b"%PDF-1.4 small", "purchase_orders", "PO-1.pdf")
+        (blob,) = self.blobs.values()
+        self.assertIsNone(blob.chunk_size)
+        stream = blob.upload_from_file.call_args.args[0]
+        self.assertIsInstance(stream, io.BytesIO)
+        self.assertEqual(blob.upload_from_file.call_args.kwargs["size"], 14)
+
+    @override_settings(STORAGE_PUBLIC_ACCESS="object")
+    def test_object_acl_mode_makes_each_blob_public(self):
+        storage.upload_bytes(b"%PDF-1.4 small", "purchase_orders", "PO-1.pdf")
+        (blob,) = self.blobs.values()
+        blob.make_public.assert_called_once()
+
+    def test_bucket_handle_is_cached_per_process(self):
+        for _ in range(3):
+            storage.upload_bytes(b"data", "purchase_orders", "PO-1.pdf")
+        self.mock_storage.bucket.assert_called_once()
+        with patch("documents.services.storage.os.getpid", return_value=-1):  # a forked child
+            storage.upload_bytes(b"data", "purchase_orders", "PO-1.pdf")
+        self.assertEqual(self.mock_storage.bucket.call_count, 2)
+
+
+class FakeRemoteStorage:
+    """Replica backend for the tests: keeps blobs in memory."""
+
+    blobs: dict[str, bytes] = {}
+    fail = False
+
+    def save(self, file_obj, blob_name, content_type):
+        if self.fail:
+            raise ConnectionError("remote unavailable")
+        self.blobs[blob_name] = file_obj.read()
+        return f"https://remote.example.com/{blob_name}"
+
+
+@override_settings(
+    STORAGE_BACKEND="documents.services.storage.LocalStorage",
+    STORAGE_LOCAL_URL="http://testserver/media/storage/",
+    STORAGE_REPLICA_BACKEND="tests.test_storage.FakeRemoteStorage",
+    STORAGE_REPLICATION_MAX_ATTEMPTS=2,
+)
+class LocalStorageTests(APITestCase):
+    def setUp(self):
+        root = tempfile.TemporaryDirectory()
+        self.addCleanup(root.cleanup)
+        self.root = Path(root.name)
+        settings_override = override_settings(STORAGE_LOCAL_ROOT=self.root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        FakeRemoteStorage.blobs, FakeRemoteStorage.fail = {}, False
+
+    def _upload(self, data=b"%PDF-1.4 proforma", prefix="documents/proforma"):
+        """Upload locally and queue the blob as the callers do once its row has committed."""
+
+        url = storage.upload_bytes(data, prefix, "p.pdf")
+        with self.captureOnCommitCallbacks(execute=True):
+            storage.queue_replication(url)
+        return url
+
+    def _replicate(self, *args):
+        out = StringIO()
+        call_command("replicate_storage", "--once", *args, stdout=out)
+        return out.getvalue()
+
+    def test_local_backend_writes_immediately(self):
+        url = storage.upload_file(
+            SimpleUploadedFile("scan.pdf", b"%PDF-1.4 local"), "documents/proforma"
+        )
+        self.assertTrue(url.startswith("http://testserver/media/storage/documents/proforma/"))
+        blob_name = url.removeprefix("http://testserver/media/storage/")
+        self.assertEqual((self.root / blob_name).read_bytes(), b"%PDF-1.4 local")
+        self.assertFalse(StorageReplica.objects.exists())  # queued by the caller, not the save
+        with self.captureOnCommitCallbacks(execute=True):
+            storage.queue_replication(url, "https://elsewhere.example.com/x.pdf")
+        replica = StorageReplica.objects.get()
+        self.assertEqual((replica.blob_name, replica.local_url), (blob_name, url))
+        self.assertEqual(replica.content_type, "application/pdf")
+
+        with override_settings(STORAGE_CONTENT_ADDRESSED=True):
+            first = storage.upload_bytes(b"same", "purchase_orders", "PO-1.pdf")
+            (self.root / first.removeprefix("http://testserver/media/storage/")).unlink()
+            StoredBlob.objects.all().delete()
+            self.assertEqual(storage.upload_bytes(b"same", "purchase_orders", "PO-1.pdf"), first)
+
+    def test_blob_names_cannot_escape_the_root(self):
+        with self.assertRaises(ValueError):
+            storage.LocalStorage().save(b"x", "../outside.pdf", None)
+
+    def test_replicator_copies_blobs_and_swaps_urls(self):
+        staff = get_user_model().objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        local_url = self._upload()
+        purchase_request = PurchaseRequest.objects.create(
+            title="Chairs",
+            amount_estimated=Decimal("100"),
+            created_by=staff,
+            proforma_url=local_url,
+        )
+        extraction = DocumentExtractionResult.objects.create(
+            purchase_request=purchase_request, doc_type="proforma", firebase_url=local_url
+        )
+        blob_name = StorageReplica.objects.get().blob_name
+
+        self.assertIn("Replicated 1 blobs", self._replicate("--delete-local"))
+
+        remote_url = f"https://remote.example.com/{blob_name}"
+        self.assertEqual(FakeRemoteStorage.blobs[blob_name], b"%PDF-1.4 proforma")
+        purchase_request.refresh_from_db()
+        extraction.refresh_from_db()
+        self.assertEqual(purchase_request.proforma_url, remote_url)
+        self.assertEqual(extraction.firebase_url, remote_url)
+        replica = StorageReplica.objects.get()
+        self.assertEqual((replica.status, replica.remote_url), ("done", remote_url))
+        self.assertFalse((self.root / blob_name).exists())
+
+    def test_failed_copies_back_off_then_give_up(self):
+        self._upload(b"%PDF-1.4 po", "purchase_orders")
+        FakeRemoteStorage.fail = True
+
+        self._replicate()
+        replica = StorageReplica.objects.get()
+        self.assertEqual((replica.status, replica.attempts), ("pending", 1))
+        self.assertIn("ConnectionError", replica.last_error)
+        self.assertIn("Replicated 0 blobs (0 failed", self._replicate())  # not due yet
+
+        StorageReplica.objects.update(run_after=replica.created_at)
+        self._replicate()
+        replica.refresh_from_db()
+        self.assertEqual((replica.status, replica.attempts), ("failed", 2))
+
+    def test_replica_waits_for_a_row_that_references_it(self):
+        local_url = self._upload()
+        blob_name = StorageReplica.objects.get().blob_name
+
+        # Due before any row holds the URL (e.g. a slow OCR or Gemini call): nothing is swapped.
+        self.assertIn("Replicated 0 blobs (1 failed", self._replicate("--delete-local"))
+        replica = StorageReplica.objects.get()
+        self.assertEqual(replica.status, "pending")
+        self.assertIn("No row references", replica.last_error)
+        self.assertTrue((self.root / blob_name).exists())
+
+        staff = get_user_model().objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        purchase_request = PurchaseRequest.objects.create(
+            title="Chairs",
+            amount_estimated=Decimal("100"),
+            created_by=staff,
+            proforma_url=local_url,
+        )
+        StorageReplica.objects.update(run_after=replica.created_at)
+        FakeRemoteStorage.blobs.clear()
+        self.assertIn("Replicated 1 blobs", self._replicate("--delete-local"))
+
+        self.assertEqual(FakeRemoteStorage.blobs, {})  # copied on the first pass, not again
+        purchase_request.refresh_from_db()
+        self.assertEqual(
+            purchase_request.proforma_url, f"https://remote.example.com/{blob_name}"
+        )
+        self.assertEqual(StorageReplica.objects.get().status, "done")
+        self.assertFalse((self.root / blob_name).exists())
+
+    @override_settings(STORAGE_CONTENT_ADDRESSED=True)
+    def test_late_reference_reopens_a_finished_replica(self):
+        staff = get_user_model().objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        local_url = self._upload()
+        first = PurchaseRequest.objects.create(
+            title="Chairs",
+            amount_estimated=Decimal("100"),
+            created_by=staff,
+            proforma_url=local_url,
+        )
+        self.assertIn("Replicated 1 blobs", self._replicate("--delete-local"))
+        remote_url = StorageReplica.objects.get().remote_url
+
+        # A row that read the local URL before the swap commits after it.
+        late = PurchaseRequest.objects.create(
+            title="Desks",
+            amount_estimated=Decimal("100"),
+            created_by=staff,
+            proforma_url=local_url,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            storage.queue_replication(local_url)
+        self.assertEqual(StorageReplica.objects.get().status, "pending")
+        FakeRemoteStorage.blobs.clear()
+        self.assertIn("Replicated 1 blobs", self._replicate("--delete-local"))
+
+        self.assertEqual(FakeRemoteStorage.blobs, {})  # local copy is gone; nothing re-copied
+        for purchase_request in (first, late):
+            purchase_request.refresh_from_db()
+            self.assertEqual(purchase_request.proforma_url, remote_url)
+        self.assertEqual(StorageReplica.objects.get().status, "done")
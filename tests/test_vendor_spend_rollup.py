@@ -0,0 +1,120 @@
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from procurement_app.models import PurchaseRequest, VendorSpendDaily
+from procurement_app.services import spend_rollup, workflow
+
+
+@patch("procurement_app.services.workflow.notifications")
+@patch("procurement_app.services.workflow.po_generation")
+class VendorSpendRollupTests(APITestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.staff = User.objects.create_user(
+            username="staff", email="staff@example.com", password="pass1234", role="staff"
+        )
+        self.finance = User.objects.create_user(
+            username="finance", email="finance@example.com", password="pass1234", role="finance"
+        )
+        self.lvl1 = User.objects.create_user(
+            username="lvl1", email="lvl1@example.com", password="pass1234", role="approver_lvl1"
+        )
+        self.lvl2 = User.objects.create_user(
+            username="lvl2", email="lvl2@example.com", password="pass1234", role="approver_lvl2"
+        )
+        self.url = reverse("finance-requests-vendor-spend")
+
+    def _request(self, vendor, amount, **extra):
+        return PurchaseRequest.objects.create(
+            title=f"{vendor} order",
+            amount_estimated=amount,
+            vendor_name=vendor,
+            currency="USD",
+            created_by=self.staff,
+            **extra,
+        )
+
+    def _approve(self, purchase_request):
+        workflow.approve_request(purchase_request.pk, self.lvl1)
+        workflow.approve_request(purchase_request.pk, self.lvl2)
+
+    def _bucket(self, vendor, status):
+        return VendorSpendDaily.objects.filter(vendor_name=vendor, status=status).first()
+
+    def test_writes_keep_rollup_in_sync(self, mock_po, mock_notifications):
+        acme = self._request("Acme", "100.00")
+        other = self._request("Globex", "40.00")
+        pending = self._bucket("Acme", PurchaseRequest.Status.PENDING)
+        self.assertEqual((pending.amount, pending.request_count), (Decimal("100.00"), 1))
+
+        self._approve(acme)
+        workflow.reject_request(other.pk, self.lvl1)
+        self.assertIsNone(self._bucket("Acme", PurchaseRequest.Status.PENDING))
+        approved = self._bucket("Acme", PurchaseRequest.Status.APPROVED)
+        self.assertEqual((approved.amount, approved.request_count), (Decimal("100.00"), 1))
+        self.assertEqual(self._bucket("Globex", PurchaseRequest.Status.REJECTED).request_count, 1)
+
+        acme.refresh_from_db()
+        acme.vendor_name = "Acme Corp"
+        acme.amount_estimated = Decimal("120.00")
+        acme.save()
+        other.delete()
+        self.assertEqual(spend_rollup.find_drift(), [])
+        self.assertEqual(self._bucket("Acme Corp", PurchaseRequest.Status.APPROVED).amount, 120)
+        self.assertFalse(VendorSpendDaily.objects.filter(vendor_name__in=["Acme", "Globex"]).exists())
+
+    def test_partial_save_uses_stored_values_for_unsaved_fields(self, mock_po, mock_notifications):
+        purchase_request = self._request("Acme", "10.00")
+        purchase_request.vendor_name = "Unsaved"
+        purchase_request.status = PurchaseRequest.Status.REJECTED
+        purchase_request.save(update_fields=["status"])
+        self.assertEqual(spend_rollup.find_drift(), [])
+        self.assertIsNotNone(self._bucket("Acme", PurchaseRequest.Status.REJECTED))
+
+    def test_summary_is_served_from_rollup(self, mock_po, mock_notifications):
+        for vendor, amount in [("Acme", "100.00"), ("Acme", "50.00"), ("Globex", "80.00")]:
+            self._approve(self._request(vendor, amount))
+        self._request("Initech", "999.00")
+        self.client.force_authenticate(user=self.finance)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {"vendor_name": "e"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(row["vendor_name"], row["total_amount"], row["count_requests"]) for row in response.data],
+            [("Acme", Decimal("150.00"), 2), ("Globex", Decimal("80.00"), 1)],
+        )
+        sql = " ".join(query["sql"] for query in ctx.captured_queries)
+        self.assertIn(VendorSpendDaily._meta.db_table, sql)
+        self.assertNotIn(f'FROM "{PurchaseRequest._meta.db_table}"', sql)
+
+    def test_unsupported_filters_fall_back_to_live_query(self, mock_po, mock_notifications):
+        self._approve(self._request("Acme", "60000.00"))
+        self._approve(self._request("Globex", "10.00"))
+        VendorSpendDaily.objects.all().delete()  # a live answer cannot depend on the rollup
+        self.client.force_authenticate(user=self.finance)
+
+        response = self.client.get(self.url, {"risk_level": "medium"})
+        self.assertEqual([row["vendor_name"] for row in response.data], ["Acme"])
+        self.assertEqual(self.client.get(self.url).data, [])
+
+    def test_rebuild_command_repairs_drift(self, mock_po, mock_notifications):
+        self._request("Acme", "10.00")
+        self._request("Globex", "20.00")
+        VendorSpendDaily.objects.filter(vendor_name="Acme").update(amount=0)
+        VendorSpendDaily.objects.filter(vendor_name="Globex").delete()
+        self.assertEqual(len(spend_rollup.find_drift()), 2)
+
+        with self.assertRaises(CommandError):
+            call_command("rebuild_vendor_spend", check=True, stdout=StringIO())
+        call_command("rebuild_vendor_spend", stdout=StringIO())
+        self.assertEqual(spend_rollup.find_drift(), [])
+        call_command("rebuild_vendor_spend", check=True, stdout=StringIO())